@@ -1,8 +1,11 @@
 import json
 import os
+import threading
 from typing import Optional
 
+import firebase_admin
 from firebase_admin.credentials import Certificate
+from pydantic import BaseSettings
 
 
 class CredentialManager:
@@ -35,3 +38,46 @@ class CredentialManager:
 
     def get_firebase_cert(self) -> Certificate:
         return Certificate(self._raw_firebase_credentials)
+
+
+class Settings(BaseSettings):
+    """Each setting can be overridden by an environment variable of the same name."""
+
+    holiday_dataset_path: str = "src/holiday-dataset.bin"
+    country_registry_path: str = "src/country-registry.json"
+    identity_toolkit_pool_size: int = 20
+    identity_toolkit_keepalive_seconds: float = 60.0
+    identity_toolkit_connect_timeout_seconds: float = 3.0
+    identity_toolkit_read_timeout_seconds: float = 10.0
+    identity_toolkit_http2: bool = False
+    firebase_executor_workers: int = 8
+    firebase_read_timeout_seconds: float = 5.0
+    firebase_write_timeout_seconds: float = 10.0
+    firebase_import_timeout_seconds: float = 60.0
+    circuit_breaker_failure_threshold: int = 5
+    circuit_breaker_reset_timeout_seconds: float = 30.0
+    # countries, or "US-CA" style subdivisions, whose holidays are computed before the
+    # server reports itself ready; years default to the current year ± the horizon
+    warmup_countries: list[str] = []
+    warmup_years: list[int] = []
+    holiday_cache_max_age_seconds: int = 24 * 60 * 60
+    serialized_response_cache_size_in_bytes: int = 8 * 1024 * 1024
+    calendar_feed_past_years: int = 1
+    calendar_feed_future_years: int = 2
+    calendar_fragment_cache_size_in_bytes: int = 4 * 1024 * 1024
+
+
+settings = Settings()
+
+_firebase_app_lock: threading.Lock = threading.Lock()
+
+
+def initialize_firebase() -> firebase_admin.App:
+    """Initializes the default Firebase app on first use; later calls return it."""
+    with _firebase_app_lock:
+        try:
+            return firebase_admin.get_app()
+        except ValueError:
+            return firebase_admin.initialize_app(
+                CredentialManager().get_firebase_cert()
+            )
@@ -1,5 +1,6 @@
 import datetime as dt
 from dataclasses import dataclass
+from enum import Enum
 
 
 @dataclass
@@ -7,3 +8,10 @@ class Holiday:
     holiday_name: str
     date: dt.date
     country_abbreviation: str
+
+
+class Roll(str, Enum):
+    """Which way to move a date that does not fall on a business day."""
+
+    FORWARD = "forward"
+    BACKWARD = "backward"
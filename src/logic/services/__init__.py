@@ -1,3 +1,8 @@
+from src.config import settings
+from src.logic.services.country_registry import CountryRegistry
 from src.logic.services.holiday_service import HolidayService
 
-holiday_service = HolidayService()
+holiday_service = HolidayService(
+    dataset_path=settings.holiday_dataset_path,
+    country_registry=CountryRegistry.load(settings.country_registry_path),
+)
@@ -1,24 +1,61 @@
-import json
+import asyncio
+import contextlib
+import hashlib
 import random
 import secrets
 import string
 import time
+from concurrent.futures import Executor, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, Iterator, Optional, TypeVar
 
-import requests
+import httpx
 from firebase_admin import auth as firebase_auth
-from requests import Response
+from firebase_admin import exceptions as firebase_exceptions
 
-from src.config import CredentialManager
+from src.config import CredentialManager, initialize_firebase, settings
+from src.logic.services.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerStatistics,
+    CircuitOpenError,
+)
+from src.logic.services.identity_toolkit import SECURE_TOKEN_URL, IdentityToolkitClient
+from src.logic.services.ttl_cache import TTLCache
 
 SPECIAL_CHARACTERS = " !\"#$%&'()*+,-.:;<=>?@[]^_`{|}~"
+TOKEN_USED_TOO_EARLY = "Token used too early"
+DEFAULT_CLOCK_SKEW_RETRIES = 3
+DEFAULT_CLOCK_SKEW_BACKOFF_SECONDS = 0.25
+DEFAULT_CLAIMS_CACHE_SIZE = 10_000
+DEFAULT_USER_CACHE_SIZE = 10_000
+DEFAULT_USER_CACHE_TTL_SECONDS = 300.0
+DEFAULT_REVOCATION_CHECK_INTERVAL_SECONDS = 60.0
+FIREBASE_IMPORT_BATCH_SIZE = 1000  # the most users import_users accepts per call
+FIREBASE_LOOKUP_BATCH_SIZE = 100  # the most identifiers get_users accepts per call
+DEFAULT_MAX_PARALLEL_IMPORTS = 4
+DEFAULT_IMPORT_HASH_ROUNDS = 100_000
+
+# errors that mean the backend, rather than the request, is at fault
+FIREBASE_FAILURES = (
+    TimeoutError,
+    firebase_exceptions.UnavailableError,
+    firebase_exceptions.DeadlineExceededError,
+    firebase_exceptions.InternalError,
+    firebase_exceptions.UnknownError,
+)
+IDENTITY_TOOLKIT_FAILURES = (httpx.TransportError, httpx.HTTPStatusError)
+
+T = TypeVar("T")
 
 
 class AuthenticationError(Exception):
     ...
 
 
+class BackendUnavailableError(Exception):
+    ...
+
+
 @dataclass
 class SessionToken:
     email: str
@@ -27,6 +64,12 @@ class SessionToken:
     access_token: str  # long-lived, used to fetch more id tokens, a.k.a. refresh token
 
 
+@dataclass
+class UserImportOutcome:
+    email: str
+    error: Optional[str] = None  # None when the user was created
+
+
 class AccountManagementService:
     _auth_service: firebase_auth
     _credential_manager: CredentialManager
@@ -35,18 +78,279 @@ class AccountManagementService:
         self,
         auth_service: Optional[firebase_auth] = None,
         credential_service: Optional[CredentialManager] = None,
+        clock_skew_retries: int = DEFAULT_CLOCK_SKEW_RETRIES,
+        clock_skew_backoff_seconds: float = DEFAULT_CLOCK_SKEW_BACKOFF_SECONDS,
+        claims_cache_size: int = DEFAULT_CLAIMS_CACHE_SIZE,
+        user_cache_size: int = DEFAULT_USER_CACHE_SIZE,
+        user_cache_ttl_seconds: float = DEFAULT_USER_CACHE_TTL_SECONDS,
+        revocation_check_interval_seconds: float = (
+            DEFAULT_REVOCATION_CHECK_INTERVAL_SECONDS
+        ),
+        identity_toolkit_client: Optional[IdentityToolkitClient] = None,
+        secure_token_client: Optional[IdentityToolkitClient] = None,
+        executor: Optional[Executor] = None,
+        max_parallel_imports: int = DEFAULT_MAX_PARALLEL_IMPORTS,
+        import_hash_rounds: int = DEFAULT_IMPORT_HASH_ROUNDS,
+        firebase_read_timeout_seconds: float = settings.firebase_read_timeout_seconds,
+        firebase_write_timeout_seconds: float = (
+            settings.firebase_write_timeout_seconds
+        ),
+        firebase_import_timeout_seconds: float = (
+            settings.firebase_import_timeout_seconds
+        ),
+        circuit_breaker_failure_threshold: int = (
+            settings.circuit_breaker_failure_threshold
+        ),
+        circuit_breaker_reset_timeout_seconds: float = (
+            settings.circuit_breaker_reset_timeout_seconds
+        ),
     ):
         self._auth_service = auth_service or firebase_auth
+        # the default Firebase app is only needed once we actually talk to Firebase
+        self._initialize_firebase: Callable[[], object] = (
+            initialize_firebase if auth_service is None else lambda: None
+        )
         self._credential_manager = credential_service or CredentialManager()
+        self._identity_toolkit_client: IdentityToolkitClient = (
+            identity_toolkit_client
+            or IdentityToolkitClient(self._credential_manager.get_firebase_api_key())
+        )
+        self._secure_token_client: IdentityToolkitClient = (
+            secure_token_client
+            or IdentityToolkitClient(
+                self._credential_manager.get_firebase_api_key(), SECURE_TOKEN_URL
+            )
+        )
+        # firebase-admin only offers blocking calls, so they get their own threads
+        # rather than competing with every other route for the default threadpool
+        self._executor: Executor = executor or ThreadPoolExecutor(
+            max_workers=settings.firebase_executor_workers,
+            thread_name_prefix="firebase",
+        )
+        # each firebase-admin call runs here so it can be abandoned at its deadline
+        self._backend_executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=settings.firebase_executor_workers,
+            thread_name_prefix="firebase-call",
+        )
+        self._firebase_read_timeout_seconds: float = firebase_read_timeout_seconds
+        self._firebase_write_timeout_seconds: float = firebase_write_timeout_seconds
+        self._firebase_import_timeout_seconds: float = firebase_import_timeout_seconds
+        self._firebase_breaker: CircuitBreaker = CircuitBreaker(
+            "Firebase",
+            circuit_breaker_failure_threshold,
+            circuit_breaker_reset_timeout_seconds,
+        )
+        self._identity_toolkit_breaker: CircuitBreaker = CircuitBreaker(
+            "Identity Toolkit",
+            circuit_breaker_failure_threshold,
+            circuit_breaker_reset_timeout_seconds,
+        )
+        self._max_parallel_imports: int = max_parallel_imports
+        self._import_hash_rounds: int = import_hash_rounds
+        self._clock_skew_retries: int = clock_skew_retries
+        self._clock_skew_backoff_seconds: float = clock_skew_backoff_seconds
+        # verified claims, keyed by a hash of their token, until the token expires
+        self._claims_cache: TTLCache[str, dict] = TTLCache(claims_cache_size)
+        # user records, keyed by uid
+        self._user_cache: TTLCache[str, firebase_auth.UserRecord] = TTLCache(
+            user_cache_size
+        )
+        self._user_cache_ttl_seconds: float = user_cache_ttl_seconds
+        # each uid's tokens-valid-after timestamp, in milliseconds; entries expire
+        # after the revocation check interval so revocations made elsewhere are seen
+        self._revocations: TTLCache[str, int] = TTLCache(user_cache_size)
+        self._revocation_check_interval_seconds: float = (
+            revocation_check_interval_seconds
+        )
 
-    def create_user(self, email: str, password: str) -> None:
+    async def _run_in_executor(self, function: Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, function, *args)
+
+    @contextlib.contextmanager
+    def _call_backend(
+        self, breaker: CircuitBreaker, failures: tuple[type[Exception], ...]
+    ) -> Iterator[None]:
+        try:
+            with breaker.guard(failures):
+                yield
+        except CircuitOpenError as error:
+            raise BackendUnavailableError(str(error)) from error
+        except failures as error:
+            raise BackendUnavailableError(
+                f"{breaker.name} is unavailable, try again later."
+            ) from error
+
+    def _call_firebase(
+        self, timeout_seconds: float, function: Callable[..., T], *args, **kwargs
+    ) -> T:
+        self._initialize_firebase()
+        with self._call_backend(self._firebase_breaker, FIREBASE_FAILURES):
+            future = self._backend_executor.submit(function, *args, **kwargs)
+            try:
+                return future.result(timeout=timeout_seconds)
+            except TimeoutError:
+                # the call cannot be interrupted, but it no longer holds up the caller
+                future.cancel()
+                raise
+
+    def _post_to_identity_toolkit(
+        self, client: IdentityToolkitClient, endpoint: str, body: dict, form: bool
+    ) -> httpx.Response:
+        with self._call_backend(
+            self._identity_toolkit_breaker, IDENTITY_TOOLKIT_FAILURES
+        ):
+            response: httpx.Response = client.post(endpoint, body, form)
+            if response.is_server_error:
+                response.raise_for_status()
+            return response
+
+    async def _post_to_identity_toolkit_async(
+        self, client: IdentityToolkitClient, endpoint: str, body: dict, form: bool
+    ) -> httpx.Response:
+        with self._call_backend(
+            self._identity_toolkit_breaker, IDENTITY_TOOLKIT_FAILURES
+        ):
+            response: httpx.Response = await client.post_async(endpoint, body, form)
+            if response.is_server_error:
+                response.raise_for_status()
+            return response
+
+    def get_circuit_breaker_statistics(self) -> list[CircuitBreakerStatistics]:
+        return [
+            self._firebase_breaker.get_statistics(),
+            self._identity_toolkit_breaker.get_statistics(),
+        ]
+
+    def _validate_new_user(self, email: str, password: str) -> None:
         if email == password:
             raise ValueError("Email and password should not match.")
 
         if not self.is_strong_password(password):
             raise ValueError("Password is too weak.")
 
-        self._auth_service.create_user(email=email, password=password)
+    def create_user(self, email: str, password: str) -> None:
+        self._validate_new_user(email, password)
+        self._call_firebase(
+            self._firebase_write_timeout_seconds,
+            self._auth_service.create_user,
+            email=email,
+            password=password,
+        )
+
+    async def create_user_async(self, email: str, password: str) -> None:
+        await self._run_in_executor(self.create_user, email, password)
+
+    def _find_existing_emails(self, emails: list[str]) -> set[str]:
+        existing_emails: set[str] = set()
+        for start in range(0, len(emails), FIREBASE_LOOKUP_BATCH_SIZE):
+            result = self._call_firebase(
+                self._firebase_read_timeout_seconds,
+                self._auth_service.get_users,
+                [
+                    firebase_auth.EmailIdentifier(email)
+                    for email in emails[start : start + FIREBASE_LOOKUP_BATCH_SIZE]
+                ],
+            )
+            existing_emails.update(user.email.lower() for user in result.users)
+        return existing_emails
+
+    def _import_chunk(self, outcomes: list[UserImportOutcome], passwords: list[str]):
+        # import_users skips the uniqueness checks create_user makes, so emails that
+        # are already registered are looked up and rejected first
+        try:
+            existing_emails: set[str] = self._find_existing_emails(
+                [outcome.email for outcome in outcomes]
+            )
+        except (firebase_exceptions.FirebaseError, BackendUnavailableError) as error:
+            # other chunks may already be imported, so this one fails on its own
+            for outcome in outcomes:
+                outcome.error = str(error)
+            return
+        records: list[firebase_auth.ImportUserRecord] = []
+        imported_outcomes: list[UserImportOutcome] = []
+        for outcome, password in zip(outcomes, passwords):
+            if outcome.email.lower() in existing_emails:
+                outcome.error = "Email is already registered."
+                continue
+            salt: bytes = secrets.token_bytes(16)
+            records.append(
+                firebase_auth.ImportUserRecord(
+                    uid=secrets.token_urlsafe(21),
+                    email=outcome.email,
+                    password_hash=hashlib.pbkdf2_hmac(
+                        "sha256", password.encode(), salt, self._import_hash_rounds
+                    ),
+                    password_salt=salt,
+                )
+            )
+            imported_outcomes.append(outcome)
+
+        if not records:
+            return
+        try:
+            result = self._call_firebase(
+                self._firebase_import_timeout_seconds,
+                self._auth_service.import_users,
+                records,
+                hash_alg=firebase_auth.UserImportHash.pbkdf2_sha256(
+                    self._import_hash_rounds
+                ),
+            )
+        except (firebase_exceptions.FirebaseError, BackendUnavailableError) as error:
+            for outcome in imported_outcomes:
+                outcome.error = str(error)
+            return
+        for error_info in result.errors:
+            imported_outcomes[error_info.index].error = error_info.reason
+
+    def import_users(self, users: list[tuple[str, str]]) -> list[UserImportOutcome]:
+        """
+        Creates many (email, password) users, reporting an outcome for each in order.
+
+        Users are validated like create_user, then imported in Firebase's batch size,
+        with a bounded number of batches in flight at once.
+        """
+        outcomes: list[UserImportOutcome] = []
+        accepted: list[tuple[UserImportOutcome, str]] = []
+        seen_emails: set[str] = set()
+        for email, password in users:
+            outcome = UserImportOutcome(email)
+            outcomes.append(outcome)
+            try:
+                self._validate_new_user(email, password)
+            except ValueError as error:
+                outcome.error = str(error)
+                continue
+            if email.lower() in seen_emails:
+                outcome.error = "Email appears more than once in this import."
+                continue
+            seen_emails.add(email.lower())
+            accepted.append((outcome, password))
+
+        chunks = [
+            accepted[start : start + FIREBASE_IMPORT_BATCH_SIZE]
+            for start in range(0, len(accepted), FIREBASE_IMPORT_BATCH_SIZE)
+        ]
+        with ThreadPoolExecutor(
+            max_workers=self._max_parallel_imports, thread_name_prefix="user-import"
+        ) as import_executor:
+            futures = [
+                import_executor.submit(
+                    self._import_chunk,
+                    [outcome for outcome, _ in chunk],
+                    [password for _, password in chunk],
+                )
+                for chunk in chunks
+            ]
+            for future in futures:
+                future.result()
+        return outcomes
+
+    async def import_users_async(
+        self, users: list[tuple[str, str]]
+    ) -> list[UserImportOutcome]:
+        return await self._run_in_executor(self.import_users, users)
 
     @staticmethod
     def is_strong_password(password: str) -> bool:
@@ -73,22 +377,9 @@ class AccountManagementService:
         else:
             return False
 
-    def login(self, email: str, password: str) -> SessionToken:
-        url: str = (
-            f"https://www.googleapis.com/identitytoolkit/v3/relyingparty"
-            f"/verifyPassword?key={self._credential_manager.get_firebase_api_key()}"
-        )
-        headers: dict = {"content-type": "application/json; charset=UTF-8"}
-        request_body = json.dumps(
-            {
-                "email": email,
-                "password": password,
-                "returnSecureToken": True,
-            }
-        )
-        response: Response = requests.post(url, headers=headers, data=request_body)
-
-        if not response.ok:
+    @staticmethod
+    def _parse_session_token(response: httpx.Response) -> SessionToken:
+        if not response.is_success:
             raise AuthenticationError
 
         response_json: dict = response.json()
@@ -100,23 +391,162 @@ class AccountManagementService:
         )
         return session_token
 
+    @staticmethod
+    def _login_request_body(email: str, password: str) -> dict:
+        return {"email": email, "password": password, "returnSecureToken": True}
+
+    def login(self, email: str, password: str) -> SessionToken:
+        response: httpx.Response = self._post_to_identity_toolkit(
+            self._identity_toolkit_client,
+            "/verifyPassword",
+            self._login_request_body(email, password),
+            form=False,
+        )
+        return self._parse_session_token(response)
+
+    async def login_async(self, email: str, password: str) -> SessionToken:
+        response: httpx.Response = await self._post_to_identity_toolkit_async(
+            self._identity_toolkit_client,
+            "/verifyPassword",
+            self._login_request_body(email, password),
+            form=False,
+        )
+        return self._parse_session_token(response)
+
+    @staticmethod
+    def _refresh_request_body(refresh_token: str) -> dict:
+        return {"grant_type": "refresh_token", "refresh_token": refresh_token}
+
+    @staticmethod
+    def _parse_refreshed_tokens(response: httpx.Response) -> dict:
+        if not response.is_success:
+            raise AuthenticationError
+        return response.json()
+
+    def _build_refreshed_session_token(self, response_json: dict) -> SessionToken:
+        # the exchange does not return an email, but the fresh token carries it, and
+        # verifying it here also caches its claims for the requests that follow
+        try:
+            claims: dict = self._get_verified_claims(response_json["id_token"])
+        except firebase_auth.InvalidIdTokenError:
+            raise AuthenticationError
+        return SessionToken(
+            claims["email"],
+            response_json["expires_in"],
+            response_json["id_token"],
+            response_json["refresh_token"],
+        )
+
+    def refresh(self, refresh_token: str) -> SessionToken:
+        response: httpx.Response = self._post_to_identity_toolkit(
+            self._secure_token_client,
+            "/token",
+            self._refresh_request_body(refresh_token),
+            form=True,
+        )
+        return self._build_refreshed_session_token(
+            self._parse_refreshed_tokens(response)
+        )
+
+    async def refresh_async(self, refresh_token: str) -> SessionToken:
+        response: httpx.Response = await self._post_to_identity_toolkit_async(
+            self._secure_token_client,
+            "/token",
+            self._refresh_request_body(refresh_token),
+            form=True,
+        )
+        return await self._run_in_executor(
+            self._build_refreshed_session_token, self._parse_refreshed_tokens(response)
+        )
+
     def logout(self, id_token: str):
         user: firebase_auth.UserRecord = self.verify_token_and_get_user(id_token)
-        self._auth_service.revoke_refresh_tokens(user.uid)
+        self._call_firebase(
+            self._firebase_write_timeout_seconds,
+            self._auth_service.revoke_refresh_tokens,
+            user.uid,
+        )
+        # Firebase stores the revocation time in whole seconds, so we do the same
+        self._record_revocation(user.uid, int(time.time()) * 1000)
 
-    def verify_token_and_get_user(self, id_token: str):
-        # TODO this is an unfortunate hack while I wait for this issue to be resolved
+    async def logout_async(self, id_token: str) -> None:
+        await self._run_in_executor(self.logout, id_token)
+
+    def _verify_id_token(self, id_token: str) -> dict:
+        # When our clock lags Google's, a freshly minted token looks like it was issued
+        # in the future. That resolves itself within a second or two, so we retry with
+        # a short backoff rather than delaying every verification.
         # https://github.com/firebase/firebase-admin-python/issues/624
         # https://github.com/firebase/firebase-admin-python/issues/625
-        time.sleep(3)
+        attempt: int = 0
+        while True:
+            try:
+                # without check_revoked this is local: the signing certificates are
+                # cached by firebase-admin for as long as their Cache-Control allows
+                return self._call_firebase(
+                    self._firebase_read_timeout_seconds,
+                    self._auth_service.verify_id_token,
+                    id_token,
+                    check_revoked=False,
+                )
+            except firebase_auth.InvalidIdTokenError as error:
+                if (
+                    TOKEN_USED_TOO_EARLY not in str(error)
+                    or attempt >= self._clock_skew_retries
+                ):
+                    raise
+                time.sleep(self._clock_skew_backoff_seconds * 2**attempt)
+                attempt += 1
+
+    def _get_verified_claims(self, id_token: str) -> dict:
+        token_hash: str = hashlib.sha256(id_token.encode()).hexdigest()
+        claims: Optional[dict] = self._claims_cache.get(token_hash)
+        if claims is None:
+            claims = self._verify_id_token(id_token)
+            self._claims_cache.put(token_hash, claims, expires_at=claims["exp"])
+        return claims
+
+    def _record_revocation(self, uid: str, tokens_valid_after: int) -> None:
+        self._revocations.put(
+            uid,
+            tokens_valid_after,
+            expires_at=time.time() + self._revocation_check_interval_seconds,
+        )
+
+    def _fetch_user(self, uid: str) -> firebase_auth.UserRecord:
+        user: firebase_auth.UserRecord = self._call_firebase(
+            self._firebase_read_timeout_seconds, self._auth_service.get_user, uid
+        )
+        self._user_cache.put(
+            uid, user, expires_at=time.time() + self._user_cache_ttl_seconds
+        )
+        self._record_revocation(uid, user.tokens_valid_after_timestamp)
+        return user
+
+    def verify_token_and_get_user(self, id_token: str):
         try:
-            jwt: dict = self._auth_service.verify_id_token(id_token, check_revoked=True)
-            email: str = jwt["email"]
-            user: firebase_auth.UserRecord = self._auth_service.get_user_by_email(email)
-            return user
-        except (firebase_auth.ExpiredIdTokenError, firebase_auth.RevokedIdTokenError):
+            claims: dict = self._get_verified_claims(id_token)
+        except firebase_auth.InvalidIdTokenError:
+            # also covers expired tokens, which subclass it
             raise AuthenticationError
 
+        # the revocation table answers almost every check; Firebase is only asked
+        # again once an entry has outlived the revocation check interval
+        uid: str = claims["uid"]
+        user: Optional[firebase_auth.UserRecord] = self._user_cache.get(uid)
+        tokens_valid_after: Optional[int] = self._revocations.get(uid)
+        if user is None or tokens_valid_after is None:
+            user = self._fetch_user(uid)
+            tokens_valid_after = user.tokens_valid_after_timestamp
+        if user.disabled or claims["iat"] * 1000 < tokens_valid_after:
+            raise AuthenticationError
+        return user
+
+    async def verify_token_and_get_user_async(
+        self, id_token: str
+    ) -> firebase_auth.UserRecord:
+        return await self._run_in_executor(self.verify_token_and_get_user, id_token)
+
 
 def generate_strong_password() -> str:
     uppercase_letter: str = secrets.choice(string.ascii_uppercase)
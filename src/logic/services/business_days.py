@@ -0,0 +1,103 @@
+import datetime as dt
+from typing import Callable, Iterable, Optional
+
+from src.logic.models import Roll
+from src.logic.services.holiday_index import HolidayIndex
+
+DAYS_PER_WEEK = 7
+
+
+class BusinessDayCalendar:
+    """
+    Business-day arithmetic over one country's holidays and weekend days.
+
+    Modeled on NumPy's busday_offset and busday_count: whole weeks are skipped
+    arithmetically and only the holidays inside the skipped span are counted, so
+    the cost grows with the number of holidays crossed rather than days.
+    """
+
+    _weekend: frozenset[int]
+    _get_holidays: Callable[[int, int], HolidayIndex]
+    _holidays: Optional[HolidayIndex]
+
+    def __init__(
+        self,
+        weekend: Iterable[int],
+        get_holidays: Callable[[int, int], HolidayIndex],
+    ):
+        self._weekend = frozenset(weekend)
+        self._workdays_per_week: int = DAYS_PER_WEEK - len(self._weekend)
+        if self._workdays_per_week < 1:
+            raise ValueError("A week should contain at least one business day.")
+        self._get_holidays = get_holidays
+        self._holidays = None
+
+    def _holidays_covering(self, first: dt.date, last: dt.date) -> HolidayIndex:
+        first_year, last_year = min(first, last).year, max(first, last).year
+        if self._holidays is None or not self._holidays.covers(first_year, last_year):
+            self._holidays = self._get_holidays(first_year, last_year)
+        return self._holidays
+
+    def _is_workday(self, date: dt.date) -> bool:
+        return date.weekday() not in self._weekend
+
+    def _count_workday_holidays(self, first: dt.date, last: dt.date) -> int:
+        holiday_index: HolidayIndex = self._holidays_covering(first, last)
+        return sum(
+            1 for day, _ in holiday_index.between(first, last) if self._is_workday(day)
+        )
+
+    def _count_workdays(self, first: dt.date, last: dt.date) -> int:
+        """Counts non-weekend days in [first, last], ignoring holidays."""
+        days: int = (last - first).days + 1
+        weeks, remainder = divmod(days, DAYS_PER_WEEK)
+        return weeks * self._workdays_per_week + sum(
+            1
+            for offset in range(remainder)
+            if self._is_workday(first + dt.timedelta(days=offset))
+        )
+
+    def is_business_day(self, date: dt.date) -> bool:
+        return self._is_workday(date) and date not in self._holidays_covering(
+            date, date
+        )
+
+    def roll(self, date: dt.date, roll: Roll = Roll.FORWARD) -> dt.date:
+        step = dt.timedelta(days=1 if roll == Roll.FORWARD else -1)
+        while not self.is_business_day(date):
+            date += step
+        return date
+
+    def count(self, start: dt.date, end: dt.date) -> int:
+        """Counts business days in [start, end), negated when end precedes start."""
+        if end < start:
+            return -self.count(end, start)
+        if end == start:
+            return 0
+
+        last: dt.date = end - dt.timedelta(days=1)
+        return self._count_workdays(start, last) - self._count_workday_holidays(
+            start, last
+        )
+
+    def offset(self, date: dt.date, days: int, roll: Roll = Roll.FORWARD) -> dt.date:
+        """Rolls date to a business day, then moves it by the given business days."""
+        date = self.roll(date, roll)
+        step: int = 1 if days >= 0 else -1
+        remaining: int = abs(days)
+
+        # jump whole weeks, which always contain the same number of workdays, and
+        # give back any holidays that landed on those workdays
+        while (weeks := remaining // self._workdays_per_week) > 0:
+            target: dt.date = date + dt.timedelta(days=step * weeks * DAYS_PER_WEEK)
+            span_start, span_end = sorted([date + dt.timedelta(days=step), target])
+            remaining -= weeks * self._workdays_per_week - (
+                self._count_workday_holidays(span_start, span_end)
+            )
+            date = target
+
+        while remaining > 0:
+            date += dt.timedelta(days=step)
+            if self.is_business_day(date):
+                remaining -= 1
+        return date
@@ -0,0 +1,143 @@
+import contextlib
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Iterator
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT_SECONDS = 30.0
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    ...
+
+
+@dataclass(frozen=True)
+class CircuitBreakerStatistics:
+    name: str
+    state: CircuitState
+    consecutive_failures: int
+    failures: int
+    rejections: int
+
+
+class CircuitBreaker:
+    """
+    Fails fast once a backend has failed too many times in a row.
+
+    After failure_threshold consecutive failures the circuit opens and calls are
+    rejected without reaching the backend. Once reset_timeout_seconds have passed, a
+    single probe call is let through: its success closes the circuit again, and its
+    failure reopens it for another timeout.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout_seconds: float = DEFAULT_RESET_TIMEOUT_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if failure_threshold < 1:
+            raise ValueError("Circuit should tolerate at least one failure.")
+        self.name: str = name
+        self._failure_threshold: int = failure_threshold
+        self._reset_timeout_seconds: float = reset_timeout_seconds
+        self._clock: Callable[[], float] = clock
+        self._lock: threading.Lock = threading.Lock()
+        self._state: CircuitState = CircuitState.CLOSED
+        self._opened_at: float = 0.0
+        self._is_probing: bool = False
+        self._consecutive_failures: int = 0
+        self._failures: int = 0
+        self._rejections: int = 0
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> CircuitState:
+        # callers hold the lock
+        if (
+            self._state == CircuitState.OPEN
+            and self._clock() - self._opened_at >= self._reset_timeout_seconds
+        ):
+            self._state = CircuitState.HALF_OPEN
+        return self._state
+
+    def before_call(self) -> None:
+        """Raises CircuitOpenError unless a call may go through to the backend."""
+        with self._lock:
+            state: CircuitState = self._current_state()
+            if state == CircuitState.CLOSED:
+                return
+            if state == CircuitState.HALF_OPEN and not self._is_probing:
+                self._is_probing = True
+                return
+            self._rejections += 1
+        raise CircuitOpenError(f"{self.name} is unavailable, try again later.")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CircuitState.CLOSED
+            self._is_probing = False
+            self._consecutive_failures = 0
+
+    def release_probe(self) -> None:
+        """Lets another call probe a half-open circuit, recording no outcome."""
+        with self._lock:
+            self._is_probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._consecutive_failures += 1
+            if (
+                self._is_probing
+                or self._consecutive_failures >= self._failure_threshold
+            ):
+                self._state = CircuitState.OPEN
+                self._opened_at = self._clock()
+                self._is_probing = False
+
+    @contextlib.contextmanager
+    def guard(self, failures: tuple[type[Exception], ...]) -> Iterator[None]:
+        """
+        Runs the enclosed call through the breaker.
+
+        Only the given exception types count as failures; any other exception is an
+        answer from a healthy backend, such as a rejected credential.
+        """
+        self.before_call()
+        try:
+            yield
+        except failures:
+            self.record_failure()
+            raise
+        except Exception:
+            self.record_success()
+            raise
+        except BaseException:
+            # a cancelled call says nothing about the backend, but it must not keep
+            # the probe slot, or the circuit would stay half open forever
+            self.release_probe()
+            raise
+        self.record_success()
+
+    def get_statistics(self) -> CircuitBreakerStatistics:
+        with self._lock:
+            return CircuitBreakerStatistics(
+                name=self.name,
+                state=self._current_state(),
+                consecutive_failures=self._consecutive_failures,
+                failures=self._failures,
+                rejections=self._rejections,
+            )
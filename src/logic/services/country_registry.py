@@ -0,0 +1,141 @@
+"""
+An immutable registry of ISO 3166 countries, generated once from pycountry.
+
+Regenerate it whenever pycountry is upgraded:
+
+    python -m src.logic.services.country_registry --output src/country-registry.json
+
+Loading the generated file keeps pycountry's database, which is parsed on first use,
+out of both startup and the request path.
+"""
+import argparse
+import json
+import os
+from dataclasses import asdict, dataclass
+from types import MappingProxyType
+from typing import Self  # noqa PyCharm is not able to find Self, but it is there
+from typing import Iterable, Mapping, Optional
+
+DEFAULT_REGISTRY_PATH = "src/country-registry.json"
+
+
+@dataclass(frozen=True)
+class RegisteredCountry:
+    alpha_2: str
+    alpha_3: str
+    numeric: str
+    name: str
+    flag: str
+    official_name: Optional[str] = None
+    common_name: Optional[str] = None
+
+    @property
+    def names(self) -> list[str]:
+        return [
+            name
+            for name in (self.name, self.official_name, self.common_name)
+            if name is not None
+        ]
+
+
+class CountryRegistry:
+    """Looks countries up by alpha-2, alpha-3 or numeric code, or by name."""
+
+    def __init__(self, countries: Iterable[RegisteredCountry]):
+        self._countries: tuple[RegisteredCountry, ...] = tuple(countries)
+        self._by_alpha_2: Mapping[str, RegisteredCountry] = MappingProxyType(
+            {country.alpha_2: country for country in self._countries}
+        )
+        self._by_alpha_3: Mapping[str, RegisteredCountry] = MappingProxyType(
+            {country.alpha_3: country for country in self._countries}
+        )
+        self._by_numeric: Mapping[str, RegisteredCountry] = MappingProxyType(
+            {country.numeric: country for country in self._countries}
+        )
+        self._by_name: Mapping[str, RegisteredCountry] = MappingProxyType(
+            {
+                name.casefold(): country
+                for country in self._countries
+                for name in country.names
+            }
+        )
+
+    @staticmethod
+    def from_pycountry() -> Self:
+        import pycountry  # only needed when generating the registry
+
+        return CountryRegistry(
+            RegisteredCountry(
+                alpha_2=country.alpha_2,
+                alpha_3=country.alpha_3,
+                numeric=country.numeric,
+                name=country.name,
+                flag=country.flag,
+                official_name=getattr(country, "official_name", None),
+                common_name=getattr(country, "common_name", None),
+            )
+            for country in pycountry.countries
+        )
+
+    @staticmethod
+    def load(path: str = DEFAULT_REGISTRY_PATH) -> Self:
+        if not os.path.exists(path):
+            return CountryRegistry.from_pycountry()
+        with open(path, encoding="utf-8") as registry_file:
+            return CountryRegistry(
+                RegisteredCountry(**country) for country in json.load(registry_file)
+            )
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as registry_file:
+            json.dump(
+                [asdict(country) for country in self._countries],
+                registry_file,
+                ensure_ascii=False,
+                indent=1,
+            )
+            registry_file.write("\n")
+
+    def __contains__(self, alpha_2: str) -> bool:
+        return alpha_2 in self._by_alpha_2
+
+    def __iter__(self):
+        return iter(self._countries)
+
+    def __len__(self) -> int:
+        return len(self._countries)
+
+    def get_by_alpha_2(self, alpha_2: str) -> Optional[RegisteredCountry]:
+        return self._by_alpha_2.get(alpha_2.upper(), None)
+
+    def get_by_alpha_3(self, alpha_3: str) -> Optional[RegisteredCountry]:
+        return self._by_alpha_3.get(alpha_3.upper(), None)
+
+    def get_by_numeric(self, numeric: str | int) -> Optional[RegisteredCountry]:
+        return self._by_numeric.get(str(numeric).zfill(3), None)
+
+    def get_by_name(self, name: str) -> Optional[RegisteredCountry]:
+        return self._by_name.get(name.casefold(), None)
+
+    def lookup(self, value: str) -> Optional[RegisteredCountry]:
+        """Resolves any code or name, trying the cheapest interpretation first."""
+        if value.isdigit():
+            return self.get_by_numeric(value)
+        if len(value) == 2:
+            return self.get_by_alpha_2(value)
+        if len(value) == 3:
+            return self.get_by_alpha_3(value) or self.get_by_name(value)
+        return self.get_by_name(value)
+
+
+def main(arguments: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Generates the country registry loaded by HolidayService."
+    )
+    parser.add_argument("--output", required=True, help="Where to write the registry.")
+    parsed_arguments = parser.parse_args(arguments)
+    CountryRegistry.from_pycountry().write(parsed_arguments.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+A prebuilt, memory-mapped table of every supported country's holidays.
+
+Build it once per release of the holidays library:
+
+    python -m src.logic.services.holiday_dataset --output src/holiday-dataset.bin
+
+Every worker that loads the file maps the same pages through the OS page cache, so
+N workers share one copy of the data instead of each computing their own.
+"""
+import argparse
+import datetime as dt
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import Self  # noqa PyCharm is not able to find Self, but it is there
+from typing import Iterable, Optional
+
+import holidays
+
+from src.logic.services.holiday_index import HolidayIndex
+
+MAGIC = b"FMNHOLID"
+FORMAT_VERSION = 1
+# the Hijri calendar conversion used for several countries only spans 1924-2077,
+# and each year is computed alongside its neighbors
+DEFAULT_FIRST_YEAR = 1950
+DEFAULT_LAST_YEAR = 2075
+MAX_NAME_COUNT = 2**16  # names are referenced by unsigned 16-bit ids
+# magic, format version, library version length, first year, last year,
+# country count, holiday count, name count, name blob length
+HEADER = struct.Struct("<8sHHiiIIII")
+# country code, offset of its first holiday, number of holidays
+COUNTRY_ENTRY = struct.Struct("<2sxxII")
+
+
+class DatasetError(Exception):
+    ...
+
+
+def _pad(length: int) -> int:
+    # keeps every section 4-byte aligned so it can be cast in place
+    return -length % 4
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class _PackedNames(Sequence):
+    """Resolves a packed array of name ids against a shared table of names."""
+
+    def __init__(self, name_ids: Sequence[int], names: tuple[str, ...]):
+        self._name_ids = name_ids
+        self._names = names
+
+    def __len__(self) -> int:
+        return len(self._name_ids)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return _PackedNames(self._name_ids[position], self._names)
+        return self._names[self._name_ids[position]]
+
+
+class HolidayDataset:
+    library_version: str
+    first_year: int
+    last_year: int
+
+    def __init__(self, buffer: bytes | mmap.mmap):
+        if sys.byteorder == "big":
+            raise DatasetError("Datasets can only be read on little-endian hosts.")
+        if len(buffer) < HEADER.size:
+            raise DatasetError("Dataset is truncated.")
+
+        (
+            magic,
+            format_version,
+            library_version_length,
+            self.first_year,
+            self.last_year,
+            country_count,
+            holiday_count,
+            name_count,
+            name_blob_length,
+        ) = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise DatasetError("File is not a holiday dataset.")
+        if format_version != FORMAT_VERSION:
+            raise DatasetError(f"Unsupported dataset format {format_version}.")
+
+        self._buffer = buffer
+        view = memoryview(buffer)
+        offset: int = HEADER.size
+        self.library_version = bytes(
+            view[offset : offset + library_version_length]
+        ).decode()
+        offset += library_version_length + _pad(library_version_length)
+
+        expected_length: int = (
+            offset
+            + COUNTRY_ENTRY.size * country_count
+            + 4 * holiday_count
+            + 2 * holiday_count
+            + _pad(2 * holiday_count)
+            + 4 * (name_count + 1)
+            + name_blob_length
+        )
+        if len(buffer) < expected_length:
+            raise DatasetError("Dataset is truncated.")
+
+        self._countries: dict[str, tuple[int, int]] = dict()
+        for _ in range(country_count):
+            code, start, count = COUNTRY_ENTRY.unpack_from(buffer, offset)
+            self._countries[code.decode()] = (start, count)
+            offset += COUNTRY_ENTRY.size
+
+        self._ordinals = view[offset : offset + 4 * holiday_count].cast("i")
+        offset += 4 * holiday_count
+        self._name_ids = view[offset : offset + 2 * holiday_count].cast("H")
+        offset += 2 * holiday_count + _pad(2 * holiday_count)
+        name_offsets = view[offset : offset + 4 * (name_count + 1)].cast("I")
+        offset += 4 * (name_count + 1)
+        name_blob: bytes = bytes(view[offset : offset + name_blob_length])
+        # names are few and small, so they are decoded once; the arrays stay mapped
+        self._names: tuple[str, ...] = tuple(
+            sys.intern(name_blob[name_offsets[i] : name_offsets[i + 1]].decode())
+            for i in range(name_count)
+        )
+        name_offsets.release()
+        self._indexes: dict[str, HolidayIndex] = dict()
+
+    @staticmethod
+    def load(path: str) -> Self:
+        with open(path, "rb") as dataset_file:
+            try:
+                buffer = mmap.mmap(dataset_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise DatasetError("Dataset is empty.")
+        return HolidayDataset(buffer)
+
+    @property
+    def country_codes(self) -> list[str]:
+        return list(self._countries.keys())
+
+    def get_country_holidays(self, country_code: str) -> Optional[HolidayIndex]:
+        holiday_index: Optional[HolidayIndex] = self._indexes.get(country_code, None)
+        if holiday_index is None and country_code in self._countries:
+            start, count = self._countries[country_code]
+            holiday_index = HolidayIndex(
+                self._ordinals[start : start + count],
+                _PackedNames(self._name_ids[start : start + count], self._names),
+                self.first_year,
+                self.last_year,
+            )
+            self._indexes[country_code] = holiday_index
+        return holiday_index
+
+    @staticmethod
+    def write(
+        path: str,
+        country_holidays: dict[str, HolidayIndex],
+        first_year: int,
+        last_year: int,
+    ) -> None:
+        names: dict[str, int] = dict()
+        country_entries: list[bytes] = []
+        ordinals: array = array("i")
+        name_ids: array = array("H")
+        for country_code, holiday_index in country_holidays.items():
+            if not holiday_index.covers(first_year, last_year):
+                raise DatasetError(f"'{country_code}' does not cover every year.")
+            start: int = len(ordinals)
+            for day, name in holiday_index.between(
+                dt.date(first_year, 1, 1), dt.date(last_year, 12, 31)
+            ):
+                name_id: int = names.setdefault(name, len(names))
+                if name_id >= MAX_NAME_COUNT:
+                    raise DatasetError("Too many distinct holiday names to pack.")
+                ordinals.append(day.toordinal())
+                name_ids.append(name_id)
+            country_entries.append(
+                COUNTRY_ENTRY.pack(country_code.encode(), start, len(ordinals) - start)
+            )
+
+        encoded_names: list[bytes] = [name.encode() for name in names]
+        name_offsets: array = array("I", [0])
+        for encoded_name in encoded_names:
+            name_offsets.append(name_offsets[-1] + len(encoded_name))
+        library_version: bytes = holidays.__version__.encode()
+
+        with open(path, "wb") as dataset_file:
+            dataset_file.write(
+                HEADER.pack(
+                    MAGIC,
+                    FORMAT_VERSION,
+                    len(library_version),
+                    first_year,
+                    last_year,
+                    len(country_entries),
+                    len(ordinals),
+                    len(encoded_names),
+                    name_offsets[-1],
+                )
+            )
+            dataset_file.write(library_version + b"\0" * _pad(len(library_version)))
+            dataset_file.write(b"".join(country_entries))
+            dataset_file.write(_little_endian(ordinals))
+            dataset_file.write(_little_endian(name_ids))
+            dataset_file.write(b"\0" * _pad(2 * len(name_ids)))
+            dataset_file.write(_little_endian(name_offsets))
+            dataset_file.write(b"".join(encoded_names))
+
+
+def build_dataset(
+    path: str,
+    first_year: int = DEFAULT_FIRST_YEAR,
+    last_year: int = DEFAULT_LAST_YEAR,
+    country_codes: Optional[Iterable[str]] = None,
+) -> None:
+    country_codes = country_codes or holidays.list_supported_countries().keys()
+    HolidayDataset.write(
+        path,
+        {
+            country_code: HolidayIndex.from_library(
+                country_code, None, first_year, last_year
+            )
+            for country_code in country_codes
+        },
+        first_year,
+        last_year,
+    )
+
+
+def main(arguments: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Builds the prebuilt holiday dataset loaded by HolidayService."
+    )
+    parser.add_argument("--output", required=True, help="Where to write the dataset.")
+    parser.add_argument("--first-year", type=int, default=DEFAULT_FIRST_YEAR)
+    parser.add_argument("--last-year", type=int, default=DEFAULT_LAST_YEAR)
+    parser.add_argument(
+        "--countries",
+        nargs="*",
+        help="Country abbreviations to include. Defaults to every supported country.",
+    )
+    parsed_arguments = parser.parse_args(arguments)
+    build_dataset(
+        parsed_arguments.output,
+        parsed_arguments.first_year,
+        parsed_arguments.last_year,
+        parsed_arguments.countries,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+import datetime as dt
+import heapq
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import groupby, takewhile
+from operator import itemgetter
+from typing import Self  # noqa PyCharm is not able to find Self, but it is there
+from typing import Iterable, Iterator, Optional, Sequence
+
+import holidays
+
+# what the holidays library raises for years it cannot compute, e.g. a lunar calendar
+# conversion that runs off the end of its table
+LIBRARY_YEAR_FAILURES = (IndexError, NotImplementedError, OverflowError, ValueError)
+
+
+def _populate_year(
+    country_code: str, subdivision: Optional[str], year: int
+) -> list[tuple[dt.date, str]]:
+    try:
+        return list(
+            holidays.country_holidays(
+                country_code, subdiv=subdivision, years=year, expand=False
+            ).items()
+        )
+    except LIBRARY_YEAR_FAILURES:
+        return []
+
+
+class HolidayIndex:
+    """
+    An immutable, date-sorted view of a country's holidays.
+
+    Dates are stored as proleptic Gregorian ordinals in a sorted array alongside a
+    parallel sequence of holiday names, so point lookups and range queries are
+    bisections rather than scans. An index covers a contiguous range of whole years,
+    from first_year to last_year inclusive.
+    """
+
+    first_year: int
+    last_year: int
+    _ordinals: Sequence[int]
+    _names: Sequence[str]
+
+    def __init__(
+        self,
+        ordinals: Sequence[int],
+        names: Sequence[str],
+        first_year: int,
+        last_year: int,
+    ):
+        if len(ordinals) != len(names):
+            raise ValueError("Ordinals and names should be the same length.")
+        if last_year < first_year:
+            raise ValueError("Last year cannot precede first year.")
+        self._ordinals = ordinals
+        self._names = names
+        self.first_year = first_year
+        self.last_year = last_year
+
+    @staticmethod
+    def from_holidays(
+        country_holidays: Iterable[tuple[dt.date, str]],
+        first_year: int,
+        last_year: int,
+    ) -> Self:
+        sorted_holidays = sorted(
+            (day, name)
+            for day, name in country_holidays
+            if first_year <= day.year <= last_year
+        )
+        return HolidayIndex(
+            array("i", [day.toordinal() for day, _ in sorted_holidays]),
+            # the same few names recur every year, so share one copy of each
+            tuple(sys.intern(name) for _, name in sorted_holidays),
+            first_year,
+            last_year,
+        )
+
+    @staticmethod
+    def from_library(
+        country_code: str, subdivision: Optional[str], first_year: int, last_year: int
+    ) -> Self:
+        """
+        Computes an index for the given years with the holidays library.
+
+        Years the library cannot compute, such as those its calendar conversions do
+        not reach, are treated as having no holidays.
+        """
+        # an unknown country or subdivision should still fail loudly, so check them
+        # before any year is populated
+        holidays.country_holidays(country_code, subdiv=subdivision, expand=False)
+        # observed holidays can spill into a neighboring year, e.g. a Saturday New
+        # Year's Day observed on the prior Friday, so we populate one extra year on
+        # either side and keep only the dates inside the requested years
+        populated_years = range(
+            max(first_year - 1, dt.MINYEAR), min(last_year + 1, dt.MAXYEAR) + 1
+        )
+        try:
+            country_holidays: Iterable[tuple[dt.date, str]] = holidays.country_holidays(
+                country_code, subdiv=subdivision, years=populated_years, expand=False
+            ).items()
+        except LIBRARY_YEAR_FAILURES:
+            country_holidays = [
+                holiday
+                for year in populated_years
+                for holiday in _populate_year(country_code, subdivision, year)
+            ]
+        return HolidayIndex.from_holidays(country_holidays, first_year, last_year)
+
+    @staticmethod
+    def concatenate(indexes: Sequence["HolidayIndex"]) -> Self:
+        """Joins indexes covering adjacent year ranges, given in chronological order."""
+        for previous, following in zip(indexes, indexes[1:]):
+            if previous.last_year + 1 != following.first_year:
+                raise ValueError("Indexes should cover adjacent years.")
+
+        ordinals: array = array("i")
+        names: list[str] = []
+        for index in indexes:
+            ordinals.extend(index._ordinals)
+            names.extend(index._names)
+        return HolidayIndex(
+            ordinals, tuple(names), indexes[0].first_year, indexes[-1].last_year
+        )
+
+    def covers(self, first_year: int, last_year: int) -> bool:
+        return self.first_year <= first_year and last_year <= self.last_year
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+    @property
+    def size_in_bytes(self) -> int:
+        """Approximate memory held by this index, counting each distinct name once."""
+        distinct_names: dict[int, str] = {id(name): name for name in self._names}
+        return (
+            sys.getsizeof(self._ordinals)
+            + sys.getsizeof(self._names)
+            + sum(sys.getsizeof(name) for name in distinct_names.values())
+        )
+
+    def __contains__(self, date: dt.date) -> bool:
+        return self._position(date.toordinal()) is not None
+
+    def _position(self, ordinal: int) -> int | None:
+        position: int = bisect_left(self._ordinals, ordinal)
+        if position < len(self._ordinals) and self._ordinals[position] == ordinal:
+            return position
+        return None
+
+    def _bounds(self, start: dt.date, end: dt.date) -> tuple[int, int]:
+        return (
+            bisect_left(self._ordinals, start.toordinal()),
+            bisect_right(self._ordinals, end.toordinal()),
+        )
+
+    def get_name(self, date: dt.date) -> str:
+        position: int | None = self._position(date.toordinal())
+        return self._names[position] if position is not None else ""
+
+    def between(self, start: dt.date, end: dt.date) -> Iterator[tuple[dt.date, str]]:
+        """Yields (date, holiday name) pairs with start <= date <= end, in order."""
+        low, high = self._bounds(start, end)
+        for position in range(low, high):
+            yield dt.date.fromordinal(self._ordinals[position]), self._names[position]
+
+    def following(self, date: dt.date) -> Iterator[tuple[dt.date, str]]:
+        """Yields (date, holiday name) pairs strictly after date, earliest first."""
+        for position in range(
+            bisect_right(self._ordinals, date.toordinal()), len(self._ordinals)
+        ):
+            yield dt.date.fromordinal(self._ordinals[position]), self._names[position]
+
+    def preceding(self, date: dt.date) -> Iterator[tuple[dt.date, str]]:
+        """Yields (date, holiday name) pairs strictly before date, latest first."""
+        for position in reversed(range(bisect_left(self._ordinals, date.toordinal()))):
+            yield dt.date.fromordinal(self._ordinals[position]), self._names[position]
+
+
+class LayeredHolidayIndex(HolidayIndex):
+    """
+    A subdivision's holidays, stored as differences from its country's index.
+
+    The overlay only holds dates where the subdivision disagrees with the country:
+    regional holidays, renamed holidays, and national holidays the subdivision does
+    not observe (stored with an empty name). The national index is shared by every
+    subdivision, so it is neither copied nor counted in size_in_bytes.
+    """
+
+    _base: HolidayIndex
+
+    def __init__(self, overlay: HolidayIndex, base: HolidayIndex):
+        if not base.covers(overlay.first_year, overlay.last_year):
+            raise ValueError("Base index should cover every year of the overlay.")
+        super().__init__(
+            overlay._ordinals, overlay._names, overlay.first_year, overlay.last_year
+        )
+        self._base = base
+
+    def __contains__(self, date: dt.date) -> bool:
+        return bool(self.get_name(date))
+
+    def get_name(self, date: dt.date) -> str:
+        position: int | None = self._position(date.toordinal())
+        if position is not None:
+            return self._names[position]
+        return self._base.get_name(date)
+
+    @staticmethod
+    def _layer(
+        base_holidays: Iterator[tuple[dt.date, str]],
+        overlay_holidays: Iterator[tuple[dt.date, str]],
+        reverse: bool = False,
+    ) -> Iterator[tuple[dt.date, str]]:
+        merged_holidays = heapq.merge(
+            base_holidays, overlay_holidays, key=itemgetter(0), reverse=reverse
+        )
+        # merge is stable, so on a shared date the overlay's entry comes last and wins
+        for day, holidays_on_day in groupby(merged_holidays, key=itemgetter(0)):
+            *_, (_, name) = holidays_on_day
+            if name:
+                yield day, name
+
+    def between(self, start: dt.date, end: dt.date) -> Iterator[tuple[dt.date, str]]:
+        return self._layer(self._base.between(start, end), super().between(start, end))
+
+    def following(self, date: dt.date) -> Iterator[tuple[dt.date, str]]:
+        # the base may cover more years than the overlay, so it is cut off where the
+        # overlay ends
+        last_day: dt.date = dt.date(self.last_year, 12, 31)
+        return self._layer(
+            takewhile(
+                lambda holiday: holiday[0] <= last_day, self._base.following(date)
+            ),
+            super().following(date),
+        )
+
+    def preceding(self, date: dt.date) -> Iterator[tuple[dt.date, str]]:
+        first_day: dt.date = dt.date(self.first_year, 1, 1)
+        return self._layer(
+            takewhile(
+                lambda holiday: first_day <= holiday[0], self._base.preceding(date)
+            ),
+            super().preceding(date),
+            reverse=True,
+        )
+
+
+class InvertedHolidayIndex:
+    """
+    Every country's holidays for a range of years, keyed by date.
+
+    Stored CSR style: a sorted array of the distinct dates that are a holiday
+    anywhere, and an offsets array such that the holidays on the i-th date occupy
+    positions offsets[i] to offsets[i + 1] of two packed arrays, one of country ids
+    and one of name ids. Countries are ordered by code within each date.
+    """
+
+    first_year: int
+    last_year: int
+
+    def __init__(
+        self,
+        ordinals: array,
+        offsets: array,
+        country_ids: array,
+        name_ids: array,
+        country_codes: tuple[str, ...],
+        names: tuple[str, ...],
+        first_year: int,
+        last_year: int,
+    ):
+        if len(offsets) != len(ordinals) + 1:
+            raise ValueError("There should be one more offset than dates.")
+        if len(country_ids) != len(name_ids):
+            raise ValueError("Country ids and name ids should be the same length.")
+        self._ordinals: array = ordinals
+        self._offsets: array = offsets
+        self._country_ids: array = country_ids
+        self._name_ids: array = name_ids
+        self._country_codes: tuple[str, ...] = country_codes
+        self._names: tuple[str, ...] = names
+        self.first_year = first_year
+        self.last_year = last_year
+
+    @staticmethod
+    def from_country_indexes(
+        country_indexes: Iterable[tuple[str, HolidayIndex]],
+        first_year: int,
+        last_year: int,
+    ) -> Self:
+        first_day, last_day = dt.date(first_year, 1, 1), dt.date(last_year, 12, 31)
+        sorted_indexes: list[tuple[str, HolidayIndex]] = sorted(
+            country_indexes, key=itemgetter(0)
+        )
+        name_ids: dict[str, int] = dict()
+        entries: list[tuple[int, int, int]] = sorted(
+            (day.toordinal(), country_id, name_ids.setdefault(name, len(name_ids)))
+            for country_id, (_, holiday_index) in enumerate(sorted_indexes)
+            for day, name in holiday_index.between(first_day, last_day)
+        )
+        ordinals: array = array("i")
+        offsets: array = array("i", [0])
+        for ordinal, entries_on_day in groupby(entries, key=itemgetter(0)):
+            ordinals.append(ordinal)
+            offsets.append(offsets[-1] + sum(1 for _ in entries_on_day))
+        return InvertedHolidayIndex(
+            ordinals,
+            offsets,
+            array("H", [country_id for _, country_id, _ in entries]),
+            array("I", [name_id for _, _, name_id in entries]),
+            tuple(country_code for country_code, _ in sorted_indexes),
+            tuple(name_ids),
+            first_year,
+            last_year,
+        )
+
+    def covers(self, first_year: int, last_year: int) -> bool:
+        return self.first_year <= first_year and last_year <= self.last_year
+
+    def __len__(self) -> int:
+        return len(self._country_ids)
+
+    @property
+    def size_in_bytes(self) -> int:
+        return (
+            sum(
+                sys.getsizeof(packed)
+                for packed in (
+                    self._ordinals,
+                    self._offsets,
+                    self._country_ids,
+                    self._name_ids,
+                )
+            )
+            + sys.getsizeof(self._names)
+            + sum(sys.getsizeof(name) for name in self._names)
+        )
+
+    def between(
+        self, start: dt.date, end: dt.date
+    ) -> Iterator[tuple[dt.date, str, str]]:
+        """Yields (date, country code, holiday name) with start <= date <= end."""
+        low: int = bisect_left(self._ordinals, start.toordinal())
+        high: int = bisect_right(self._ordinals, end.toordinal())
+        for position in range(low, high):
+            day: dt.date = dt.date.fromordinal(self._ordinals[position])
+            for entry in range(self._offsets[position], self._offsets[position + 1]):
+                yield (
+                    day,
+                    self._country_codes[self._country_ids[entry]],
+                    self._names[self._name_ids[entry]],
+                )
@@ -1,23 +1,41 @@
 import datetime as dt
+import hashlib
+import logging
+import os
 from dataclasses import dataclass
+from itertools import islice
 from typing import Self  # noqa PyCharm is not able to find Self, but it is there
-from typing import Optional
+from typing import Iterable, Iterator, Optional, Sequence
 
 import holidays
-import pycountry
 
 import src.logic.models as logic_models
+from src.logic.services.business_days import BusinessDayCalendar
+from src.logic.services.country_registry import CountryRegistry, RegisteredCountry
+from src.logic.services.holiday_dataset import DatasetError, HolidayDataset
+from src.logic.services.holiday_index import (
+    LIBRARY_YEAR_FAILURES,
+    HolidayIndex,
+    InvertedHolidayIndex,
+    LayeredHolidayIndex,
+)
+from src.logic.services.lru_cache import CacheStatistics, LRUCache
+from src.logic.services.single_flight import SingleFlight
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_HORIZON_YEARS = 5
+DEFAULT_MAX_CACHED_COUNTRIES = 64
+DEFAULT_MAX_CACHE_SIZE_IN_BYTES = 16 * 1024 * 1024
+DEFAULT_PINNED_COUNTRIES = ("US", "GB", "MX")
+DEFAULT_MAX_CACHED_WORLDWIDE_YEARS = 8
+MAX_HOLIDAY_SEARCH_YEARS = 25
+MAX_COMPUTED_YEARS = 200
+ITERATED_YEARS_PER_BLOCK = 20
 
-class ISOCountry:
-    alpha_2: str
-    alpha_3: str
-    flag: str
-    name: str
-    numeric: str
 
-    common_name: str | None
-    official_name: str | None
+class YearRangeError(ValueError):
+    ...
 
 
 @dataclass
@@ -27,65 +45,636 @@ class Country:
     flag: str
 
     @staticmethod
-    def parse_from_iso(iso_country: ISOCountry) -> Self:
-        return Country(iso_country.alpha_2, iso_country.name, iso_country.flag)
+    def parse_from_registry(registered_country: RegisteredCountry) -> Self:
+        return Country(
+            registered_country.alpha_2,
+            registered_country.name,
+            registered_country.flag,
+        )
 
 
 class HolidayService:
-    def __init__(self):
-        self._country_holidays_cache: dict[str, holidays.HolidayBase] = dict()
+    def __init__(
+        self,
+        horizon_years: int = DEFAULT_HORIZON_YEARS,
+        max_cached_countries: int = DEFAULT_MAX_CACHED_COUNTRIES,
+        max_cache_size_in_bytes: int = DEFAULT_MAX_CACHE_SIZE_IN_BYTES,
+        pinned_countries: Iterable[str] = DEFAULT_PINNED_COUNTRIES,
+        dataset_path: Optional[str] = None,
+        country_registry: Optional[CountryRegistry] = None,
+        max_cached_worldwide_years: int = DEFAULT_MAX_CACHED_WORLDWIDE_YEARS,
+    ):
+        self._horizon_years: int = horizon_years
+        self._dataset: Optional[HolidayDataset] = self._load_dataset(dataset_path)
+        self._country_holidays_cache: LRUCache[str, HolidayIndex] = LRUCache(
+            max_entries=max_cached_countries,
+            max_size_in_bytes=max_cache_size_in_bytes,
+            size_of=lambda holiday_index: holiday_index.size_in_bytes,
+            pinned_keys=pinned_countries,
+        )
+        self._extension_flights: SingleFlight[str, HolidayIndex] = SingleFlight()
+        self._worldwide_holidays_cache: LRUCache[int, InvertedHolidayIndex] = LRUCache(
+            max_entries=max_cached_worldwide_years,
+            max_size_in_bytes=max_cache_size_in_bytes,
+            size_of=lambda inverted_index: inverted_index.size_in_bytes,
+        )
+        self._worldwide_flights: SingleFlight[
+            int, InvertedHolidayIndex
+        ] = SingleFlight()
+        self._weekends: dict[str, frozenset[int]] = dict()
+        self._supported_subdivisions: dict[
+            str, list[str]
+        ] = holidays.list_supported_countries()
         self._cached_supported_countries: list[str] = list(
-            holidays.list_supported_countries().keys()
+            self._supported_subdivisions.keys()
+        )
+        self._country_registry: CountryRegistry = (
+            country_registry or CountryRegistry.load()
         )
         self._supported_countries: list[Country] = [
-            Country.parse_from_iso(pycountry.countries.get(alpha_2=abbreviation))
-            for abbreviation in self._cached_supported_countries
+            Country.parse_from_registry(self._country_registry.get_by_alpha_2(code))
+            for code in self._cached_supported_countries
+            if code in self._country_registry
         ]
+        self._supported_country_codes: frozenset[str] = frozenset(
+            country.abbreviation for country in self._supported_countries
+        )
+        # every response is a function of the holidays library and the registry, so
+        # this changes exactly when a cached response could go stale
+        self._data_version: str = hashlib.sha256(
+            repr(
+                (
+                    holidays.__version__,
+                    [repr(country) for country in self._country_registry],
+                )
+            ).encode()
+        ).hexdigest()[:16]
+
+    @staticmethod
+    def _load_dataset(dataset_path: Optional[str]) -> Optional[HolidayDataset]:
+        if dataset_path is None or not os.path.exists(dataset_path):
+            return None
+
+        try:
+            dataset: HolidayDataset = HolidayDataset.load(dataset_path)
+        except DatasetError as error:
+            logger.warning("Ignoring holiday dataset %s: %s", dataset_path, error)
+            return None
+
+        if dataset.library_version != holidays.__version__:
+            # a stale dataset would silently serve last release's holidays
+            logger.warning(
+                "Ignoring holiday dataset %s built with holidays %s, running %s.",
+                dataset_path,
+                dataset.library_version,
+                holidays.__version__,
+            )
+            return None
+        return dataset
+
+    @staticmethod
+    def _cache_key(country_code: str, subdivision: Optional[str]) -> str:
+        # ISO 3166-2 style, e.g. "US" for the whole country and "US-CA" for California
+        return country_code if subdivision is None else f"{country_code}-{subdivision}"
+
+    def _compute_subdivision_overlay(
+        self, country_code: str, subdivision: str, first_year: int, last_year: int
+    ) -> HolidayIndex:
+        first_day, last_day = dt.date(first_year, 1, 1), dt.date(last_year, 12, 31)
+        national_holidays: dict[dt.date, str] = dict(
+            self._get_cached_country_holidays(
+                country_code, first_year, last_year
+            ).between(first_day, last_day)
+        )
+        subdivision_holidays: dict[dt.date, str] = dict(
+            HolidayIndex.from_library(
+                country_code, subdivision, first_year, last_year
+            ).between(first_day, last_day)
+        )
+        differences: list[tuple[dt.date, str]] = [
+            (day, name)
+            for day, name in subdivision_holidays.items()
+            if national_holidays.get(day) != name
+        ] + [(day, "") for day in national_holidays if day not in subdivision_holidays]
+        return HolidayIndex.from_holidays(differences, first_year, last_year)
+
+    def _compute_holidays(
+        self,
+        country_code: str,
+        subdivision: Optional[str],
+        first_year: int,
+        last_year: int,
+    ) -> HolidayIndex:
+        if subdivision is None:
+            return HolidayIndex.from_library(country_code, None, first_year, last_year)
+        return self._compute_subdivision_overlay(
+            country_code, subdivision, first_year, last_year
+        )
+
+    def _get_cached_country_holidays(
+        self,
+        country_code: str,
+        first_year: int,
+        last_year: int,
+        subdivision: Optional[str] = None,
+    ) -> HolidayIndex:
+        if last_year - first_year + 1 > MAX_COMPUTED_YEARS:
+            raise YearRangeError(
+                f"Cannot look up more than {MAX_COMPUTED_YEARS} years at once."
+            )
+        return self._get_covering_holidays(
+            country_code, first_year, last_year, subdivision
+        )
+
+    def _get_covering_holidays(
+        self,
+        country_code: str,
+        first_year: int,
+        last_year: int,
+        subdivision: Optional[str] = None,
+    ) -> HolidayIndex:
+        cache_key: str = self._cache_key(country_code, subdivision)
+        holiday_index: Optional[HolidayIndex] = self._country_holidays_cache.get(
+            cache_key, None
+        )
+
+        # only one thread extends a given key at a time; the others wait for it and
+        # then check whether the years it added also cover their own request
+        while holiday_index is None or not holiday_index.covers(first_year, last_year):
+            holiday_index = self._extension_flights.run(
+                cache_key,
+                lambda: self._extend_cached_country_holidays(
+                    country_code, first_year, last_year, subdivision
+                ),
+            )
+
+        if subdivision is None:
+            return holiday_index
+        # a subdivision caches only its overlay and is layered over whichever national
+        # index is current, so extending the nation never leaves stale copies behind
+        return LayeredHolidayIndex(
+            holiday_index,
+            self._get_covering_holidays(
+                country_code, holiday_index.first_year, holiday_index.last_year
+            ),
+        )
+
+    def _extend_cached_country_holidays(
+        self,
+        country_code: str,
+        first_year: int,
+        last_year: int,
+        subdivision: Optional[str],
+    ) -> HolidayIndex:
+        cache_key: str = self._cache_key(country_code, subdivision)
+        cached_holidays: Optional[HolidayIndex] = self._country_holidays_cache.peek(
+            cache_key, None
+        )
+
+        if (
+            cached_holidays is None
+            and subdivision is None
+            and self._dataset is not None
+        ):
+            # prebuilt holidays are memory-mapped, so they cost no private memory
+            cached_holidays = self._dataset.get_country_holidays(country_code)
+            if cached_holidays is not None:
+                self._country_holidays_cache.put(cache_key, cached_holidays)
+
+        if cached_holidays is not None and cached_holidays.covers(
+            first_year, last_year
+        ):
+            return cached_holidays
+
+        is_far_from_cache: bool = (
+            cached_holidays is not None
+            and max(cached_holidays.first_year - first_year, 0)
+            + max(last_year - cached_holidays.last_year, 0)
+            > MAX_COMPUTED_YEARS
+        )
+        if cached_holidays is None or is_far_from_cache:
+            holiday_index = self._compute_holidays(
+                country_code, subdivision, first_year, last_year
+            )
+        else:
+            # only compute the years we are missing and stitch them onto either end
+            parts: list[HolidayIndex] = [cached_holidays]
+            if first_year < cached_holidays.first_year:
+                parts.insert(
+                    0,
+                    self._compute_holidays(
+                        country_code,
+                        subdivision,
+                        first_year,
+                        cached_holidays.first_year - 1,
+                    ),
+                )
+            if cached_holidays.last_year < last_year:
+                parts.append(
+                    self._compute_holidays(
+                        country_code,
+                        subdivision,
+                        cached_holidays.last_year + 1,
+                        last_year,
+                    )
+                )
+            holiday_index = HolidayIndex.concatenate(parts)
+
+        # the cached years must stay contiguous, and filling the gap up to a distant
+        # year would cost far more than answering it on its own, so only the years
+        # nearer today are kept
+        if not is_far_from_cache or self._distance_from_today(
+            holiday_index
+        ) < self._distance_from_today(cached_holidays):
+            self._country_holidays_cache.put(cache_key, holiday_index)
+        return holiday_index
+
+    @staticmethod
+    def _distance_from_today(holiday_index: HolidayIndex) -> int:
+        current_year: int = dt.date.today().year
+        return max(
+            holiday_index.first_year - current_year,
+            current_year - holiday_index.last_year,
+            0,
+        )
+
+    def _peek_country_holidays(
+        self,
+        country_code: str,
+        first_year: int,
+        last_year: int,
+        subdivision: Optional[str] = None,
+    ) -> HolidayIndex:
+        # reuse whatever already covers the years, but neither touch the LRU's recency
+        # nor fill it with every country in the world
+        cached_holidays: Optional[HolidayIndex] = self._country_holidays_cache.peek(
+            country_code, None
+        )
+        if cached_holidays is None and self._dataset is not None:
+            cached_holidays = self._dataset.get_country_holidays(country_code)
+        if subdivision is not None and cached_holidays is not None:
+            overlay: Optional[HolidayIndex] = self._country_holidays_cache.peek(
+                self._cache_key(country_code, subdivision), None
+            )
+            cached_holidays = (
+                LayeredHolidayIndex(overlay, cached_holidays)
+                if overlay is not None
+                and cached_holidays.covers(overlay.first_year, overlay.last_year)
+                else None
+            )
+        if cached_holidays is not None and cached_holidays.covers(
+            first_year, last_year
+        ):
+            return cached_holidays
+        try:
+            return HolidayIndex.from_library(
+                country_code, subdivision, first_year, last_year
+            )
+        except LIBRARY_YEAR_FAILURES as error:
+            # one country the library cannot compute must not fail the whole world
+            logger.warning(
+                "No %s holidays for %s..%s: %s",
+                self._cache_key(country_code, subdivision),
+                first_year,
+                last_year,
+                error,
+            )
+            return HolidayIndex.from_holidays([], first_year, last_year)
+
+    def _build_worldwide_holidays(self, year: int) -> InvertedHolidayIndex:
+        worldwide_holidays: InvertedHolidayIndex = (
+            InvertedHolidayIndex.from_country_indexes(
+                (
+                    (
+                        country.abbreviation,
+                        self._peek_country_holidays(country.abbreviation, year, year),
+                    )
+                    for country in self._supported_countries
+                ),
+                year,
+                year,
+            )
+        )
+        self._worldwide_holidays_cache.put(year, worldwide_holidays)
+        return worldwide_holidays
+
+    def _get_worldwide_holidays(self, year: int) -> InvertedHolidayIndex:
+        worldwide_holidays: Optional[
+            InvertedHolidayIndex
+        ] = self._worldwide_holidays_cache.get(year, None)
+        if worldwide_holidays is None:
+            worldwide_holidays = self._worldwide_flights.run(
+                year, lambda: self._build_worldwide_holidays(year)
+            )
+        return worldwide_holidays
 
-    def _get_cached_country_holidays(self, country_code: str) -> holidays.HolidayBase:
-        cached_holidays: Optional[
-            holidays.HolidayBase
-        ] = self._country_holidays_cache.get(country_code, None)
+    def is_cached(
+        self,
+        country_code: str,
+        first_year: int,
+        last_year: int,
+        subdivision: Optional[str] = None,
+    ) -> bool:
+        """Whether lookups over these years can be answered without computing any."""
+        national_holidays: Optional[HolidayIndex] = self._country_holidays_cache.peek(
+            country_code, None
+        )
+        if subdivision is None:
+            return national_holidays is not None and national_holidays.covers(
+                first_year, last_year
+            )
+        overlay: Optional[HolidayIndex] = self._country_holidays_cache.peek(
+            self._cache_key(country_code, subdivision), None
+        )
+        return (
+            overlay is not None
+            and overlay.covers(first_year, last_year)
+            and national_holidays is not None
+            and national_holidays.covers(overlay.first_year, overlay.last_year)
+        )
+
+    def is_worldwide_cached(self, first_year: int, last_year: int) -> bool:
+        return all(
+            year in self._worldwide_holidays_cache
+            for year in range(first_year, last_year + 1)
+        )
+
+    def get_cache_statistics(self) -> CacheStatistics:
+        return self._country_holidays_cache.get_statistics()
+
+    def prime_country_holidays(
+        self,
+        country_code: str,
+        horizon_years: Optional[int] = None,
+        subdivision: Optional[str] = None,
+    ) -> None:
+        """Pre-expands a country's cached holidays to the current year ± horizon."""
+        horizon: int = self._horizon_years if horizon_years is None else horizon_years
+        current_year: int = dt.date.today().year
+        self._get_cached_country_holidays(
+            country_code, current_year - horizon, current_year + horizon, subdivision
+        )
+
+    def prime_years(
+        self,
+        country_code: str,
+        first_year: int,
+        last_year: int,
+        subdivision: Optional[str] = None,
+    ) -> None:
+        """
+        Computes whichever of the years are not cached yet, all in one go.
+
+        Callers that then read the range a year at a time would otherwise extend the
+        cached index once per year, recopying it each time.
+        """
+        self._get_cached_country_holidays(
+            country_code, first_year, last_year, subdivision
+        )
 
-        if cached_holidays is None:
-            country_holidays = holidays.country_holidays(country_code)
-            # primes holidays to actually fetch its list of holidays
-            current_year: int = dt.date.today().year
-            one_hundred_years_ago: int = current_year - 100
-            one_hundred_years_from_now: int = current_year + 100
-            for year in range(one_hundred_years_ago, one_hundred_years_from_now):
-                country_holidays.get(f"01-01-{str(year)}")
-            self._country_holidays_cache[country_code] = country_holidays
-            return country_holidays
+    def warm_up(self, regions: Iterable[str], years: Sequence[int] = ()) -> None:
+        """
+        Computes holidays ahead of traffic for each "US" or "US-CA" style region.
 
-        return cached_holidays
+        Without years, each region is primed to the current year ± horizon.
+        """
+        for region in regions:
+            country_code, _, subdivision = region.partition("-")
+            if years:
+                self._get_cached_country_holidays(
+                    country_code, min(years), max(years), subdivision or None
+                )
+            else:
+                self.prime_country_holidays(
+                    country_code, subdivision=subdivision or None
+                )
 
-    def get_holiday_name(self, country_code: str, date: dt.date) -> str:
-        country_holidays: holidays.HolidayBase = self._get_cached_country_holidays(
-            country_code
+    def _get_business_day_calendar(
+        self, country_code: str, subdivision: Optional[str]
+    ) -> BusinessDayCalendar:
+        weekend: Optional[frozenset[int]] = self._weekends.get(country_code, None)
+        if weekend is None:
+            weekend = frozenset(
+                holidays.country_holidays(country_code, expand=False).weekend
+            )
+            self._weekends[country_code] = weekend
+
+        return BusinessDayCalendar(
+            weekend,
+            lambda first_year, last_year: self._get_cached_country_holidays(
+                country_code, first_year, last_year, subdivision
+            ),
+        )
+
+    def add_business_days(
+        self,
+        country_code: str,
+        date: dt.date,
+        days: int,
+        roll: logic_models.Roll = logic_models.Roll.FORWARD,
+        subdivision: Optional[str] = None,
+    ) -> dt.date:
+        calendar = self._get_business_day_calendar(country_code, subdivision)
+        return calendar.offset(date, days, roll)
+
+    def count_business_days(
+        self,
+        country_code: str,
+        start: dt.date,
+        end: dt.date,
+        subdivision: Optional[str] = None,
+    ) -> int:
+        calendar = self._get_business_day_calendar(country_code, subdivision)
+        return calendar.count(start, end)
+
+    def is_business_day(
+        self, country_code: str, date: dt.date, subdivision: Optional[str] = None
+    ) -> bool:
+        calendar = self._get_business_day_calendar(country_code, subdivision)
+        return calendar.is_business_day(date)
+
+    def roll_to_business_day(
+        self,
+        country_code: str,
+        date: dt.date,
+        roll: logic_models.Roll = logic_models.Roll.FORWARD,
+        subdivision: Optional[str] = None,
+    ) -> dt.date:
+        calendar = self._get_business_day_calendar(country_code, subdivision)
+        return calendar.roll(date, roll)
+
+    def get_holiday_name(
+        self, country_code: str, date: dt.date, subdivision: Optional[str] = None
+    ) -> str:
+        country_holidays: HolidayIndex = self._get_cached_country_holidays(
+            country_code, date.year, date.year, subdivision
+        )
+        return country_holidays.get_name(date)
+
+    def get_holiday_names(
+        self,
+        country_code: str,
+        dates: Sequence[dt.date],
+        subdivision: Optional[str] = None,
+    ) -> list[str]:
+        """Looks up many dates for one country against a single cached index."""
+        if not dates:
+            return []
+        if max(dates).year - min(dates).year + 1 > MAX_COMPUTED_YEARS:
+            return [
+                self.get_holiday_name(country_code, date, subdivision) for date in dates
+            ]
+        country_holidays: HolidayIndex = self._get_cached_country_holidays(
+            country_code,
+            min(date.year for date in dates),
+            max(date.year for date in dates),
+            subdivision,
         )
-        return country_holidays.get(date) if date in country_holidays else ""
+        return [country_holidays.get_name(date) for date in dates]
+
+    def get_data_version(self) -> str:
+        return self._data_version
+
+    def get_country_registry(self) -> CountryRegistry:
+        return self._country_registry
 
     def get_supported_countries(self) -> list[Country]:
         return self._supported_countries
 
+    def is_supported_country(self, country_code: str) -> bool:
+        return country_code in self._supported_country_codes
+
+    def get_supported_subdivisions(self, country_code: str) -> list[str]:
+        return self._supported_subdivisions.get(country_code, [])
+
     def get_upcoming_holidays(
-        self, country_code: str, start: dt.date, end: dt.date
+        self,
+        country_code: str,
+        start: dt.date,
+        end: dt.date,
+        subdivision: Optional[str] = None,
     ) -> list[logic_models.Holiday]:
-        country_holidays = self._get_cached_country_holidays(country_code)
-        upcoming_holiday_dates: list[dt.date] = sorted(
-            [
-                day
-                for day in country_holidays
-                if start <= dt.date(day.year, day.month, day.day) <= end
-            ]
+        country_holidays = self._get_cached_country_holidays(
+            country_code, start.year, end.year, subdivision
+        )
+        return [
+            logic_models.Holiday(holiday_name, day, country_code)
+            for day, holiday_name in country_holidays.between(start, end)
+        ]
+
+    def iter_holidays(
+        self,
+        country_code: str,
+        start: dt.date,
+        end: dt.date,
+        subdivision: Optional[str] = None,
+    ) -> Iterator[logic_models.Holiday]:
+        """
+        Like get_upcoming_holidays, but lazily, a block of years at a time.
+
+        The blocks are read from whatever is cached or computed on their own, so
+        iterating every country leaves the shared cache as it was.
+        """
+        for block_first_year in range(
+            start.year, end.year + 1, ITERATED_YEARS_PER_BLOCK
+        ):
+            block_last_year: int = min(
+                block_first_year + ITERATED_YEARS_PER_BLOCK - 1, end.year
+            )
+            country_holidays: HolidayIndex = self._peek_country_holidays(
+                country_code, block_first_year, block_last_year, subdivision
+            )
+            for day, holiday_name in country_holidays.between(
+                max(start, dt.date(block_first_year, 1, 1)),
+                min(end, dt.date(block_last_year, 12, 31)),
+            ):
+                yield logic_models.Holiday(holiday_name, day, country_code)
+
+    def _find_nearby_holidays(
+        self,
+        country_code: str,
+        date: dt.date,
+        count: int,
+        subdivision: Optional[str],
+        forward: bool,
+    ) -> list[logic_models.Holiday]:
+        # answer from whatever years are cached, and only when that falls short
+        # extend them a horizon at a time, up to MAX_HOLIDAY_SEARCH_YEARS away
+        if forward:
+            limit_year: int = min(date.year + MAX_HOLIDAY_SEARCH_YEARS, dt.MAXYEAR)
+        else:
+            limit_year = max(date.year - MAX_HOLIDAY_SEARCH_YEARS, dt.MINYEAR)
+        # a zero horizon would extend by nothing and search the same years forever
+        step: int = max(self._horizon_years, 1)
+        first_year = last_year = date.year
+        while True:
+            country_holidays: HolidayIndex = self._get_cached_country_holidays(
+                country_code, first_year, last_year, subdivision
+            )
+            nearby_holidays = (
+                country_holidays.following(date)
+                if forward
+                else country_holidays.preceding(date)
+            )
+            found: list[tuple[dt.date, str]] = list(islice(nearby_holidays, count))
+            searched_to_limit: bool = (
+                limit_year <= country_holidays.last_year
+                if forward
+                else country_holidays.first_year <= limit_year
+            )
+            if len(found) == count or searched_to_limit:
+                return [
+                    logic_models.Holiday(holiday_name, day, country_code)
+                    for day, holiday_name in found
+                ]
+            # ask only for the years between date and the search limit, whatever else
+            # the cached index happens to span, so the request stays within bounds
+            if forward:
+                last_year = min(country_holidays.last_year + step, limit_year)
+            else:
+                first_year = max(country_holidays.first_year - step, limit_year)
+
+    def next_holiday(
+        self,
+        country_code: str,
+        date: dt.date,
+        count: int = 1,
+        subdivision: Optional[str] = None,
+    ) -> list[logic_models.Holiday]:
+        """The first count holidays strictly after date, earliest first."""
+        return self._find_nearby_holidays(
+            country_code, date, count, subdivision, forward=True
+        )
+
+    def previous_holiday(
+        self,
+        country_code: str,
+        date: dt.date,
+        count: int = 1,
+        subdivision: Optional[str] = None,
+    ) -> list[logic_models.Holiday]:
+        """The last count holidays strictly before date, latest first."""
+        return self._find_nearby_holidays(
+            country_code, date, count, subdivision, forward=False
         )
+
+    def get_worldwide_holidays(
+        self, start: dt.date, end: dt.date
+    ) -> list[logic_models.Holiday]:
+        """Every supported country's holidays in the range, by date then country."""
         return [
-            logic_models.Holiday(country_holidays.get(day), day, country_code)
-            for day in upcoming_holiday_dates
+            logic_models.Holiday(holiday_name, day, country_code)
+            for year in range(start.year, end.year + 1)
+            for day, country_code, holiday_name in self._get_worldwide_holidays(
+                year
+            ).between(start, end)
         ]
 
-    def is_holiday(self, country_code: str, date: dt.date) -> bool:
-        country_holidays = self._get_cached_country_holidays(country_code)
+    def is_holiday(
+        self, country_code: str, date: dt.date, subdivision: Optional[str] = None
+    ) -> bool:
+        country_holidays = self._get_cached_country_holidays(
+            country_code, date.year, date.year, subdivision
+        )
         _is_holiday: bool = date in country_holidays
         return _is_holiday
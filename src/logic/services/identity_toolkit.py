@@ -0,0 +1,98 @@
+import importlib.util
+import logging
+import threading
+from typing import Optional
+
+import httpx
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+IDENTITY_TOOLKIT_URL = "https://www.googleapis.com/identitytoolkit/v3/relyingparty"
+SECURE_TOKEN_URL = "https://securetoken.googleapis.com/v1"
+
+
+class IdentityToolkitClient:
+    """
+    Pooled, keep-alive HTTP clients for Google's Identity Toolkit REST APIs.
+
+    A sync and an async client are kept side by side so both kinds of route handler
+    reuse warm TLS connections instead of handshaking with googleapis.com per call.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = IDENTITY_TOOLKIT_URL,
+        pool_size: int = settings.identity_toolkit_pool_size,
+        keepalive_seconds: float = settings.identity_toolkit_keepalive_seconds,
+        connect_timeout_seconds: float = (
+            settings.identity_toolkit_connect_timeout_seconds
+        ),
+        read_timeout_seconds: float = settings.identity_toolkit_read_timeout_seconds,
+        http2: bool = settings.identity_toolkit_http2,
+        transport: Optional[httpx.BaseTransport] = None,
+        async_transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 needs the h2 package; falling back to HTTP/1.1.")
+            http2 = False
+
+        self._client_options: dict = dict(
+            base_url=base_url,
+            params={"key": api_key},
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=keepalive_seconds,
+            ),
+            timeout=httpx.Timeout(
+                read_timeout_seconds, connect=connect_timeout_seconds
+            ),
+            http2=http2,
+        )
+        self._transport: Optional[httpx.BaseTransport] = transport
+        self._async_transport: Optional[httpx.AsyncBaseTransport] = async_transport
+        # building a client loads CA certificates, so it waits until the first request
+        self._lock: threading.Lock = threading.Lock()
+        self._client_instance: Optional[httpx.Client] = None
+        self._async_client_instance: Optional[httpx.AsyncClient] = None
+
+    @property
+    def _client(self) -> httpx.Client:
+        with self._lock:
+            if self._client_instance is None:
+                self._client_instance = httpx.Client(
+                    transport=self._transport, **self._client_options
+                )
+            return self._client_instance
+
+    @property
+    def _async_client(self) -> httpx.AsyncClient:
+        with self._lock:
+            if self._async_client_instance is None:
+                self._async_client_instance = httpx.AsyncClient(
+                    transport=self._async_transport, **self._client_options
+                )
+            return self._async_client_instance
+
+    def post(self, endpoint: str, body: dict, form: bool = False) -> httpx.Response:
+        if form:
+            return self._client.post(endpoint, data=body)
+        return self._client.post(endpoint, json=body)
+
+    async def post_async(
+        self, endpoint: str, body: dict, form: bool = False
+    ) -> httpx.Response:
+        if form:
+            return await self._async_client.post(endpoint, data=body)
+        return await self._async_client.post(endpoint, json=body)
+
+    def close(self) -> None:
+        if self._client_instance is not None:
+            self._client_instance.close()
+
+    async def close_async(self) -> None:
+        if self._async_client_instance is not None:
+            await self._async_client_instance.aclose()
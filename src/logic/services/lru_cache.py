@@ -0,0 +1,124 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, Iterable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class CacheStatistics:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size_in_bytes: int
+    max_entries: int
+    max_size_in_bytes: int
+
+
+class LRUCache(Generic[K, V]):
+    """
+    A least-recently-used cache bounded by both entry count and approximate size.
+
+    Pinned keys are never evicted, though they still count towards both budgets.
+    Every operation is guarded by a lock, so the cache can be shared across threads.
+    """
+
+    _entries: OrderedDict[K, V]
+    _sizes: dict[K, int]
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_size_in_bytes: int,
+        size_of: Callable[[V], int],
+        pinned_keys: Iterable[K] = (),
+    ):
+        if max_entries < 1:
+            raise ValueError("Cache should hold at least one entry.")
+        self._max_entries: int = max_entries
+        self._max_size_in_bytes: int = max_size_in_bytes
+        self._size_of: Callable[[V], int] = size_of
+        self._pinned_keys: frozenset[K] = frozenset(pinned_keys)
+        self._lock: threading.Lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._sizes = dict()
+        self._size_in_bytes: int = 0
+        self._hits: int = 0
+        self._misses: int = 0
+        self._evictions: int = 0
+
+    def __contains__(self, key: K) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __getitem__(self, key: K) -> V:
+        with self._lock:
+            return self._entries[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        with self._lock:
+            if key not in self._entries:
+                self._misses += 1
+                return default
+
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def peek(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """Like get, but touches neither recency nor statistics."""
+        with self._lock:
+            return self._entries.get(key, default)
+
+    def put(self, key: K, value: V) -> None:
+        size: int = self._size_of(value)
+        with self._lock:
+            if key in self._entries:
+                self._size_in_bytes -= self._sizes[key]
+
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self._size_in_bytes += size
+            self._evict()
+
+    def _is_over_budget(self) -> bool:
+        return (
+            len(self._entries) > self._max_entries
+            or self._size_in_bytes > self._max_size_in_bytes
+        )
+
+    def _evict(self) -> None:
+        # callers hold the lock; the most recently used entry is never evicted to
+        # make room for itself
+        most_recent_key: K = next(reversed(self._entries))
+        evictable_keys: list[K] = [
+            key
+            for key in self._entries
+            if key not in self._pinned_keys and key != most_recent_key
+        ]
+        for key in evictable_keys:
+            if not self._is_over_budget():
+                return
+            del self._entries[key]
+            self._size_in_bytes -= self._sizes.pop(key)
+            self._evictions += 1
+
+    def get_statistics(self) -> CacheStatistics:
+        with self._lock:
+            return CacheStatistics(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                size_in_bytes=self._size_in_bytes,
+                max_entries=self._max_entries,
+                max_size_in_bytes=self._max_size_in_bytes,
+            )
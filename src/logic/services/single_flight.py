@@ -0,0 +1,50 @@
+import threading
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class _Call(Generic[V]):
+    def __init__(self):
+        self.done: threading.Event = threading.Event()
+        self.result: Optional[V] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Coalesces concurrent calls for the same key into one.
+
+    The first caller for a key runs the function; callers that arrive while it is
+    running wait for it and share its result, or its exception.
+    """
+
+    def __init__(self):
+        self._lock: threading.Lock = threading.Lock()
+        self._calls: dict[K, _Call[V]] = dict()
+
+    def run(self, key: K, function: Callable[[], V]) -> V:
+        with self._lock:
+            call: Optional[_Call[V]] = self._calls.get(key, None)
+            is_leader: bool = call is None
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore
+
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
@@ -0,0 +1,55 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    A thread-safe cache whose entries each expire at their own deadline.
+
+    When full, the least recently used entry is dropped to make room.
+    """
+
+    _entries: OrderedDict[K, tuple[V, float]]
+
+    def __init__(self, max_entries: int, clock: Callable[[], float] = time.time):
+        if max_entries < 1:
+            raise ValueError("Cache should hold at least one entry.")
+        self._max_entries: int = max_entries
+        self._clock: Callable[[], float] = clock
+        self._lock: threading.Lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            entry: Optional[tuple[V, float]] = self._entries.get(key, None)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: K, value: V, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: K) -> Optional[V]:
+        with self._lock:
+            entry: Optional[tuple[V, float]] = self._entries.pop(key, None)
+            return entry[0] if entry is not None else None
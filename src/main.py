@@ -1,24 +1,93 @@
+import asyncio
+import contextlib
+import functools
+import logging
+from typing import AsyncIterator
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import PlainTextResponse
-from firebase_admin import App, initialize_app
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-from src.config import CredentialManager
+from src.config import initialize_firebase, settings
+from src.logic.services import holiday_service
+from src.logic.services.account_management import BackendUnavailableError
+from src.logic.services.holiday_index import LIBRARY_YEAR_FAILURES
+from src.logic.services.holiday_service import YearRangeError
 from src.view.routers.account_management_router import account_management_router
 from src.view.routers.holiday_router import holiday_router
 
-credential_manager = CredentialManager()
-firebase_app: App = initialize_app(credential_manager.get_firebase_cert())
+logger = logging.getLogger(__name__)
+
+# what warming a single region can raise: an unknown country or subdivision, too many
+# years, or an error from the holidays library itself
+LIBRARY_FAILURES = (KeyError, NotImplementedError, ValueError) + LIBRARY_YEAR_FAILURES
+
+
+def warm_up() -> None:
+    initialize_firebase()
+    for region in settings.warmup_countries:
+        try:
+            holiday_service.warm_up([region], settings.warmup_years)
+        except LIBRARY_FAILURES as error:
+            logger.warning("Could not warm up holidays for %s: %s", region, error)
+
+
+def finish_warm_up(application: FastAPI, warmup: asyncio.Future) -> None:
+    if warmup.cancelled():
+        return
+    error: BaseException | None = warmup.exception()
+    if error is not None:
+        logger.error(
+            "Warmup failed, so /ready will keep answering 503.", exc_info=error
+        )
+    application.state.ready = error is None
+
+
+@contextlib.asynccontextmanager
+async def lifespan(application: FastAPI) -> AsyncIterator[None]:
+    # startup completes straight away so the pod is live; /ready waits for warmup
+    application.state.ready = False
+    warmup = asyncio.get_running_loop().run_in_executor(None, warm_up)
+    warmup.add_done_callback(functools.partial(finish_warm_up, application))
+    yield
+    # a server that is shutting down should not be sent new traffic
+    application.state.ready = False
+
+
 app: FastAPI = FastAPI(title="Forget Me Nots")
+# FastAPI 0.88 does not take a lifespan argument yet, but its Starlette router does
+app.router.lifespan_context = lifespan
 app.include_router(holiday_router)
 app.include_router(account_management_router)
 
 
+@app.get("/ready", responses={503: {"description": "Still warming up."}})
+async def ready(request: Request):
+    is_ready: bool = getattr(request.app.state, "ready", False)
+    return JSONResponse({"ready": is_ready}, status_code=200 if is_ready else 503)
+
+
 @app.exception_handler(RequestValidationError)
 def validation_exception_handler(_, validation_error: RequestValidationError):
     return PlainTextResponse(str(validation_error), status_code=422)
 
 
+@app.exception_handler(YearRangeError)
+def year_range_exception_handler(_, error: YearRangeError):
+    return PlainTextResponse(str(error), status_code=422)
+
+
+@app.exception_handler(BackendUnavailableError)
+def backend_unavailable_exception_handler(_, error: BackendUnavailableError):
+    return PlainTextResponse(
+        str(error),
+        status_code=503,
+        headers={
+            "Retry-After": str(int(settings.circuit_breaker_reset_timeout_seconds))
+        },
+    )
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,87 @@
+import datetime as dt
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+from http import HTTPStatus
+from typing import Optional
+
+from fastapi import Request, Response
+
+from src.config import settings
+from src.logic.services import holiday_service
+
+CACHEABLE_METHODS = ("GET", "HEAD")
+
+
+def compute_etag(*query) -> str:
+    """Tags a response by the data version and the query that produced it."""
+    key: str = repr((holiday_service.get_data_version(), query))
+    return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+
+def caching_headers(
+    etag: str,
+    last_modified: Optional[dt.datetime] = None,
+    is_relative_to_today: bool = False,
+) -> dict[str, str]:
+    # an answer relative to today changes at midnight, so clients may keep it but
+    # must revalidate it before every use
+    headers: dict[str, str] = {
+        "ETag": etag,
+        "Cache-Control": "no-cache"
+        if is_relative_to_today
+        else f"public, max-age={settings.holiday_cache_max_age_seconds}",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def _parse_http_date(value: str) -> Optional[dt.datetime]:
+    try:
+        parsed: dt.datetime = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt.timezone.utc)
+    return parsed
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[dt.datetime] = None
+) -> bool:
+    # a failed If-None-Match on any other method calls for 412, not 304, so only
+    # safe methods are answered from the client's copy
+    if request.method not in CACHEABLE_METHODS:
+        return False
+    if_none_match: str | None = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags: set[str] = {
+            tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+        }
+        return "*" in tags or etag in tags
+
+    # If-Modified-Since only counts when the client sent no entity tags
+    if_modified_since: str | None = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    modified_since: Optional[dt.datetime] = _parse_http_date(if_modified_since)
+    return modified_since is not None and last_modified <= modified_since
+
+
+def not_modified(
+    etag: str,
+    last_modified: Optional[dt.datetime] = None,
+    is_relative_to_today: bool = False,
+) -> Response:
+    return Response(
+        status_code=HTTPStatus.NOT_MODIFIED,
+        headers=caching_headers(etag, last_modified, is_relative_to_today),
+    )
+
+
+def set_caching_headers(
+    response: Response, etag: str, is_relative_to_today: bool = False
+) -> None:
+    response.headers.update(
+        caching_headers(etag, is_relative_to_today=is_relative_to_today)
+    )
@@ -0,0 +1,165 @@
+"""
+Renders holidays as iCalendar (RFC 5545) subscription feeds.
+
+Each (country, subdivision, year) of VEVENTs is rendered once and cached, so a feed
+is assembled by concatenating cached fragments between a fixed header and footer.
+"""
+import datetime as dt
+from typing import Callable, Optional
+
+from src.config import settings
+from src.logic.services import holiday_service
+from src.logic.services.lru_cache import LRUCache
+
+MAX_CACHED_FRAGMENTS = 4096
+MAX_LINE_LENGTH_IN_OCTETS = 75
+CRLF = "\r\n"
+PRODUCT_IDENTIFIER = "-//Forget Me Nots//Holidays//EN"
+UID_DOMAIN = "forget-me-nots"
+
+
+def escape_text(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    """Splits a content line into 75-octet pieces without breaking a character."""
+    if len(line.encode()) <= MAX_LINE_LENGTH_IN_OCTETS:
+        return line + CRLF
+    pieces: list[str] = []
+    piece: str = ""
+    piece_size: int = 0
+    for character in line:
+        character_size: int = len(character.encode())
+        if piece_size + character_size > MAX_LINE_LENGTH_IN_OCTETS:
+            pieces.append(piece)
+            # continuation lines start with a space, which counts towards the limit
+            piece, piece_size = " ", 1
+        piece += character
+        piece_size += character_size
+    pieces.append(piece)
+    return CRLF.join(pieces) + CRLF
+
+
+def _format_date(date: dt.date) -> str:
+    return date.strftime("%Y%m%d")
+
+
+class CalendarFeeds:
+    """
+    Serves a rolling window of years around today as one feed per region.
+
+    The feed changes only when the data version changes or the window moves on New
+    Year's Day. Its DTSTAMPs and Last-Modified are that New Year's Day, and its ETag
+    carries the data version, so every worker and every restart serves the same bytes
+    under the same validators.
+    """
+
+    def __init__(
+        self,
+        max_size_in_bytes: int,
+        past_years: int = settings.calendar_feed_past_years,
+        future_years: int = settings.calendar_feed_future_years,
+        today: Callable[[], dt.date] = dt.date.today,
+    ):
+        self._past_years: int = past_years
+        self._future_years: int = future_years
+        self._today: Callable[[], dt.date] = today
+        self._fragments: LRUCache[
+            tuple[str, Optional[str], int, dt.datetime], bytes
+        ] = LRUCache(
+            max_entries=MAX_CACHED_FRAGMENTS,
+            max_size_in_bytes=max_size_in_bytes,
+            size_of=len,
+        )
+
+    def get_years(self) -> range:
+        year: int = self._today().year
+        return range(year - self._past_years, year + self._future_years + 1)
+
+    def get_last_modified(self) -> dt.datetime:
+        return dt.datetime(self._today().year, 1, 1, tzinfo=dt.timezone.utc)
+
+    def _render_fragment(
+        self,
+        country_code: str,
+        subdivision: Optional[str],
+        year: int,
+        last_modified: dt.datetime,
+    ) -> bytes:
+        region: str = f"{country_code}-{subdivision}" if subdivision else country_code
+        stamp: str = last_modified.strftime("%Y%m%dT%H%M%SZ")
+        lines: list[str] = []
+        for holiday in holiday_service.get_upcoming_holidays(
+            country_code, dt.date(year, 1, 1), dt.date(year, 12, 31), subdivision
+        ):
+            lines += [
+                "BEGIN:VEVENT",
+                f"UID:{_format_date(holiday.date)}-{region.lower()}@{UID_DOMAIN}",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART;VALUE=DATE:{_format_date(holiday.date)}",
+                f"DTEND;VALUE=DATE:{_format_date(holiday.date + dt.timedelta(1))}",
+                f"SUMMARY:{escape_text(holiday.holiday_name)}",
+                "TRANSP:TRANSPARENT",
+                "END:VEVENT",
+            ]
+        return "".join(fold_line(line) for line in lines).encode()
+
+    def _get_fragment(
+        self,
+        country_code: str,
+        subdivision: Optional[str],
+        year: int,
+        last_modified: dt.datetime,
+    ) -> bytes:
+        key: tuple[str, Optional[str], int, dt.datetime] = (
+            country_code,
+            subdivision,
+            year,
+            last_modified,
+        )
+        fragment: Optional[bytes] = self._fragments.get(key)
+        if fragment is None:
+            fragment = self._render_fragment(
+                country_code, subdivision, year, last_modified
+            )
+            self._fragments.put(key, fragment)
+        return fragment
+
+    def get_feed(self, country_code: str, subdivision: Optional[str] = None) -> bytes:
+        registered_country = holiday_service.get_country_registry().get_by_alpha_2(
+            country_code
+        )
+        name: str = registered_country.name if registered_country else country_code
+        last_modified: dt.datetime = self.get_last_modified()
+        if subdivision:
+            name = f"{name} ({subdivision})"
+        header: str = "".join(
+            fold_line(line)
+            for line in (
+                "BEGIN:VCALENDAR",
+                "VERSION:2.0",
+                f"PRODID:{PRODUCT_IDENTIFIER}",
+                "CALSCALE:GREGORIAN",
+                "METHOD:PUBLISH",
+                f"X-WR-CALNAME:{escape_text(f'{name} holidays')}",
+            )
+        )
+        return b"".join(
+            [
+                header.encode(),
+                *(
+                    self._get_fragment(country_code, subdivision, year, last_modified)
+                    for year in self.get_years()
+                ),
+                fold_line("END:VCALENDAR").encode(),
+            ]
+        )
+
+
+calendar_feeds = CalendarFeeds(settings.calendar_fragment_cache_size_in_bytes)
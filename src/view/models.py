@@ -1,12 +1,21 @@
 import datetime as dt
 import uuid
 from http import HTTPStatus
+from typing import Any
 
 import humps  # noqa, PyCharm confuses pyhumps and humps packages
-import pycountry
 from fastapi import HTTPException
-from pydantic import BaseModel, EmailStr, Field, root_validator
-
+from fastapi.exceptions import RequestValidationError
+from pydantic import (
+    BaseModel,
+    EmailStr,
+    Field,
+    ValidationError,
+    root_validator,
+    validator,
+)
+
+from src.logic.models import Roll
 from src.logic.services import holiday_service
 from src.logic.services.account_management import generate_strong_password
 
@@ -17,9 +26,8 @@ def _convert_to_camel_case(string: str) -> str:
 
 EXAMPLE_EMAIL = f"ben+{str(uuid.uuid4())}@nathanson.dev"
 EXAMPLE_PASSWORD = generate_strong_password()
-SUPPORTED_COUNTRY_ABBREVIATIONS: list[str] = [
-    c.abbreviation for c in holiday_service.get_supported_countries()
-]
+MAX_BATCH_SIZE = 10_000
+MAX_BUSINESS_DAYS_OFFSET = 25_000
 
 
 class ViewModel(BaseModel):
@@ -43,17 +51,38 @@ class CountryAbbreviation(str):
                 "Country abbreviation should be no more than two characters."
             )
 
-        country = pycountry.countries.get(alpha_2=v)
-        if country is None:
-            raise NotImplementedError(f"'{v}' has not been implemented.")
-
-        if country.alpha_2 not in SUPPORTED_COUNTRY_ABBREVIATIONS:
+        if not holiday_service.is_supported_country(v.upper()):
             raise NotImplementedError(f"'{v}' has not been implemented.")
-        return v
+        # the holidays library and every cache downstream expect upper case
+        return v.upper()
 
 
-class UpcomingHolidaysPayload(ViewModel):
+class CountryPayload(ViewModel):
     country_abbreviation: CountryAbbreviation
+    subdivision: str | None = Field(
+        default=None,
+        description="Optional state, province or region code, e.g. 'CA' for "
+        "California in the United States.",
+    )
+
+    @validator("subdivision")
+    def subdivision_must_be_supported(cls, subdivision, values):
+        if subdivision is None:
+            return subdivision
+
+        country_abbreviation = values.get("country_abbreviation")
+        supported_subdivisions = holiday_service.get_supported_subdivisions(
+            country_abbreviation
+        )
+        if subdivision not in supported_subdivisions:
+            raise ValueError(
+                f"'{subdivision}' is not a supported subdivision of "
+                f"'{country_abbreviation}'."
+            )
+        return subdivision
+
+
+class UpcomingHolidaysPayload(CountryPayload):
     start_date: dt.date
     end_date: dt.date
 
@@ -86,8 +115,7 @@ class UpcomingHolidaysPayload(ViewModel):
         }
 
 
-class HolidayBasePayload(ViewModel):
-    country_abbreviation: CountryAbbreviation
+class HolidayBasePayload(CountryPayload):
     date: dt.date = dt.date.today()  # type: ignore
 
     class Config:
@@ -111,6 +139,160 @@ class IsHolidayResponse(ViewModel):
         schema_extra = {"example": {"holidayName": "Labor Day", "isHoliday": True}}
 
 
+class BatchIsHolidayPayload(ViewModel):
+    """
+    Either a list of (country, date) items, or one country with a list of dates.
+
+    Items and dates are deliberately left unvalidated here so that one bad entry
+    is reported in its own result instead of rejecting the whole batch.
+    """
+
+    items: list[Any] | None = Field(default=None, max_items=MAX_BATCH_SIZE)
+    country_abbreviation: str | None = None
+    dates: list[Any] | None = Field(default=None, max_items=MAX_BATCH_SIZE)
+
+    @root_validator
+    def exactly_one_form_must_be_populated(cls, values):
+        has_items: bool = values.get("items") is not None
+        has_dates: bool = values.get("dates") is not None
+        if has_items == has_dates:
+            raise ValueError(
+                "Provide either items, or a country abbreviation and dates."
+            )
+
+        if has_dates and values.get("country_abbreviation") is None:
+            raise ValueError("A country abbreviation is required alongside dates.")
+        return values
+
+    def get_raw_items(self) -> list[Any]:
+        if self.items is not None:
+            return self.items
+        return [
+            {"country_abbreviation": self.country_abbreviation, "date": date}
+            for date in self.dates or []
+        ]
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "items": [
+                    {"countryAbbreviation": "US", "date": "2022-07-04"},
+                    {"countryAbbreviation": "MX", "date": "2022-09-16"},
+                ]
+            }
+        }
+
+
+def parse_query_payload(payload_class: type[CountryPayload], **values) -> Any:
+    """
+    Validates path and query parameters with the model used for JSON bodies.
+
+    Parameters left out of the query are left out of the model too, so its defaults
+    apply exactly as they would for a body that omits them.
+    """
+    try:
+        return payload_class(
+            **{name: value for name, value in values.items() if value is not None}
+        )
+    except ValidationError as error:
+        raise RequestValidationError(error.raw_errors)
+    except NotImplementedError as error:
+        raise HTTPException(HTTPStatus.NOT_IMPLEMENTED, detail=str(error))
+
+
+def parse_holiday_base_payload(raw_item: Any) -> HolidayBasePayload | str:
+    """Returns the parsed payload, or a description of why it is invalid."""
+    if not isinstance(raw_item, dict):
+        return "Item should be an object."
+    try:
+        return HolidayBasePayload.parse_obj(raw_item)
+    except ValidationError as error:
+        return _describe_validation_error(error)
+    except NotImplementedError as error:
+        return str(error)
+
+
+def _describe_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(location) for location in e['loc'])}: {e['msg']}"
+        for e in error.errors()
+    )
+
+
+class BatchIsHolidayResult(ViewModel):
+    country_abbreviation: str | None = None
+    date: dt.date | None = None
+    holiday_name: str | None = None
+    is_holiday: bool | None = None
+    error: str | None = None
+
+
+class BatchIsHolidayResponse(ViewModel):
+    results: list[BatchIsHolidayResult]
+
+
+class AddBusinessDaysPayload(CountryPayload):
+    date: dt.date
+    days: int = Field(
+        ge=-MAX_BUSINESS_DAYS_OFFSET,
+        le=MAX_BUSINESS_DAYS_OFFSET,
+        description="Business days to move by, negative to move backward.",
+    )
+    roll: Roll = Field(
+        default=Roll.FORWARD,
+        description="Where to move the starting date first, if it is not a business "
+        "day.",
+    )
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "countryAbbreviation": "US",
+                "date": dt.date(year=2022, month=7, day=1),
+                "days": 3,
+                "roll": Roll.FORWARD,
+            }
+        }
+
+
+class CountBusinessDaysPayload(CountryPayload):
+    start_date: dt.date
+    end_date: dt.date = Field(
+        description="Exclusive. The count is negative if this precedes the start date."
+    )
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "countryAbbreviation": "US",
+                "startDate": dt.date(year=2022, month=7, day=1),
+                "endDate": dt.date(year=2022, month=8, day=1),
+            }
+        }
+
+
+class RollToBusinessDayPayload(CountryPayload):
+    date: dt.date
+    roll: Roll = Roll.FORWARD
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "countryAbbreviation": "US",
+                "date": dt.date(year=2022, month=7, day=4),
+                "roll": Roll.FORWARD,
+            }
+        }
+
+
+class BusinessDayResponse(ViewModel):
+    date: dt.date
+
+
+class BusinessDayCountResponse(ViewModel):
+    business_days: int
+
+
 class Holiday(ViewModel):
     holiday_name: str
     date: dt.date
@@ -152,6 +334,42 @@ class CreateUserPayload(ViewModel):
         }
 
 
+class BulkCreateUsersPayload(ViewModel):
+    """
+    Users are deliberately left unvalidated here so that one bad user is reported
+    in its own result instead of rejecting the whole import.
+    """
+
+    users: list[Any] = Field(min_items=1, max_items=MAX_BATCH_SIZE)
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "users": [{"email": EXAMPLE_EMAIL, "password": EXAMPLE_PASSWORD}]
+            }
+        }
+
+
+def parse_create_user_payload(raw_user: Any) -> CreateUserPayload | str:
+    """Returns the parsed payload, or a description of why it is invalid."""
+    if not isinstance(raw_user, dict):
+        return "User should be an object."
+    try:
+        return CreateUserPayload.parse_obj(raw_user)
+    except ValidationError as error:
+        return _describe_validation_error(error)
+
+
+class BulkCreateUserResult(ViewModel):
+    email: str | None = None
+    created: bool
+    error: str | None = None
+
+
+class BulkCreateUsersResponse(ViewModel):
+    results: list[BulkCreateUserResult]
+
+
 class LoginPayload(ViewModel):
     email: EmailStr
     password: str
@@ -172,6 +390,25 @@ class LoginResponse(ViewModel):
     )
 
 
+class RefreshPayload(ViewModel):
+    access_token: str = Field(
+        description="The long-lived token returned by login. Also known as a refresh "
+        "token."
+    )
+
+
+class CircuitBreakerStatus(ViewModel):
+    name: str
+    state: str = Field(description="One of closed, open or half_open.")
+    consecutive_failures: int
+    failures: int
+    rejections: int
+
+
+class BackendStatusResponse(ViewModel):
+    circuit_breakers: list[CircuitBreakerStatus]
+
+
 class IdTokenResponse(ViewModel):
     id_token: str = Field(description="Short-lived JSON web token (JWT).")
 
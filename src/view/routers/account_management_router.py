@@ -6,6 +6,7 @@ from src.logic.services.account_management import (
     AccountManagementService,
     AuthenticationError,
     SessionToken,
+    UserImportOutcome,
 )
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/token")
@@ -16,21 +17,62 @@ account_management_service = AccountManagementService()
 
 
 @account_management_router.post("/create")
-def create_user(payload: view_models.CreateUserPayload):
+async def create_user(payload: view_models.CreateUserPayload):
     try:
-        account_management_service.create_user(payload.email, payload.password)
+        await account_management_service.create_user_async(
+            payload.email, payload.password
+        )
     except ValueError as error:
         raise HTTPException(status_code=422, detail=str(error))
 
 
+@account_management_router.post(
+    "/create/bulk", response_model=view_models.BulkCreateUsersResponse
+)
+async def create_users(payload: view_models.BulkCreateUsersPayload):
+    parsed_users = [
+        view_models.parse_create_user_payload(raw_user) for raw_user in payload.users
+    ]
+    outcomes: list[
+        UserImportOutcome
+    ] = await account_management_service.import_users_async(
+        [
+            (user.email, user.password)
+            for user in parsed_users
+            if isinstance(user, view_models.CreateUserPayload)
+        ]
+    )
+
+    imported_outcomes = iter(outcomes)
+    results: list[view_models.BulkCreateUserResult] = []
+    for raw_user, user in zip(payload.users, parsed_users):
+        if isinstance(user, str):
+            email = raw_user.get("email") if isinstance(raw_user, dict) else None
+            results.append(
+                view_models.BulkCreateUserResult(
+                    email=email if isinstance(email, str) else None,
+                    created=False,
+                    error=user,
+                )
+            )
+            continue
+        outcome: UserImportOutcome = next(imported_outcomes)
+        results.append(
+            view_models.BulkCreateUserResult(
+                email=outcome.email, created=outcome.error is None, error=outcome.error
+            )
+        )
+    return view_models.BulkCreateUsersResponse(results=results)
+
+
 @account_management_router.post(
     "/login",
     response_model=view_models.LoginResponse,
     responses={403: {"description": "Authentication error."}},
 )
-def login(payload: view_models.LoginPayload):
+async def login(payload: view_models.LoginPayload):
     try:
-        session_token: SessionToken = account_management_service.login(
+        session_token: SessionToken = await account_management_service.login_async(
             payload.email, payload.password
         )
     except AuthenticationError as error:
@@ -43,16 +85,36 @@ def login(payload: view_models.LoginPayload):
     )
 
 
+@account_management_router.post(
+    "/refresh",
+    response_model=view_models.LoginResponse,
+    responses={403: {"description": "Authentication error."}},
+)
+async def refresh(payload: view_models.RefreshPayload):
+    try:
+        session_token: SessionToken = await account_management_service.refresh_async(
+            payload.access_token
+        )
+    except AuthenticationError as error:
+        raise HTTPException(status_code=403, detail=str(error))
+    return view_models.LoginResponse(
+        email=session_token.email,
+        expires_in=session_token.expires_in,
+        id_token=session_token.id_token,
+        access_token=session_token.access_token,
+    )
+
+
 @account_management_router.post("/logout")
-def logout(id_token: str = Depends(oauth2_scheme)):
-    account_management_service.logout(id_token)
+async def logout(id_token: str = Depends(oauth2_scheme)):
+    await account_management_service.logout_async(id_token)
 
 
 @account_management_router.post(
     "/token", response_model=view_models.Rfc6749TokenResponse
 )
-def create_token(form_data: OAuth2PasswordRequestForm = Depends()):
-    session_token: SessionToken = account_management_service.login(
+async def create_token(form_data: OAuth2PasswordRequestForm = Depends()):
+    session_token: SessionToken = await account_management_service.login_async(
         form_data.username, form_data.password
     )
     return view_models.Rfc6749TokenResponse(
@@ -67,9 +129,27 @@ def create_token(form_data: OAuth2PasswordRequestForm = Depends()):
     response_model=view_models.IdTokenResponse,
     responses={403: {"description": "Authentication error."}},
 )
-def verify_oauth_token(id_token: str = Depends(oauth2_scheme)):
+async def verify_oauth_token(id_token: str = Depends(oauth2_scheme)):
     try:
-        account_management_service.verify_token_and_get_user(id_token)
+        await account_management_service.verify_token_and_get_user_async(id_token)
         return view_models.IdTokenResponse(id_token=id_token)
     except AuthenticationError as error:
         raise HTTPException(status_code=403, detail=str(error))
+
+
+@account_management_router.get(
+    "/backend-status", response_model=view_models.BackendStatusResponse
+)
+async def backend_status():
+    return view_models.BackendStatusResponse(
+        circuit_breakers=[
+            view_models.CircuitBreakerStatus(
+                name=statistics.name,
+                state=statistics.state.value,
+                consecutive_failures=statistics.consecutive_failures,
+                failures=statistics.failures,
+                rejections=statistics.rejections,
+            )
+            for statistics in account_management_service.get_circuit_breaker_statistics()
+        ]
+    )
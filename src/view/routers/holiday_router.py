@@ -1,7 +1,33 @@
-from fastapi import APIRouter
+import datetime as dt
+from collections import defaultdict
+from http import HTTPStatus
+from typing import Callable, TypeVar
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
 import src.view.models as view_models
 from src.logic.services import holiday_service
+from src.logic.services.holiday_service import MAX_COMPUTED_YEARS
+from src.view.http_caching import (
+    caching_headers,
+    compute_etag,
+    is_not_modified,
+    not_modified,
+    set_caching_headers,
+)
+from src.view.icalendar import calendar_feeds
+from src.view.serialization import (
+    encode_holidays,
+    iter_holiday_export,
+    serialized_responses,
+)
+
+MAX_NEARBY_HOLIDAYS = 100
+MAX_WORLDWIDE_RANGE_IN_DAYS = 366
+
+T = TypeVar("T")
 
 holiday_router = APIRouter(
     prefix="/holidays",
@@ -9,34 +35,179 @@ holiday_router = APIRouter(
 )
 
 
+async def _answer(is_cached: bool, function: Callable[..., T], *args) -> T:
+    # a cache miss can run the holidays library for seconds, or wait for another
+    # thread that is computing the same country, so only lookups the cached indexes
+    # already cover are answered on the event loop
+    if is_cached:
+        return function(*args)
+    return await run_in_threadpool(function, *args)
+
+
 @holiday_router.post(
     "/is-it-a-holiday",
     response_model=view_models.IsHolidayResponse,
     responses={501: {"model": view_models.NotImplementedResponse}},
 )
-def is_it_a_holiday(payload: view_models.HolidayBasePayload):
-    return view_models.IsHolidayResponse(
-        is_holiday=holiday_service.is_holiday(
-            payload.country_abbreviation, payload.date
+async def is_it_a_holiday(payload: view_models.HolidayBasePayload):
+    return await _answer(
+        holiday_service.is_cached(
+            payload.country_abbreviation,
+            payload.date.year,
+            payload.date.year,
+            payload.subdivision,
         ),
-        holiday_name=holiday_service.get_holiday_name(
-            payload.country_abbreviation, payload.date
+        _is_it_a_holiday,
+        payload,
+    )
+
+
+def _is_it_a_holiday(
+    payload: view_models.HolidayBasePayload,
+) -> view_models.IsHolidayResponse:
+    holiday_name: str = holiday_service.get_holiday_name(
+        payload.country_abbreviation, payload.date, payload.subdivision
+    )
+    return view_models.IsHolidayResponse(
+        is_holiday=bool(holiday_name),
+        holiday_name=holiday_name,
+    )
+
+
+@holiday_router.post(
+    "/is-it-a-holiday/batch", response_model=view_models.BatchIsHolidayResponse
+)
+async def is_it_a_holiday_batch(payload: view_models.BatchIsHolidayPayload):
+    parsed_items = [
+        view_models.parse_holiday_base_payload(raw_item)
+        for raw_item in payload.get_raw_items()
+    ]
+
+    # group positions by region so each region's index is fetched only once
+    positions_by_region: dict[tuple[str, str | None], list[int]] = defaultdict(list)
+    for position, item in enumerate(parsed_items):
+        if isinstance(item, view_models.HolidayBasePayload):
+            region = (item.country_abbreviation, item.subdivision)
+            positions_by_region[region].append(position)
+    dates_by_region: dict[tuple[str, str | None], list[dt.date]] = {
+        region: [parsed_items[p].date for p in positions]
+        for region, positions in positions_by_region.items()
+    }
+
+    names_by_region: dict[tuple[str, str | None], list[str]] = await _answer(
+        all(
+            holiday_service.is_cached(
+                country_abbreviation,
+                min(dates).year,
+                max(dates).year,
+                subdivision,
+            )
+            for (country_abbreviation, subdivision), dates in dates_by_region.items()
         ),
+        _get_holiday_names_by_region,
+        dates_by_region,
     )
+    holiday_names: dict[int, str] = dict()
+    for region, positions in positions_by_region.items():
+        holiday_names.update(zip(positions, names_by_region[region]))
+
+    results: list[view_models.BatchIsHolidayResult] = []
+    for position, item in enumerate(parsed_items):
+        if isinstance(item, str):
+            results.append(view_models.BatchIsHolidayResult(error=item))
+            continue
+        results.append(
+            view_models.BatchIsHolidayResult(
+                country_abbreviation=item.country_abbreviation,
+                date=item.date,
+                holiday_name=holiday_names[position],
+                is_holiday=bool(holiday_names[position]),
+            )
+        )
+    return view_models.BatchIsHolidayResponse(results=results)
+
+
+def _get_holiday_names_by_region(
+    dates_by_region: dict[tuple[str, str | None], list[dt.date]]
+) -> dict[tuple[str, str | None], list[str]]:
+    return {
+        (country_abbreviation, subdivision): holiday_service.get_holiday_names(
+            country_abbreviation, dates, subdivision
+        )
+        for (country_abbreviation, subdivision), dates in dates_by_region.items()
+    }
+
+
+# business-day arithmetic can walk into years nobody has asked for yet, so it always
+# runs off the event loop
+@holiday_router.post(
+    "/business-days/add",
+    response_model=view_models.BusinessDayResponse,
+    responses={501: {"model": view_models.NotImplementedResponse}},
+)
+async def add_business_days(payload: view_models.AddBusinessDaysPayload):
+    try:
+        date: dt.date = await run_in_threadpool(
+            holiday_service.add_business_days,
+            payload.country_abbreviation,
+            payload.date,
+            payload.days,
+            payload.roll,
+            payload.subdivision,
+        )
+    except (OverflowError, ValueError) as error:
+        raise HTTPException(HTTPStatus.UNPROCESSABLE_ENTITY, detail=str(error))
+    return view_models.BusinessDayResponse(date=date)
+
+
+@holiday_router.post(
+    "/business-days/count",
+    response_model=view_models.BusinessDayCountResponse,
+    responses={501: {"model": view_models.NotImplementedResponse}},
+)
+async def count_business_days(payload: view_models.CountBusinessDaysPayload):
+    return view_models.BusinessDayCountResponse(
+        business_days=await run_in_threadpool(
+            holiday_service.count_business_days,
+            payload.country_abbreviation,
+            payload.start_date,
+            payload.end_date,
+            payload.subdivision,
+        )
+    )
+
+
+@holiday_router.post(
+    "/business-days/roll",
+    response_model=view_models.BusinessDayResponse,
+    responses={501: {"model": view_models.NotImplementedResponse}},
+)
+async def roll_to_business_day(payload: view_models.RollToBusinessDayPayload):
+    try:
+        date: dt.date = await run_in_threadpool(
+            holiday_service.roll_to_business_day,
+            payload.country_abbreviation,
+            payload.date,
+            payload.roll,
+            payload.subdivision,
+        )
+    except (OverflowError, ValueError) as error:
+        raise HTTPException(HTTPStatus.UNPROCESSABLE_ENTITY, detail=str(error))
+    return view_models.BusinessDayResponse(date=date)
 
 
 @holiday_router.get(
     "/supported-countries", response_model=list[view_models.CountryResponse]
 )
-def supported_countries():
-    return [
-        view_models.CountryResponse(
-            country_abbreviation=country.abbreviation,
-            name=country.name,
-            flag=country.flag,
-        )
-        for country in holiday_service.get_supported_countries()
-    ]
+async def supported_countries(request: Request):
+    etag: str = compute_etag("supported-countries")
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    return Response(
+        serialized_responses.get_supported_countries(),
+        media_type="application/json",
+        headers=caching_headers(etag),
+    )
 
 
 @holiday_router.post(
@@ -44,17 +215,341 @@ def supported_countries():
     response_model=list[view_models.Holiday],
     responses={501: {"model": view_models.NotImplementedResponse}},
 )
-def upcoming_holidays(payload: view_models.UpcomingHolidaysPayload):
-    upcoming_holiday_results = holiday_service.get_upcoming_holidays(
+async def upcoming_holidays(
+    payload: view_models.UpcomingHolidaysPayload, request: Request
+):
+    return await _upcoming_holidays(payload, request)
+
+
+async def _upcoming_holidays(
+    payload: view_models.UpcomingHolidaysPayload,
+    request: Request,
+    is_relative_to_today: bool = False,
+) -> Response:
+    etag: str = compute_etag(
+        "upcoming-holidays",
         payload.country_abbreviation,
+        payload.subdivision,
         payload.start_date,
         payload.end_date,
     )
+    if is_not_modified(request, etag):
+        return not_modified(etag, is_relative_to_today=is_relative_to_today)
+    return Response(
+        await _answer(
+            holiday_service.is_cached(
+                payload.country_abbreviation,
+                payload.start_date.year,
+                payload.end_date.year,
+                payload.subdivision,
+            ),
+            serialized_responses.get_upcoming_holidays,
+            payload.country_abbreviation,
+            payload.start_date,
+            payload.end_date,
+            payload.subdivision,
+        ),
+        media_type="application/json",
+        headers=caching_headers(etag, is_relative_to_today=is_relative_to_today),
+    )
+
+
+@holiday_router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "description": "One holiday per line, ordered by date.",
+        },
+        501: {"model": view_models.NotImplementedResponse},
+    },
+)
+async def export_holidays(
+    start: dt.date,
+    end: dt.date,
+    countries: list[str]
+    | None = Query(
+        default=None,
+        description="Countries, or 'US-CA' style subdivisions, to export. Defaults to "
+        "every supported country.",
+    ),
+):
+    if end < start:
+        raise HTTPException(
+            HTTPStatus.UNPROCESSABLE_ENTITY, detail="End date cannot exceed start date."
+        )
+    if end.year - start.year + 1 > MAX_COMPUTED_YEARS:
+        raise HTTPException(
+            HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail=f"Range cannot exceed {MAX_COMPUTED_YEARS} years.",
+        )
+
+    regions: list[tuple[str, str | None]] = []
+    for region in dict.fromkeys(
+        countries
+        or [
+            country.abbreviation
+            for country in holiday_service.get_supported_countries()
+        ]
+    ):
+        country_abbreviation, _, subdivision = region.partition("-")
+        payload: view_models.CountryPayload = view_models.parse_query_payload(
+            view_models.CountryPayload,
+            country_abbreviation=country_abbreviation,
+            subdivision=subdivision or None,
+        )
+        regions.append((payload.country_abbreviation, payload.subdivision))
+
+    return StreamingResponse(
+        iter_holiday_export(regions, start, end), media_type="application/x-ndjson"
+    )
+
+
+async def _worldwide_holidays(
+    start: dt.date, end: dt.date, request: Request
+) -> Response:
+    if end < start:
+        raise HTTPException(
+            HTTPStatus.UNPROCESSABLE_ENTITY, detail="End date cannot exceed start date."
+        )
+    if (end - start).days >= MAX_WORLDWIDE_RANGE_IN_DAYS:
+        raise HTTPException(
+            HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail=f"Range cannot exceed {MAX_WORLDWIDE_RANGE_IN_DAYS} days.",
+        )
+    etag: str = compute_etag("worldwide-holidays", start, end)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    return Response(
+        encode_holidays(
+            await _answer(
+                holiday_service.is_worldwide_cached(start.year, end.year),
+                holiday_service.get_worldwide_holidays,
+                start,
+                end,
+            )
+        ),
+        media_type="application/json",
+        headers=caching_headers(etag),
+    )
+
+
+@holiday_router.get(
+    "/worldwide/{date}",
+    response_model=list[view_models.Holiday],
+    description="Every supported country observing a holiday on the date.",
+)
+async def get_worldwide_holidays_on(date: dt.date, request: Request):
+    return await _worldwide_holidays(date, date, request)
+
+
+@holiday_router.get(
+    "/worldwide",
+    response_model=list[view_models.Holiday],
+    description="Every supported country's holidays in the range, by date and then "
+    "country.",
+)
+async def get_worldwide_holidays(start: dt.date, end: dt.date, request: Request):
+    return await _worldwide_holidays(start, end, request)
+
+
+@holiday_router.get(
+    "/{country_abbreviation}.ics",
+    response_class=Response,
+    responses={
+        200: {
+            "content": {"text/calendar": {}},
+            "description": "An iCalendar feed of the surrounding years' holidays.",
+        },
+        501: {"model": view_models.NotImplementedResponse},
+    },
+)
+async def get_calendar_feed(
+    country_abbreviation: str, request: Request, subdivision: str | None = None
+):
+    payload: view_models.CountryPayload = view_models.parse_query_payload(
+        view_models.CountryPayload,
+        country_abbreviation=country_abbreviation,
+        subdivision=subdivision,
+    )
+    years: range = calendar_feeds.get_years()
+    etag: str = compute_etag(
+        "calendar-feed",
+        payload.country_abbreviation,
+        payload.subdivision,
+        years.start,
+        years.stop,
+    )
+    last_modified: dt.datetime = calendar_feeds.get_last_modified()
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    return Response(
+        await _answer(
+            holiday_service.is_cached(
+                payload.country_abbreviation,
+                years.start,
+                years.stop - 1,
+                payload.subdivision,
+            ),
+            calendar_feeds.get_feed,
+            payload.country_abbreviation,
+            payload.subdivision,
+        ),
+        media_type="text/calendar",
+        headers=caching_headers(etag, last_modified),
+    )
+
+
+async def _nearby_holidays(
+    country_abbreviation: str,
+    date: dt.date | None,
+    count: int,
+    subdivision: str | None,
+    request: Request,
+    response: Response,
+    forward: bool,
+):
+    payload: view_models.CountryPayload = view_models.parse_query_payload(
+        view_models.CountryPayload,
+        country_abbreviation=country_abbreviation,
+        subdivision=subdivision,
+    )
+    is_relative_to_today: bool = date is None
+    date = date or dt.date.today()
+    etag: str = compute_etag(
+        "next-holiday" if forward else "previous-holiday",
+        payload.country_abbreviation,
+        payload.subdivision,
+        date,
+        count,
+    )
+    if is_not_modified(request, etag):
+        return not_modified(etag, is_relative_to_today=is_relative_to_today)
+    set_caching_headers(response, etag, is_relative_to_today)
+
+    find_holidays = (
+        holiday_service.next_holiday if forward else holiday_service.previous_holiday
+    )
     return [
         view_models.Holiday(
-            country_abbreviation=holiday.country_abbreviation,
-            date=holiday.date,
             holiday_name=holiday.holiday_name,
+            date=holiday.date,
+            country_abbreviation=holiday.country_abbreviation,
+        )
+        # how many years the search needs is only known once it has run
+        for holiday in await run_in_threadpool(
+            find_holidays,
+            payload.country_abbreviation,
+            date,
+            count,
+            payload.subdivision,
         )
-        for holiday in upcoming_holiday_results
     ]
+
+
+@holiday_router.get(
+    "/{country_abbreviation}/next",
+    response_model=list[view_models.Holiday],
+    responses={501: {"model": view_models.NotImplementedResponse}},
+)
+async def get_next_holiday(
+    country_abbreviation: str,
+    request: Request,
+    response: Response,
+    date: dt.date
+    | None = Query(
+        default=None, description="Defaults to today; holidays on it are excluded."
+    ),
+    count: int = Query(default=1, ge=1, le=MAX_NEARBY_HOLIDAYS),
+    subdivision: str | None = None,
+):
+    return await _nearby_holidays(
+        country_abbreviation, date, count, subdivision, request, response, True
+    )
+
+
+@holiday_router.get(
+    "/{country_abbreviation}/previous",
+    response_model=list[view_models.Holiday],
+    responses={501: {"model": view_models.NotImplementedResponse}},
+)
+async def get_previous_holiday(
+    country_abbreviation: str,
+    request: Request,
+    response: Response,
+    date: dt.date
+    | None = Query(
+        default=None, description="Defaults to today; holidays on it are excluded."
+    ),
+    count: int = Query(default=1, ge=1, le=MAX_NEARBY_HOLIDAYS),
+    subdivision: str | None = None,
+):
+    return await _nearby_holidays(
+        country_abbreviation, date, count, subdivision, request, response, False
+    )
+
+
+# These GET variants come last so that fixed paths such as /supported-countries are
+# matched before a path parameter can swallow them.
+@holiday_router.get(
+    "/{country_abbreviation}/{date}",
+    response_model=view_models.IsHolidayResponse,
+    responses={501: {"model": view_models.NotImplementedResponse}},
+)
+async def get_is_it_a_holiday(
+    country_abbreviation: str,
+    date: dt.date,
+    request: Request,
+    response: Response,
+    subdivision: str | None = None,
+):
+    payload: view_models.HolidayBasePayload = view_models.parse_query_payload(
+        view_models.HolidayBasePayload,
+        country_abbreviation=country_abbreviation,
+        date=date,
+        subdivision=subdivision,
+    )
+    etag: str = compute_etag(
+        "is-it-a-holiday",
+        payload.country_abbreviation,
+        payload.subdivision,
+        payload.date,
+    )
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_caching_headers(response, etag)
+    return await _answer(
+        holiday_service.is_cached(
+            payload.country_abbreviation,
+            payload.date.year,
+            payload.date.year,
+            payload.subdivision,
+        ),
+        _is_it_a_holiday,
+        payload,
+    )
+
+
+@holiday_router.get(
+    "/{country_abbreviation}",
+    response_model=list[view_models.Holiday],
+    responses={501: {"model": view_models.NotImplementedResponse}},
+)
+async def get_upcoming_holidays(
+    country_abbreviation: str,
+    request: Request,
+    start: dt.date | None = None,
+    end: dt.date | None = None,
+    subdivision: str | None = None,
+):
+    payload: view_models.UpcomingHolidaysPayload = view_models.parse_query_payload(
+        view_models.UpcomingHolidaysPayload,
+        country_abbreviation=country_abbreviation,
+        start_date=start,
+        end_date=end,
+        subdivision=subdivision,
+    )
+    return await _upcoming_holidays(
+        payload, request, is_relative_to_today=start is None
+    )
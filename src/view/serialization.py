@@ -0,0 +1,210 @@
+"""
+Encodes immutable holiday responses once and serves the cached bytes.
+
+Responses built here are returned as raw JSON, so FastAPI neither revalidates them
+against their response_model nor encodes them again.
+"""
+import bisect
+import datetime as dt
+import heapq
+import json
+import logging
+from array import array
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+import src.logic.models as logic_models
+import src.view.models as view_models
+from src.config import settings
+from src.logic.services import holiday_service
+from src.logic.services.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+MAX_CACHED_YEARS = 4096
+EXPORT_CHUNK_SIZE_IN_BYTES = 64 * 1024
+
+
+def encode_json(content: Any) -> bytes:
+    # the same output as FastAPI's JSONResponse, so cached and uncached responses match
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode()
+
+
+@dataclass(frozen=True)
+class _EncodedYear:
+    ordinals: array  # of each holiday, ascending
+    holidays: tuple[bytes, ...]  # each holiday as an encoded JSON object
+
+    @property
+    def size_in_bytes(self) -> int:
+        return self.ordinals.itemsize * len(self.ordinals) + sum(
+            len(holiday) for holiday in self.holidays
+        )
+
+
+class SerializedResponses:
+    """Caches the supported countries and each (country, year) of holidays as JSON."""
+
+    def __init__(self, max_size_in_bytes: int):
+        self._supported_countries: Optional[bytes] = None
+        self._years: LRUCache[tuple[str, Optional[str], int], _EncodedYear] = LRUCache(
+            max_entries=MAX_CACHED_YEARS,
+            max_size_in_bytes=max_size_in_bytes,
+            size_of=lambda encoded_year: encoded_year.size_in_bytes,
+        )
+
+    def get_supported_countries(self) -> bytes:
+        if self._supported_countries is None:
+            self._supported_countries = encode_json(
+                [
+                    jsonable_encoder(
+                        view_models.CountryResponse(
+                            country_abbreviation=country.abbreviation,
+                            name=country.name,
+                            flag=country.flag,
+                        ),
+                        by_alias=True,
+                    )
+                    for country in holiday_service.get_supported_countries()
+                ]
+            )
+        return self._supported_countries
+
+    def _get_encoded_year(
+        self, country_code: str, subdivision: Optional[str], year: int
+    ) -> _EncodedYear:
+        key: tuple[str, Optional[str], int] = (country_code, subdivision, year)
+        encoded_year: Optional[_EncodedYear] = self._years.get(key)
+        if encoded_year is None:
+            holidays = holiday_service.get_upcoming_holidays(
+                country_code, dt.date(year, 1, 1), dt.date(year, 12, 31), subdivision
+            )
+            encoded_year = _EncodedYear(
+                array("i", [holiday.date.toordinal() for holiday in holidays]),
+                tuple(
+                    encode_json(
+                        jsonable_encoder(
+                            view_models.Holiday(
+                                country_abbreviation=holiday.country_abbreviation,
+                                date=holiday.date,
+                                holiday_name=holiday.holiday_name,
+                            ),
+                            by_alias=True,
+                        )
+                    )
+                    for holiday in holidays
+                ),
+            )
+            self._years.put(key, encoded_year)
+        return encoded_year
+
+    def get_upcoming_holidays(
+        self,
+        country_code: str,
+        start: dt.date,
+        end: dt.date,
+        subdivision: Optional[str] = None,
+    ) -> bytes:
+        # raises YearRangeError for a range too wide to compute in one request
+        holiday_service.prime_years(country_code, start.year, end.year, subdivision)
+        encoded_holidays: list[bytes] = []
+        for year in range(start.year, end.year + 1):
+            encoded_year: _EncodedYear = self._get_encoded_year(
+                country_code, subdivision, year
+            )
+            first: int = bisect.bisect_left(encoded_year.ordinals, start.toordinal())
+            last: int = bisect.bisect_right(encoded_year.ordinals, end.toordinal())
+            encoded_holidays.extend(encoded_year.holidays[first:last])
+        return b"[" + b",".join(encoded_holidays) + b"]"
+
+
+def encode_holidays(holidays: Iterable[logic_models.Holiday]) -> bytes:
+    """Encodes holidays as a list[view_models.Holiday] response would be."""
+    return encode_json(
+        [
+            {
+                "holidayName": holiday.holiday_name,
+                "date": holiday.date.isoformat(),
+                "countryAbbreviation": holiday.country_abbreviation,
+            }
+            for holiday in holidays
+        ]
+    )
+
+
+def _iter_region_rows(
+    country_code: str, subdivision: Optional[str], start: dt.date, end: dt.date
+) -> Iterator[tuple[dt.date, str, str, bytes]]:
+    holidays: Iterator[logic_models.Holiday] = holiday_service.iter_holidays(
+        country_code, start, end, subdivision
+    )
+    missing_from: dt.date = start
+    while True:
+        try:
+            holiday: Optional[logic_models.Holiday] = next(holidays, None)
+        except Exception:
+            # the status line is long gone by now, so rather than end the whole
+            # export early, say which region stops where and carry on with the rest
+            logger.exception(
+                "Could not export holidays for %s from %s",
+                f"{country_code}-{subdivision}" if subdivision else country_code,
+                missing_from,
+            )
+            row: bytes = encode_json(
+                {
+                    "countryAbbreviation": country_code,
+                    "subdivision": subdivision,
+                    "date": missing_from.isoformat(),
+                    "error": "Could not compute the holidays from this date on.",
+                }
+            )
+            yield missing_from, country_code, subdivision or "", row
+            return
+        if holiday is None:
+            return
+        row = encode_json(
+            {
+                "countryAbbreviation": holiday.country_abbreviation,
+                "subdivision": subdivision,
+                "date": holiday.date.isoformat(),
+                "holidayName": holiday.holiday_name,
+            }
+        )
+        missing_from = holiday.date + dt.timedelta(1)
+        yield holiday.date, country_code, subdivision or "", row
+
+
+def iter_holiday_export(
+    regions: list[tuple[str, Optional[str]]], start: dt.date, end: dt.date
+) -> Iterator[bytes]:
+    """
+    Yields every region's holidays as date-ordered NDJSON, in chunks.
+
+    Each region is read a year at a time and the regions are k-way merged, so memory
+    use depends on the number of regions rather than on the length of the range.
+    """
+    merged_rows = heapq.merge(
+        *(
+            _iter_region_rows(country_code, subdivision, start, end)
+            for country_code, subdivision in regions
+        )
+    )
+    chunk: list[bytes] = []
+    chunk_size: int = 0
+    for *_, row in merged_rows:
+        chunk.append(row)
+        chunk_size += len(row) + 1
+        if chunk_size >= EXPORT_CHUNK_SIZE_IN_BYTES:
+            yield b"\n".join(chunk) + b"\n"
+            chunk, chunk_size = [], 0
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+
+serialized_responses = SerializedResponses(
+    settings.serialized_response_cache_size_in_bytes
+)
@@ -2,6 +2,7 @@ import secrets
 import unittest
 import uuid
 from http import HTTPStatus
+from unittest import mock
 
 import firebase_admin.auth
 from fastapi.testclient import TestClient
@@ -9,8 +10,13 @@ from firebase_admin import auth
 from firebase_admin.auth import UserNotFoundError, UserRecord
 from httpx import Response
 
-from src.logic.services.account_management import generate_strong_password
+from src.config import initialize_firebase
+from src.logic.services.account_management import (
+    UserImportOutcome,
+    generate_strong_password,
+)
 from src.main import app
+from src.view.routers.account_management_router import account_management_service
 
 
 class AccountManagementBaseFixture(unittest.TestCase):
@@ -26,6 +32,7 @@ class AccountManagementBaseFixture(unittest.TestCase):
     password: str = generate_strong_password()
 
     def setUp(self):  # noqa
+        initialize_firebase()
         self.client: TestClient = TestClient(app, raise_server_exceptions=False)
 
     def create_user(self) -> Response:
@@ -153,3 +160,41 @@ class TestLogout(CreateUserFixture):
             self.Routes.verify_token_route, headers=headers
         )
         assert second_verification.status_code == 403
+
+
+class TestCreateUsers(unittest.TestCase):
+    def setUp(self):
+        self.client: TestClient = TestClient(app)
+
+    def test_reports_invalid_users_without_rejecting_the_batch(self):
+        password: str = generate_strong_password()
+
+        async def import_users_async(users):
+            return [UserImportOutcome(email) for email, _ in users]
+
+        raw_users = [
+            {"email": "first@nathanson.dev", "password": password},
+            {"email": "not-an-email", "password": password},
+            {"email": "short@nathanson.dev", "password": "aB1!"},
+            "first@nathanson.dev",
+            {"email": "last@nathanson.dev", "password": password},
+        ]
+        with mock.patch.object(
+            account_management_service, "import_users_async", import_users_async
+        ):
+            response: Response = self.client.post(
+                "users/create/bulk", json={"users": raw_users}
+            )
+        assert response.status_code == HTTPStatus.OK
+        results: list[dict] = response.json()["results"]
+        assert [(result["email"], result["created"]) for result in results] == [
+            ("first@nathanson.dev", True),
+            ("not-an-email", False),
+            ("short@nathanson.dev", False),
+            (None, False),
+            ("last@nathanson.dev", True),
+        ]
+        assert results[0]["error"] is None
+        assert results[1]["error"].startswith("email:")
+        assert results[2]["error"].startswith("password:")
+        assert results[3]["error"] == "User should be an object."
@@ -1,9 +1,32 @@
+import asyncio
+import json
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+from firebase_admin import exceptions as firebase_exceptions
+from firebase_admin._user_mgt import GetUsersResult
+from firebase_admin.auth import (
+    ExpiredIdTokenError,
+    InvalidIdTokenError,
+    RevokedIdTokenError,
+    UserImportResult,
+    UserRecord,
+)
 
 from src.logic.services.account_management import (
     AccountManagementService,
+    AuthenticationError,
+    BackendUnavailableError,
     generate_strong_password,
 )
+from src.logic.services.circuit_breaker import CircuitState
+from src.logic.services.identity_toolkit import SECURE_TOKEN_URL, IdentityToolkitClient
 
 
 class TestPasswordChecker(unittest.TestCase):
@@ -40,3 +63,430 @@ class TestPasswordChecker(unittest.TestCase):
         for password in good_passwords:
             with self.subTest():
                 assert AccountManagementService.is_strong_password(password), password
+
+
+EMAIL = "ben+automatedtesting@nathanson.dev"
+UID = "test-uid"
+
+
+class FakeAuthService:
+    """Stands in for firebase_admin.auth, failing the first few verifications."""
+
+    def __init__(self, failures: list[Exception] | None = None):
+        self.failures: list[Exception] = failures or []
+        self.verifications: int = 0
+        self.user_lookups: int = 0
+        self.issued_at: int = int(time.time()) - 10
+        self.user_record: dict = {"localId": UID, "email": EMAIL, "validSince": "0"}
+        self.registered_emails: set[str] = {EMAIL}
+        self.lookups: list[int] = []
+        self.imports: list[int] = []
+        self.lock: threading.Lock = threading.Lock()
+
+    def verify_id_token(self, id_token: str, check_revoked: bool = False) -> dict:
+        self.verifications += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        return {
+            "email": EMAIL,
+            "uid": UID,
+            "iat": self.issued_at,
+            "exp": self.issued_at + 3600,
+        }
+
+    def get_user(self, uid: str) -> UserRecord:
+        self.user_lookups += 1
+        return UserRecord(dict(self.user_record))
+
+    def revoke_refresh_tokens(self, uid: str) -> None:
+        self.user_record["validSince"] = str(int(time.time()))
+
+    def get_users(self, identifiers: list) -> GetUsersResult:
+        assert len(identifiers) <= 100
+        self.lookups.append(len(identifiers))
+        users = [
+            UserRecord({"localId": identifier.email, "email": identifier.email})
+            for identifier in identifiers
+            if identifier.email in self.registered_emails
+        ]
+        return GetUsersResult(users, [])
+
+    def import_users(self, users: list, hash_alg=None) -> UserImportResult:
+        assert len(users) <= 1000 and hash_alg is not None
+        with self.lock:
+            self.imports.append(len(users))
+        errors = [
+            {"index": index, "message": "INVALID_EMAIL"}
+            for index, user in enumerate(users)
+            if user.email.endswith("@rejected.test")
+        ]
+        return UserImportResult({"error": errors}, len(users))
+
+
+def build_service(auth_service: FakeAuthService, **kwargs) -> AccountManagementService:
+    return AccountManagementService(
+        auth_service=auth_service,  # type: ignore
+        credential_service=mock.Mock(),
+        clock_skew_backoff_seconds=0,
+        **kwargs,
+    )
+
+
+class TestVerifyTokenAndGetUser(unittest.TestCase):
+    def test_verifies_without_waiting(self):
+        auth_service = FakeAuthService()
+        with mock.patch("time.sleep") as sleep:
+            user = build_service(auth_service).verify_token_and_get_user("token")
+        assert user.email == EMAIL
+        sleep.assert_not_called()
+
+    def test_retries_tokens_used_too_early(self):
+        too_early = InvalidIdTokenError("Token used too early, 1 < 2.")
+        auth_service = FakeAuthService(failures=[too_early, too_early])
+        user = build_service(auth_service).verify_token_and_get_user("token")
+        assert user.email == EMAIL
+        assert auth_service.verifications == 3
+
+    def test_gives_up_after_configured_retries(self):
+        failures = [InvalidIdTokenError("Token used too early, 1 < 2.")] * 5
+        auth_service = FakeAuthService(failures=failures)
+        with pytest.raises(AuthenticationError):
+            build_service(auth_service).verify_token_and_get_user("token")
+        assert auth_service.verifications == 4
+
+    def test_does_not_retry_other_failures(self):
+        param_list = [
+            InvalidIdTokenError("Firebase ID token has no 'kid' claim."),
+            ExpiredIdTokenError("Token expired, 1 < 2", cause=None),
+            RevokedIdTokenError("The Firebase ID token has been revoked."),
+        ]
+        for failure in param_list:
+            with self.subTest():
+                auth_service = FakeAuthService(failures=[failure])
+                with pytest.raises(AuthenticationError):
+                    build_service(auth_service).verify_token_and_get_user("token")
+                assert auth_service.verifications == 1
+
+
+class TestVerificationCaching(unittest.TestCase):
+    def test_caches_claims_and_users(self):
+        auth_service = FakeAuthService()
+        service = build_service(auth_service)
+        for _ in range(3):
+            assert service.verify_token_and_get_user("token").uid == UID
+        assert auth_service.verifications == 1
+        assert auth_service.user_lookups == 1
+
+    def test_does_not_share_claims_between_tokens(self):
+        auth_service = FakeAuthService()
+        service = build_service(auth_service)
+        service.verify_token_and_get_user("token")
+        service.verify_token_and_get_user("another-token")
+        assert auth_service.verifications == 2
+
+    def test_rechecks_revocation_on_interval(self):
+        auth_service = FakeAuthService()
+        service = build_service(auth_service, revocation_check_interval_seconds=0)
+        service.verify_token_and_get_user("token")
+        auth_service.revoke_refresh_tokens(UID)
+        with pytest.raises(AuthenticationError):
+            service.verify_token_and_get_user("token")
+        assert auth_service.user_lookups == 2
+
+    def test_rejects_disabled_users(self):
+        auth_service = FakeAuthService()
+        auth_service.user_record["disabled"] = True
+        with pytest.raises(AuthenticationError):
+            build_service(auth_service).verify_token_and_get_user("token")
+
+    def test_logout_revokes_immediately_on_this_node(self):
+        auth_service = FakeAuthService()
+        service = build_service(auth_service)
+        service.logout("token")
+        with pytest.raises(AuthenticationError):
+            service.verify_token_and_get_user("token")
+        assert auth_service.user_lookups == 1
+
+    def test_accepts_tokens_issued_after_logout(self):
+        auth_service = FakeAuthService()
+        service = build_service(auth_service)
+        service.logout("token")
+        auth_service.issued_at = int(time.time())
+        assert service.verify_token_and_get_user("new-token").uid == UID
+
+    def test_refreshes_revocations_made_elsewhere(self):
+        auth_service = FakeAuthService()
+        service = build_service(auth_service, revocation_check_interval_seconds=0.1)
+        service.verify_token_and_get_user("token")
+        auth_service.revoke_refresh_tokens(UID)
+        # until the entry expires, this node still trusts its revocation table
+        assert service.verify_token_and_get_user("token").uid == UID
+        time.sleep(0.1)
+        with pytest.raises(AuthenticationError):
+            service.verify_token_and_get_user("token")
+
+
+def handle_verify_password(request: httpx.Request) -> httpx.Response:
+    body: dict = json.loads(request.content)
+    if body["password"] != "correct-password":
+        return httpx.Response(400, json={"error": {"message": "INVALID_PASSWORD"}})
+    return httpx.Response(
+        200,
+        json={
+            "email": body["email"],
+            "expiresIn": "3600",
+            "idToken": "id-token",
+            "refreshToken": "refresh-token",
+        },
+    )
+
+
+class TestLogin(unittest.TestCase):
+    def setUp(self):
+        self.requests: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            return handle_verify_password(request)
+
+        async def async_handler(request: httpx.Request) -> httpx.Response:
+            return handler(request)
+
+        self.service = build_service(
+            FakeAuthService(),
+            identity_toolkit_client=IdentityToolkitClient(
+                "api-key",
+                transport=httpx.MockTransport(handler),
+                async_transport=httpx.MockTransport(async_handler),
+            ),
+        )
+
+    def test_logs_in_through_the_pooled_client(self):
+        for _ in range(3):
+            session_token = self.service.login(EMAIL, "correct-password")
+            assert session_token.id_token == "id-token"
+        assert len(self.requests) == 3
+        for request in self.requests:
+            assert request.url.path.endswith("/verifyPassword")
+            assert request.url.params["key"] == "api-key"
+
+    def test_logs_in_asynchronously(self):
+        session_token = asyncio.run(self.service.login_async(EMAIL, "correct-password"))
+        assert session_token.access_token == "refresh-token"
+
+    def test_rejects_wrong_passwords(self):
+        with pytest.raises(AuthenticationError):
+            self.service.login(EMAIL, "wrong-password")
+        with pytest.raises(AuthenticationError):
+            asyncio.run(self.service.login_async(EMAIL, "wrong-password"))
+
+
+class TestAsyncWrappers(unittest.TestCase):
+    def test_runs_firebase_calls_on_the_dedicated_executor(self):
+        threads: list[str] = []
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="test-firebase")
+        service = build_service(FakeAuthService(), executor=executor)
+        verify_token_and_get_user = service.verify_token_and_get_user
+
+        def recording_verify_token_and_get_user(id_token: str) -> UserRecord:
+            threads.append(threading.current_thread().name)
+            return verify_token_and_get_user(id_token)
+
+        service.verify_token_and_get_user = (  # type: ignore
+            recording_verify_token_and_get_user
+        )
+        user = asyncio.run(service.verify_token_and_get_user_async("token"))
+        asyncio.run(service.logout_async("token"))
+        executor.shutdown()
+
+        assert user.uid == UID
+        assert len(threads) == 2
+        assert threads and all(name.startswith("test-firebase") for name in threads)
+
+    def test_propagates_errors_from_the_executor(self):
+        auth_service = FakeAuthService(failures=[InvalidIdTokenError("bad token")])
+        with pytest.raises(AuthenticationError):
+            asyncio.run(
+                build_service(auth_service).verify_token_and_get_user_async("token")
+            )
+        with pytest.raises(ValueError):
+            asyncio.run(
+                build_service(auth_service).create_user_async(EMAIL, "password")
+            )
+
+
+def handle_token_exchange(request: httpx.Request) -> httpx.Response:
+    body = parse_qs(request.content.decode())
+    if body["grant_type"] != ["refresh_token"] or body["refresh_token"] != ["good"]:
+        return httpx.Response(400, json={"error": {"message": "INVALID_REFRESH_TOKEN"}})
+    return httpx.Response(
+        200,
+        json={
+            "expires_in": "3600",
+            "token_type": "Bearer",
+            "refresh_token": "next-refresh-token",
+            "id_token": "refreshed-id-token",
+            "user_id": UID,
+        },
+    )
+
+
+class TestRefresh(unittest.TestCase):
+    def setUp(self):
+        async def async_handler(request: httpx.Request) -> httpx.Response:
+            return handle_token_exchange(request)
+
+        self.auth_service = FakeAuthService()
+        self.service = build_service(
+            self.auth_service,
+            secure_token_client=IdentityToolkitClient(
+                "api-key",
+                SECURE_TOKEN_URL,
+                transport=httpx.MockTransport(handle_token_exchange),
+                async_transport=httpx.MockTransport(async_handler),
+            ),
+        )
+
+    def test_exchanges_refresh_tokens(self):
+        for session_token in [
+            self.service.refresh("good"),
+            asyncio.run(self.service.refresh_async("good")),
+        ]:
+            with self.subTest():
+                assert session_token.email == EMAIL
+                assert session_token.id_token == "refreshed-id-token"
+                assert session_token.access_token == "next-refresh-token"
+
+    def test_caches_claims_of_the_refreshed_token(self):
+        session_token = self.service.refresh("good")
+        self.service.verify_token_and_get_user(session_token.id_token)
+        assert self.auth_service.verifications == 1
+
+    def test_rejects_bad_refresh_tokens(self):
+        with pytest.raises(AuthenticationError):
+            self.service.refresh("bad")
+        with pytest.raises(AuthenticationError):
+            asyncio.run(self.service.refresh_async("bad"))
+
+
+class TestImportUsers(unittest.TestCase):
+    def setUp(self):
+        self.auth_service = FakeAuthService()
+        self.service = build_service(self.auth_service, import_hash_rounds=1)
+
+    def test_imports_in_firebase_sized_batches(self):
+        users = [(f"user{i}@example.test", "2cH88^qmmjSj") for i in range(2500)]
+        outcomes = self.service.import_users(users)
+        assert [outcome.email for outcome in outcomes] == [email for email, _ in users]
+        assert all(outcome.error is None for outcome in outcomes)
+        assert sorted(self.auth_service.imports) == [500, 1000, 1000]
+
+    def test_reports_an_outcome_per_user(self):
+        outcomes = self.service.import_users(
+            [
+                ("new@example.test", "2cH88^qmmjSj"),
+                ("weak@example.test", "password"),
+                (EMAIL, "2cH88^qmmjSj"),
+                ("new@example.test", "7S$u37M8M^kF"),
+                ("someone@rejected.test", "2cH88^qmmjSj"),
+            ]
+        )
+        errors = [outcome.error for outcome in outcomes]
+        assert errors[0] is None
+        assert errors[1] == "Password is too weak."
+        assert errors[2] == "Email is already registered."
+        assert errors[3] == "Email appears more than once in this import."
+        assert errors[4] == "INVALID_EMAIL"
+
+    def test_imports_asynchronously(self):
+        outcomes = asyncio.run(
+            self.service.import_users_async([("new@example.test", "2cH88^qmmjSj")])
+        )
+        assert outcomes[0].error is None
+
+    def test_failed_lookup_fails_only_its_own_batch(self):
+        get_users = self.auth_service.get_users
+
+        def failing_get_users(identifiers: list) -> GetUsersResult:
+            if any(i.email == "user1500@example.test" for i in identifiers):
+                raise firebase_exceptions.UnavailableError("Firebase is down.")
+            return get_users(identifiers)
+
+        self.auth_service.get_users = failing_get_users
+        users = [(f"user{i}@example.test", "2cH88^qmmjSj") for i in range(2500)]
+        outcomes = self.service.import_users(users)
+        errors = [outcome.error for outcome in outcomes]
+        assert errors[:1000] == [None] * 1000
+        assert errors[1000:2000] == ["Firebase is unavailable, try again later."] * 1000
+        assert errors[2000:] == [None] * 500
+        assert sorted(self.auth_service.imports) == [500, 1000]
+
+
+class SlowAuthService(FakeAuthService):
+    """Stands in for a Firebase backend that has slowed down."""
+
+    def __init__(self, latency_seconds: float):
+        super().__init__()
+        self.latency_seconds: float = latency_seconds
+
+    def get_user(self, uid: str) -> UserRecord:
+        time.sleep(self.latency_seconds)
+        return super().get_user(uid)
+
+
+class TestBackendFailures(unittest.TestCase):
+    def test_times_out_slow_firebase_calls(self):
+        service = build_service(
+            SlowAuthService(latency_seconds=0.2), firebase_read_timeout_seconds=0.01
+        )
+        with pytest.raises(BackendUnavailableError):
+            service.verify_token_and_get_user("token")
+
+    def test_fails_fast_once_the_circuit_opens(self):
+        auth_service = SlowAuthService(latency_seconds=0.2)
+        service = build_service(
+            auth_service,
+            firebase_read_timeout_seconds=0.01,
+            circuit_breaker_failure_threshold=2,
+            circuit_breaker_reset_timeout_seconds=0.3,
+        )
+        for _ in range(2):
+            with pytest.raises(BackendUnavailableError):
+                service.verify_token_and_get_user("token")
+        lookups: int = auth_service.user_lookups
+        with pytest.raises(BackendUnavailableError):
+            service.verify_token_and_get_user("token")
+        assert auth_service.user_lookups == lookups
+        firebase_statistics = service.get_circuit_breaker_statistics()[0]
+        assert firebase_statistics.state == CircuitState.OPEN
+        assert firebase_statistics.rejections == 1
+
+        # once the backend recovers, a probe closes the circuit again
+        auth_service.latency_seconds = 0
+        time.sleep(0.3)
+        assert service.verify_token_and_get_user("token").uid == UID
+        assert service.get_circuit_breaker_statistics()[0].state == CircuitState.CLOSED
+
+    def test_treats_identity_toolkit_server_errors_as_failures(self):
+        service = build_service(
+            FakeAuthService(),
+            identity_toolkit_client=IdentityToolkitClient(
+                "api-key", transport=httpx.MockTransport(lambda _: httpx.Response(503))
+            ),
+            circuit_breaker_failure_threshold=1,
+        )
+        with pytest.raises(BackendUnavailableError):
+            service.login(EMAIL, "correct-password")
+        assert service.get_circuit_breaker_statistics()[1].state == CircuitState.OPEN
+
+    def test_does_not_count_rejected_credentials(self):
+        service = build_service(
+            FakeAuthService(),
+            identity_toolkit_client=IdentityToolkitClient(
+                "api-key", transport=httpx.MockTransport(handle_verify_password)
+            ),
+            circuit_breaker_failure_threshold=1,
+        )
+        with pytest.raises(AuthenticationError):
+            service.login(EMAIL, "wrong-password")
+        assert service.get_circuit_breaker_statistics()[1].state == CircuitState.CLOSED
@@ -0,0 +1,80 @@
+import datetime as dt
+import unittest
+from test.test_data import US_INDEPENDENCE_DAY
+
+import pytest
+
+from src.logic.models import Roll
+from src.logic.services.business_days import BusinessDayCalendar
+from src.logic.services.holiday_index import HolidayIndex
+
+SATURDAY_AND_SUNDAY = {5, 6}
+FRIDAY_AND_SATURDAY = {4, 5}
+
+
+def build_calendar(weekend=SATURDAY_AND_SUNDAY) -> BusinessDayCalendar:
+    holiday_index = HolidayIndex.from_holidays(
+        [(US_INDEPENDENCE_DAY, "Independence Day")], 2000, 2100
+    )
+    return BusinessDayCalendar(weekend, lambda *_: holiday_index)
+
+
+class TestBusinessDayCalendar(unittest.TestCase):
+    def test_rejects_weeks_without_business_days(self):
+        with pytest.raises(ValueError):
+            build_calendar(weekend=range(7))
+
+    def test_is_business_day(self):
+        calendar = build_calendar()
+        param_list = [
+            (dt.date(2022, 7, 1), True),  # Friday
+            (dt.date(2022, 7, 2), False),  # Saturday
+            (US_INDEPENDENCE_DAY, False),  # Monday, but a holiday
+            (dt.date(2022, 7, 5), True),
+        ]
+        for date, expected_result in param_list:
+            with self.subTest():
+                assert calendar.is_business_day(date) is expected_result
+
+    def test_respects_country_weekend(self):
+        calendar = build_calendar(weekend=FRIDAY_AND_SATURDAY)
+        assert not calendar.is_business_day(dt.date(2022, 7, 1))
+        assert calendar.is_business_day(dt.date(2022, 7, 3))
+
+    def test_roll(self):
+        calendar = build_calendar()
+        saturday = dt.date(2022, 7, 2)
+        assert calendar.roll(saturday, Roll.FORWARD) == dt.date(2022, 7, 5)
+        assert calendar.roll(saturday, Roll.BACKWARD) == dt.date(2022, 7, 1)
+
+    def test_count_excludes_end_date(self):
+        calendar = build_calendar()
+        param_list = [
+            (dt.date(2022, 7, 1), dt.date(2022, 7, 1), 0),
+            (dt.date(2022, 7, 1), dt.date(2022, 7, 6), 2),
+            (dt.date(2022, 7, 6), dt.date(2022, 7, 1), -2),
+            (dt.date(2022, 6, 1), dt.date(2022, 8, 1), 42),
+        ]
+        for start, end, expected_count in param_list:
+            with self.subTest():
+                assert calendar.count(start, end) == expected_count
+
+    def test_offset(self):
+        calendar = build_calendar()
+        param_list = [
+            (dt.date(2022, 7, 1), 0, dt.date(2022, 7, 1)),
+            (dt.date(2022, 7, 1), 1, dt.date(2022, 7, 5)),
+            (dt.date(2022, 7, 5), -1, dt.date(2022, 7, 1)),
+            (dt.date(2022, 6, 27), 10, dt.date(2022, 7, 12)),
+            (dt.date(2022, 7, 12), -10, dt.date(2022, 6, 27)),
+            (dt.date(2022, 6, 1), 42, dt.date(2022, 8, 1)),
+        ]
+        for date, days, expected_date in param_list:
+            with self.subTest():
+                assert calendar.offset(date, days) == expected_date
+
+    def test_offset_rolls_before_moving(self):
+        calendar = build_calendar()
+        saturday = dt.date(2022, 7, 2)
+        assert calendar.offset(saturday, 1, Roll.FORWARD) == dt.date(2022, 7, 6)
+        assert calendar.offset(saturday, 1, Roll.BACKWARD) == dt.date(2022, 7, 5)
@@ -0,0 +1,90 @@
+import asyncio
+import unittest
+
+import pytest
+
+from src.logic.services.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now: float = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            "backend", failure_threshold=3, reset_timeout_seconds=10, clock=self.clock
+        )
+
+    def fail(self):
+        with pytest.raises(TimeoutError):
+            with self.breaker.guard((TimeoutError,)):
+                raise TimeoutError
+
+    def test_opens_after_consecutive_failures(self):
+        self.fail()
+        self.fail()
+        assert self.breaker.state == CircuitState.CLOSED
+        self.fail()
+        assert self.breaker.state == CircuitState.OPEN
+        with pytest.raises(CircuitOpenError):
+            self.breaker.before_call()
+        assert self.breaker.get_statistics().rejections == 1
+
+    def test_successes_reset_the_failure_count(self):
+        self.fail()
+        self.fail()
+        with self.breaker.guard((TimeoutError,)):
+            pass
+        self.fail()
+        assert self.breaker.state == CircuitState.CLOSED
+
+    def test_other_errors_count_as_successes(self):
+        for _ in range(5):
+            with pytest.raises(ValueError):
+                with self.breaker.guard((TimeoutError,)):
+                    raise ValueError
+        assert self.breaker.state == CircuitState.CLOSED
+
+    def test_lets_one_probe_through_once_half_open(self):
+        for _ in range(3):
+            self.fail()
+        self.clock.now = 10
+        assert self.breaker.state == CircuitState.HALF_OPEN
+        self.breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            self.breaker.before_call()
+        self.breaker.record_success()
+        assert self.breaker.state == CircuitState.CLOSED
+
+    def test_cancelled_probe_lets_another_probe_through(self):
+        for _ in range(3):
+            self.fail()
+        self.clock.now = 10
+        with pytest.raises(asyncio.CancelledError):
+            with self.breaker.guard((TimeoutError,)):
+                raise asyncio.CancelledError
+        assert self.breaker.state == CircuitState.HALF_OPEN
+        with self.breaker.guard((TimeoutError,)):
+            pass
+        assert self.breaker.state == CircuitState.CLOSED
+
+    def test_failed_probe_reopens_the_circuit(self):
+        for _ in range(3):
+            self.fail()
+        self.clock.now = 10
+        self.fail()
+        assert self.breaker.state == CircuitState.OPEN
+        self.clock.now = 19
+        assert self.breaker.state == CircuitState.OPEN
+        self.clock.now = 20
+        assert self.breaker.state == CircuitState.HALF_OPEN
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+import pytest
+
+from src.logic.services.country_registry import CountryRegistry, RegisteredCountry
+
+UNITED_STATES = RegisteredCountry(
+    alpha_2="US",
+    alpha_3="USA",
+    numeric="840",
+    name="United States",
+    flag="🇺🇸",
+    official_name="United States of America",
+)
+BOLIVIA = RegisteredCountry(
+    alpha_2="BO",
+    alpha_3="BOL",
+    numeric="068",
+    name="Bolivia, Plurinational State of",
+    flag="🇧🇴",
+    official_name="Plurinational State of Bolivia",
+    common_name="Bolivia",
+)
+
+
+class TestCountryRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = CountryRegistry([UNITED_STATES, BOLIVIA])
+
+    def test_looks_up_by_every_code(self):
+        param_list = [
+            (self.registry.get_by_alpha_2("US"), UNITED_STATES),
+            (self.registry.get_by_alpha_2("bo"), BOLIVIA),
+            (self.registry.get_by_alpha_3("usa"), UNITED_STATES),
+            (self.registry.get_by_numeric("068"), BOLIVIA),
+            (self.registry.get_by_numeric(68), BOLIVIA),
+            (self.registry.get_by_alpha_2("ZZ"), None),
+        ]
+        for actual, expected in param_list:
+            with self.subTest():
+                assert actual == expected
+
+    def test_looks_up_by_any_name_ignoring_case(self):
+        for name in ["bolivia", "BOLIVIA, PLURINATIONAL STATE OF", "Bolivia"]:
+            with self.subTest():
+                assert self.registry.get_by_name(name) == BOLIVIA
+        assert self.registry.get_by_name("Narnia") is None
+
+    def test_resolves_any_code_or_name(self):
+        param_list = ["US", "usa", "840", "united states of america"]
+        for value in param_list:
+            with self.subTest():
+                assert self.registry.lookup(value) == UNITED_STATES
+
+    def test_is_immutable(self):
+        with pytest.raises(TypeError):
+            self.registry._by_alpha_2["ZZ"] = UNITED_STATES  # type: ignore
+        with pytest.raises(AttributeError):
+            UNITED_STATES.name = "Narnia"  # type: ignore
+
+    def test_round_trips_through_a_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "registry.json")
+            self.registry.write(path)
+            loaded = CountryRegistry.load(path)
+        assert list(loaded) == [UNITED_STATES, BOLIVIA]
+
+    def test_generated_registry_matches_pycountry(self):
+        generated = CountryRegistry.load()
+        assert list(generated) == list(CountryRegistry.from_pycountry())
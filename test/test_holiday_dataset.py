@@ -0,0 +1,102 @@
+import datetime as dt
+import os
+import tempfile
+import unittest
+from test.test_data import US_INDEPENDENCE_DAY
+from unittest import mock
+
+import holidays
+import pytest
+
+from src.logic.services import HolidayService
+from src.logic.services.holiday_dataset import (
+    DatasetError,
+    HolidayDataset,
+    build_dataset,
+)
+from src.logic.services.holiday_index import HolidayIndex
+
+
+class DatasetFixture(unittest.TestCase):
+    def setUp(self):
+        self.dataset_directory = tempfile.TemporaryDirectory()
+        self.dataset_path: str = os.path.join(self.dataset_directory.name, "test.bin")
+
+    def tearDown(self):
+        self.dataset_directory.cleanup()
+
+
+class TestHolidayDataset(DatasetFixture):
+    def setUp(self):
+        super().setUp()
+        build_dataset(self.dataset_path, 2021, 2023, ["US", "MX"])
+        self.dataset = HolidayDataset.load(self.dataset_path)
+
+    def test_records_years_and_countries(self):
+        assert (self.dataset.first_year, self.dataset.last_year) == (2021, 2023)
+        assert self.dataset.country_codes == ["US", "MX"]
+        assert self.dataset.get_country_holidays("GB") is None
+
+    def test_round_trips_holidays(self):
+        start, end = dt.date(2021, 1, 1), dt.date(2023, 12, 31)
+        for country_code in ["US", "MX"]:
+            with self.subTest():
+                expected_holidays = HolidayIndex.from_library(
+                    country_code, None, 2021, 2023
+                )
+                dataset_holidays = self.dataset.get_country_holidays(country_code)
+                assert list(dataset_holidays.between(start, end)) == list(
+                    expected_holidays.between(start, end)
+                )
+
+    def test_supports_point_lookups(self):
+        us_holidays = self.dataset.get_country_holidays("US")
+        assert US_INDEPENDENCE_DAY in us_holidays
+        assert us_holidays.get_name(US_INDEPENDENCE_DAY) == "Independence Day"
+
+
+class TestInvalidDatasets(DatasetFixture):
+    def test_rejects_invalid_files(self):
+        param_list = [b"", b"not a dataset at all, just some bytes", b"FMNHOLID"]
+        for contents in param_list:
+            with self.subTest():
+                with open(self.dataset_path, "wb") as dataset_file:
+                    dataset_file.write(contents)
+                with pytest.raises(DatasetError):
+                    HolidayDataset.load(self.dataset_path)
+
+    def test_rejects_truncated_files(self):
+        build_dataset(self.dataset_path, 2022, 2022, ["US"])
+        with open(self.dataset_path, "rb") as dataset_file:
+            contents: bytes = dataset_file.read()
+        with pytest.raises(DatasetError):
+            HolidayDataset(contents[:-10])
+
+
+class TestHolidayServiceWithDataset(DatasetFixture):
+    def test_serves_prebuilt_holidays(self):
+        build_dataset(self.dataset_path, 2021, 2023, ["US"])
+        service_instance = HolidayService(dataset_path=self.dataset_path)
+        assert service_instance.is_holiday("US", US_INDEPENDENCE_DAY) is True
+        cached_holidays = service_instance._country_holidays_cache["US"]
+        assert (cached_holidays.first_year, cached_holidays.last_year) == (2021, 2023)
+
+    def test_extends_beyond_prebuilt_years(self):
+        build_dataset(self.dataset_path, 2021, 2023, ["US"])
+        service_instance = HolidayService(dataset_path=self.dataset_path)
+        assert service_instance.is_holiday("US", dt.date(2025, 7, 4)) is True
+
+    def test_ignores_datasets_built_with_another_library_version(self):
+        with mock.patch.object(holidays, "__version__", "0.0"):
+            build_dataset(self.dataset_path, 2022, 2022, ["US"])
+        service_instance = HolidayService(dataset_path=self.dataset_path)
+        assert service_instance._dataset is None
+
+    def test_ignores_missing_and_invalid_datasets(self):
+        with open(self.dataset_path, "wb") as dataset_file:
+            dataset_file.write(b"not a dataset")
+        for dataset_path in [self.dataset_path, "does-not-exist.bin"]:
+            with self.subTest():
+                service_instance = HolidayService(dataset_path=dataset_path)
+                assert service_instance._dataset is None
+                assert service_instance.is_holiday("US", US_INDEPENDENCE_DAY)
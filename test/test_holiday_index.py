@@ -0,0 +1,253 @@
+import datetime as dt
+import unittest
+from array import array
+from test.test_data import NEW_YEARS_DAY, US_INDEPENDENCE_DAY
+
+import pytest
+
+from src.logic.services.holiday_index import (
+    HolidayIndex,
+    InvertedHolidayIndex,
+    LayeredHolidayIndex,
+)
+
+LABOR_DAY = dt.date(year=2022, month=9, day=5)
+UNSORTED_HOLIDAYS: list[tuple[dt.date, str]] = [
+    (NEW_YEARS_DAY, "New Year's Day"),
+    (US_INDEPENDENCE_DAY, "Independence Day"),
+    (LABOR_DAY, "Labor Day"),
+]
+
+
+class TestHolidayIndex(unittest.TestCase):
+    def setUp(self):
+        self.holiday_index = HolidayIndex.from_holidays(UNSORTED_HOLIDAYS, 2022, 2023)
+
+    def test_rejects_mismatched_arrays(self):
+        with pytest.raises(ValueError):
+            HolidayIndex([1, 2], ["One"], 2022, 2022)
+
+    def test_rejects_inverted_years(self):
+        with pytest.raises(ValueError):
+            HolidayIndex([], [], 2023, 2022)
+
+    def test_drops_holidays_outside_covered_years(self):
+        holiday_index = HolidayIndex.from_holidays(UNSORTED_HOLIDAYS, 2022, 2022)
+        assert NEW_YEARS_DAY not in holiday_index
+        assert len(holiday_index) == 2
+
+    def test_covers(self):
+        assert self.holiday_index.covers(2022, 2023)
+        assert self.holiday_index.covers(2023, 2023)
+        assert not self.holiday_index.covers(2021, 2022)
+        assert not self.holiday_index.covers(2023, 2024)
+
+    def test_concatenate_joins_adjacent_years(self):
+        holiday_index = HolidayIndex.concatenate(
+            [
+                HolidayIndex.from_holidays(UNSORTED_HOLIDAYS, 2022, 2022),
+                HolidayIndex.from_holidays(UNSORTED_HOLIDAYS, 2023, 2023),
+            ]
+        )
+        assert (holiday_index.first_year, holiday_index.last_year) == (2022, 2023)
+        assert [day for day, _ in holiday_index.between(LABOR_DAY, NEW_YEARS_DAY)] == [
+            LABOR_DAY,
+            NEW_YEARS_DAY,
+        ]
+
+    def test_concatenate_rejects_gaps(self):
+        with pytest.raises(ValueError):
+            HolidayIndex.concatenate(
+                [
+                    HolidayIndex.from_holidays(UNSORTED_HOLIDAYS, 2020, 2020),
+                    HolidayIndex.from_holidays(UNSORTED_HOLIDAYS, 2022, 2022),
+                ]
+            )
+
+    def test_contains(self):
+        param_list = [
+            (US_INDEPENDENCE_DAY, True),
+            (dt.datetime(2022, 7, 4), True),
+            (dt.date(2022, 7, 5), False),
+            (dt.date(1900, 1, 1), False),
+            (dt.date(2100, 1, 1), False),
+        ]
+        for date, expected_result in param_list:
+            with self.subTest():
+                assert (date in self.holiday_index) is expected_result
+
+    def test_get_name(self):
+        assert self.holiday_index.get_name(LABOR_DAY) == "Labor Day"
+        assert self.holiday_index.get_name(dt.date(2022, 9, 6)) == ""
+
+    def test_between_is_inclusive_and_sorted(self):
+        results = list(self.holiday_index.between(US_INDEPENDENCE_DAY, NEW_YEARS_DAY))
+        assert results == [
+            (US_INDEPENDENCE_DAY, "Independence Day"),
+            (LABOR_DAY, "Labor Day"),
+            (NEW_YEARS_DAY, "New Year's Day"),
+        ]
+
+    def test_between_handles_empty_range(self):
+        start, end = dt.date(2022, 7, 5), dt.date(2022, 9, 4)
+        assert list(self.holiday_index.between(start, end)) == []
+
+    def test_from_library_treats_uncomputable_years_as_empty(self):
+        param_list = [("IL", 1, 3, {2, 3}), ("JP", 1948, 1950, {1949, 1950})]
+        for country_code, first_year, last_year, expected_years in param_list:
+            with self.subTest(country_code=country_code):
+                holiday_index = HolidayIndex.from_library(
+                    country_code, None, first_year, last_year
+                )
+                holidays = holiday_index.between(
+                    dt.date(first_year, 1, 1), dt.date(last_year, 12, 31)
+                )
+                assert {day.year for day, _ in holidays} == expected_years
+
+    def test_from_library_rejects_unknown_regions(self):
+        for country_code, subdivision in [("ZZ", None), ("US", "ZZ")]:
+            with self.subTest(country_code=country_code, subdivision=subdivision):
+                with pytest.raises(NotImplementedError):
+                    HolidayIndex.from_library(country_code, subdivision, 2022, 2022)
+
+    def test_following_excludes_the_date(self):
+        param_list = [
+            (dt.date(2022, 1, 1), [US_INDEPENDENCE_DAY, LABOR_DAY, NEW_YEARS_DAY]),
+            (US_INDEPENDENCE_DAY, [LABOR_DAY, NEW_YEARS_DAY]),
+            (NEW_YEARS_DAY, []),
+        ]
+        for date, expected in param_list:
+            with self.subTest(date=date):
+                following = self.holiday_index.following(date)
+                assert [day for day, _ in following] == expected
+
+    def test_preceding_excludes_the_date_latest_first(self):
+        param_list = [
+            (dt.date(2023, 12, 31), [NEW_YEARS_DAY, LABOR_DAY, US_INDEPENDENCE_DAY]),
+            (LABOR_DAY, [US_INDEPENDENCE_DAY]),
+            (US_INDEPENDENCE_DAY, []),
+        ]
+        for date, expected in param_list:
+            with self.subTest(date=date):
+                preceding = self.holiday_index.preceding(date)
+                assert [day for day, _ in preceding] == expected
+
+
+class TestLayeredHolidayIndex(unittest.TestCase):
+    def setUp(self):
+        base = HolidayIndex.from_holidays(UNSORTED_HOLIDAYS, 2022, 2023)
+        overlay = HolidayIndex.from_holidays(
+            [
+                (dt.date(2022, 3, 31), "César Chávez Day"),
+                (LABOR_DAY, "Labour Day"),
+                (US_INDEPENDENCE_DAY, ""),
+            ],
+            2022,
+            2022,
+        )
+        self.holiday_index = LayeredHolidayIndex(overlay, base)
+
+    def test_rejects_base_that_does_not_cover_overlay(self):
+        base = HolidayIndex.from_holidays(UNSORTED_HOLIDAYS, 2022, 2022)
+        overlay = HolidayIndex.from_holidays([], 2022, 2023)
+        with pytest.raises(ValueError):
+            LayeredHolidayIndex(overlay, base)
+
+    def test_overlay_adds_renames_and_removes_holidays(self):
+        param_list = [
+            (dt.date(2022, 3, 31), "César Chávez Day"),
+            (LABOR_DAY, "Labour Day"),
+            (US_INDEPENDENCE_DAY, ""),
+        ]
+        for date, holiday_name in param_list:
+            with self.subTest():
+                assert self.holiday_index.get_name(date) == holiday_name
+                assert (date in self.holiday_index) is bool(holiday_name)
+
+    def test_falls_back_to_base(self):
+        holiday_index = LayeredHolidayIndex(
+            HolidayIndex.from_holidays([], 2023, 2023),
+            HolidayIndex.from_holidays(UNSORTED_HOLIDAYS, 2022, 2023),
+        )
+        assert holiday_index.get_name(NEW_YEARS_DAY) == "New Year's Day"
+
+    def test_between_merges_overlay_and_base(self):
+        results = list(
+            self.holiday_index.between(dt.date(2022, 1, 1), dt.date(2022, 12, 31))
+        )
+        assert results == [
+            (dt.date(2022, 3, 31), "César Chávez Day"),
+            (LABOR_DAY, "Labour Day"),
+        ]
+
+    def test_following_and_preceding_merge_overlay_and_base(self):
+        assert list(self.holiday_index.following(dt.date(2022, 1, 1))) == [
+            (dt.date(2022, 3, 31), "César Chávez Day"),
+            (LABOR_DAY, "Labour Day"),
+        ]
+        assert list(self.holiday_index.preceding(dt.date(2022, 12, 31))) == [
+            (LABOR_DAY, "Labour Day"),
+            (dt.date(2022, 3, 31), "César Chávez Day"),
+        ]
+
+    def test_following_stops_at_the_overlay_years(self):
+        # the base knows 2023's New Year's Day, but the overlay does not cover 2023
+        assert list(self.holiday_index.following(LABOR_DAY)) == []
+        holiday_index = LayeredHolidayIndex(
+            HolidayIndex.from_holidays([], 2023, 2023),
+            HolidayIndex.from_holidays(UNSORTED_HOLIDAYS, 2022, 2023),
+        )
+        assert list(holiday_index.preceding(dt.date(2023, 12, 31))) == [
+            (NEW_YEARS_DAY, "New Year's Day")
+        ]
+
+
+class TestInvertedHolidayIndex(unittest.TestCase):
+    def setUp(self):
+        self.holiday_index = InvertedHolidayIndex.from_country_indexes(
+            [
+                ("US", HolidayIndex.from_holidays(UNSORTED_HOLIDAYS, 2022, 2023)),
+                (
+                    "CA",
+                    HolidayIndex.from_holidays(
+                        [
+                            (dt.date(2022, 7, 1), "Canada Day"),
+                            (LABOR_DAY, "Labour Day"),
+                        ],
+                        2022,
+                        2023,
+                    ),
+                ),
+                ("AQ", HolidayIndex.from_holidays([], 2022, 2023)),
+            ],
+            2022,
+            2022,
+        )
+
+    def test_groups_countries_by_date(self):
+        results = list(
+            self.holiday_index.between(dt.date(2022, 1, 1), dt.date(2022, 12, 31))
+        )
+        assert results == [
+            (dt.date(2022, 7, 1), "CA", "Canada Day"),
+            (US_INDEPENDENCE_DAY, "US", "Independence Day"),
+            (LABOR_DAY, "CA", "Labour Day"),
+            (LABOR_DAY, "US", "Labor Day"),
+        ]
+        assert len(self.holiday_index) == 4
+
+    def test_keeps_only_covered_years(self):
+        assert self.holiday_index.covers(2022, 2022)
+        assert not self.holiday_index.covers(2022, 2023)
+        results = self.holiday_index.between(NEW_YEARS_DAY, NEW_YEARS_DAY)
+        assert list(results) == []
+
+    def test_between_single_date(self):
+        results = list(self.holiday_index.between(LABOR_DAY, LABOR_DAY))
+        assert [country_code for _, country_code, _ in results] == ["CA", "US"]
+
+    def test_rejects_mismatched_arrays(self):
+        with pytest.raises(ValueError):
+            InvertedHolidayIndex(
+                array("i", [1]), array("i", [0]), array("H"), array("I"), (), (), 1, 1
+            )
@@ -1,12 +1,16 @@
+import asyncio
 import datetime as dt
 import json
 import unittest
+from http import HTTPStatus
 from test.test_data import US_INDEPENDENCE_DAY
+from unittest import mock
 
 from fastapi.testclient import TestClient
 from requests import Response  # type: ignore
 
 import src.view.models as view_models
+from src.logic.services import holiday_service
 from src.main import app
 
 
@@ -38,6 +42,186 @@ class TestIsItAHoliday(unittest.TestCase):
                 assert parsed_response.is_holiday == expected_result
 
 
+class TestEventLoopUse(unittest.TestCase):
+    def setUp(self):
+        self.client: TestClient = TestClient(app)
+
+    def lookup_ran_on_event_loop(self, is_cached: bool) -> bool:
+        ran_on_event_loop: list[bool] = []
+        get_holiday_name = holiday_service.get_holiday_name
+
+        def recording_get_holiday_name(*args):
+            try:
+                asyncio.get_running_loop()
+                ran_on_event_loop.append(True)
+            except RuntimeError:
+                ran_on_event_loop.append(False)
+            return get_holiday_name(*args)
+
+        with mock.patch.object(
+            holiday_service, "is_cached", return_value=is_cached
+        ), mock.patch.object(
+            holiday_service, "get_holiday_name", recording_get_holiday_name
+        ):
+            response = self.client.get("holidays/US/2022-07-04")
+        assert response.status_code == HTTPStatus.OK
+        (on_event_loop,) = ran_on_event_loop
+        return on_event_loop
+
+    def test_answers_cached_lookups_inline(self):
+        assert self.lookup_ran_on_event_loop(is_cached=True) is True
+
+    def test_computes_cache_misses_off_the_event_loop(self):
+        assert self.lookup_ran_on_event_loop(is_cached=False) is False
+
+
+class TestIsItAHolidayAtTheEdgesOfTheCalendar(unittest.TestCase):
+    def test_treats_uncomputable_years_as_having_no_holidays(self):
+        client: TestClient = TestClient(app)
+        param_list = [("IL", "0001-01-01"), ("SE", "9999-12-31"), ("CL", "9999-06-01")]
+        for country_abbreviation, date in param_list:
+            with self.subTest(country_abbreviation=country_abbreviation):
+                response = client.get(f"holidays/{country_abbreviation}/{date}")
+                assert response.status_code == HTTPStatus.OK
+                assert response.json()["isHoliday"] is False
+
+
+class TestIsItAHolidayBatch(unittest.TestCase):
+    def setUp(self):
+        self.client: TestClient = TestClient(app)
+        self.route: str = "holidays/is-it-a-holiday/batch"
+
+    def get_results(self, raw_payload: dict) -> list[view_models.BatchIsHolidayResult]:
+        response: Response = self.client.post(self.route, json=raw_payload)
+        assert response.status_code == 200, response.text
+        return view_models.BatchIsHolidayResponse.parse_obj(response.json()).results
+
+    def test_answers_items_in_input_order(self):
+        results = self.get_results(
+            {
+                "items": [
+                    {"countryAbbreviation": "US", "date": "2022-07-04"},
+                    {"countryAbbreviation": "MX", "date": "2022-07-04"},
+                    {"countryAbbreviation": "US", "date": "2022-07-05"},
+                    {"countryAbbreviation": "MX", "date": "2022-09-16"},
+                ]
+            }
+        )
+        assert [r.is_holiday for r in results] == [True, False, False, True]
+        assert [r.country_abbreviation for r in results] == ["US", "MX", "US", "MX"]
+        assert results[0].holiday_name == "Independence Day"
+
+    def test_answers_one_country_with_many_dates(self):
+        results = self.get_results(
+            {
+                "countryAbbreviation": "US",
+                "dates": ["2022-07-03", US_INDEPENDENCE_DAY.isoformat(), "2022-07-05"],
+            }
+        )
+        assert [r.is_holiday for r in results] == [False, True, False]
+        assert results[1].date == US_INDEPENDENCE_DAY
+
+    def test_reports_invalid_items_without_failing_the_batch(self):
+        results = self.get_results(
+            {
+                "items": [
+                    {"countryAbbreviation": "GG", "date": "2022-07-04"},
+                    {"countryAbbreviation": "US", "date": "not-a-date"},
+                    {"countryAbbreviation": "US", "date": "2022-07-04"},
+                ]
+            }
+        )
+        assert results[0].error and results[0].is_holiday is None
+        assert results[1].error and results[1].is_holiday is None
+        assert results[2].error is None and results[2].is_holiday is True
+
+    def test_reports_items_that_are_not_objects(self):
+        results = self.get_results(
+            {
+                "items": [
+                    5,
+                    "US",
+                    None,
+                    {"countryAbbreviation": "US", "date": "2022-07-04"},
+                ]
+            }
+        )
+        assert [r.error for r in results[:3]] == ["Item should be an object."] * 3
+        assert results[3].error is None and results[3].is_holiday is True
+
+    def test_requires_exactly_one_form(self):
+        param_list = [
+            {},
+            {"dates": ["2022-07-04"]},
+            {"items": [], "countryAbbreviation": "US", "dates": []},
+        ]
+        for raw_payload in param_list:
+            with self.subTest():
+                response: Response = self.client.post(self.route, json=raw_payload)
+                assert response.status_code == 422
+
+
+class TestBusinessDays(unittest.TestCase):
+    def setUp(self):
+        self.client: TestClient = TestClient(app)
+
+    def test_adds_business_days(self):
+        raw_payload: dict = {
+            "countryAbbreviation": "US",
+            "date": "2022-07-01",
+            "days": 1,
+        }
+        response: Response = self.client.post(
+            "holidays/business-days/add", json=raw_payload
+        )
+        parsed_response = view_models.BusinessDayResponse.parse_obj(response.json())
+        assert parsed_response.date == dt.date(2022, 7, 5)
+
+    def test_counts_business_days(self):
+        raw_payload: dict = {
+            "countryAbbreviation": "US",
+            "startDate": "2022-07-01",
+            "endDate": "2022-07-06",
+        }
+        response: Response = self.client.post(
+            "holidays/business-days/count", json=raw_payload
+        )
+        assert response.json() == {"businessDays": 2}
+
+    def test_rolls_to_business_day(self):
+        raw_payload: dict = {
+            "countryAbbreviation": "US",
+            "date": US_INDEPENDENCE_DAY.isoformat(),
+            "roll": "backward",
+        }
+        response: Response = self.client.post(
+            "holidays/business-days/roll", json=raw_payload
+        )
+        assert response.json() == {"date": "2022-07-01"}
+
+    def test_rejects_dates_out_of_range(self):
+        raw_payload: dict = {
+            "countryAbbreviation": "US",
+            "date": "9999-12-30",
+            "days": 5,
+        }
+        response: Response = self.client.post(
+            "holidays/business-days/add", json=raw_payload
+        )
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    def test_rejects_ranges_spanning_too_many_years(self):
+        raw_payload: dict = {
+            "countryAbbreviation": "US",
+            "startDate": "0001-01-01",
+            "endDate": "9999-12-31",
+        }
+        response: Response = self.client.post(
+            "holidays/business-days/count", json=raw_payload
+        )
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 class TestSupportedCountries(unittest.TestCase):
     def setUp(self):
         self.client: TestClient = TestClient(app)
@@ -63,6 +247,28 @@ class TestSupportedCountries(unittest.TestCase):
         supported_countries_set = {c.country_abbreviation for c in supported_countries}
         assert {"GB", "MX", "US"}.intersection(supported_countries_set)
 
+    def test_sends_caching_headers(self):
+        response = self.client.get(self.route)
+        assert response.headers["etag"].startswith('"')
+        assert response.headers["cache-control"].startswith("public, max-age=")
+
+    def test_answers_matching_etags_with_not_modified(self):
+        etag: str = self.client.get(self.route).headers["etag"]
+        param_list = [etag, f"W/{etag}", f'"stale", {etag}', "*"]
+        for if_none_match in param_list:
+            with self.subTest():
+                response = self.client.get(
+                    self.route, headers={"If-None-Match": if_none_match}
+                )
+                assert response.status_code == HTTPStatus.NOT_MODIFIED
+                assert response.content == b""
+                assert response.headers["etag"] == etag
+
+    def test_answers_stale_etags_in_full(self):
+        response = self.client.get(self.route, headers={"If-None-Match": '"stale"'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()
+
 
 class TestUpcomingHolidays(unittest.TestCase):
     def setUp(self):
@@ -118,3 +324,328 @@ class TestUpcomingHolidays(unittest.TestCase):
         assert len(upcoming_holidays) == 2
         holiday_names = {h.holiday_name for h in upcoming_holidays}
         assert holiday_names == {"Christmas Day", "Christmas Day (Observed)"}
+
+    def test_tags_responses_by_query(self):
+        payload = view_models.UpcomingHolidaysPayload(
+            country_abbreviation="US",
+            start_date=US_INDEPENDENCE_DAY,
+            end_date=US_INDEPENDENCE_DAY,
+        )
+        etag: str = self.get_response(payload).headers["etag"]
+        assert self.get_response(payload).headers["etag"] == etag
+
+        payload.end_date = US_INDEPENDENCE_DAY + dt.timedelta(days=1)
+        assert self.get_response(payload).headers["etag"] != etag
+
+    def test_handles_subdivision(self):
+        raw_payload: dict = {
+            "countryAbbreviation": "US",
+            "subdivision": "CA",
+            "startDate": "2022-03-31",
+            "endDate": "2022-03-31",
+        }
+        raw_response = self.client.post(self.route, json=raw_payload).json()
+        assert [h["holidayName"] for h in raw_response] == ["César Chávez Day"]
+
+
+class TestGetVariants(unittest.TestCase):
+    def setUp(self):
+        self.client: TestClient = TestClient(app)
+
+    def test_revalidates_ranges_relative_to_today(self):
+        param_list = [
+            ({}, "no-cache"),
+            ({"end": "2099-01-01"}, "no-cache"),
+            ({"start": "2022-01-01"}, "public, max-age=86400"),
+        ]
+        for params, cache_control in param_list:
+            with self.subTest(params=params):
+                response = self.client.get("holidays/US", params=params)
+                assert response.status_code == HTTPStatus.OK
+                assert response.headers["cache-control"] == cache_control
+
+                revalidated = self.client.get(
+                    "holidays/US",
+                    params=params,
+                    headers={"If-None-Match": response.headers["etag"]},
+                )
+                assert revalidated.status_code == HTTPStatus.NOT_MODIFIED
+                assert revalidated.headers["cache-control"] == cache_control
+
+    def test_answers_is_it_a_holiday(self):
+        response = self.client.get(f"holidays/US/{US_INDEPENDENCE_DAY.isoformat()}")
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {"holidayName": "Independence Day", "isHoliday": True}
+
+    def test_matches_the_post_endpoints(self):
+        param_list = [
+            (
+                self.client.get("holidays/US/2022-03-31", params={"subdivision": "CA"}),
+                self.client.post(
+                    "holidays/is-it-a-holiday",
+                    json={
+                        "countryAbbreviation": "US",
+                        "subdivision": "CA",
+                        "date": "2022-03-31",
+                    },
+                ),
+            ),
+            (
+                self.client.get(
+                    "holidays/US", params={"start": "2022-12-23", "end": "2022-12-26"}
+                ),
+                self.client.post(
+                    "holidays/upcoming-holidays",
+                    json={
+                        "countryAbbreviation": "US",
+                        "startDate": "2022-12-23",
+                        "endDate": "2022-12-26",
+                    },
+                ),
+            ),
+        ]
+        for get_response, post_response in param_list:
+            with self.subTest():
+                assert get_response.status_code == HTTPStatus.OK
+                assert get_response.json() == post_response.json()
+
+    def test_defaults_the_upcoming_range(self):
+        response = self.client.get("holidays/US", params={"start": "2022-01-01"})
+        holiday_dates = [holiday["date"] for holiday in response.json()]
+        assert holiday_dates[0] == "2022-01-01"
+        assert holiday_dates[-1] <= "2022-07-02"
+
+    def test_supports_conditional_requests(self):
+        route: str = "holidays/US/2022-07-04"
+        etag: str = self.client.get(route).headers["etag"]
+        response = self.client.get(route, headers={"If-None-Match": etag})
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_rejects_invalid_parameters(self):
+        param_list = [
+            ("holidays/US/not-a-date", HTTPStatus.UNPROCESSABLE_ENTITY),
+            (
+                "holidays/US?start=2022-02-01&end=2022-01-01",
+                HTTPStatus.UNPROCESSABLE_ENTITY,
+            ),
+            ("holidays/US/2022-07-04?subdivision=ZZ", HTTPStatus.UNPROCESSABLE_ENTITY),
+            ("holidays/ZZ/2022-07-04", HTTPStatus.NOT_IMPLEMENTED),
+        ]
+        for route, status_code in param_list:
+            with self.subTest(route=route):
+                assert self.client.get(route).status_code == status_code
+
+    def test_normalizes_country_case(self):
+        response = self.client.get(f"holidays/us/{US_INDEPENDENCE_DAY.isoformat()}")
+        assert response.json()["isHoliday"]
+        response = self.client.get("holidays/us", params={"start": "2022-07-04"})
+        assert response.json()[0]["countryAbbreviation"] == "US"
+
+    def test_keeps_fixed_routes_reachable(self):
+        response = self.client.get("holidays/supported-countries")
+        assert response.status_code == HTTPStatus.OK
+        assert isinstance(response.json(), list)
+
+
+class TestExportHolidays(unittest.TestCase):
+    def setUp(self):
+        self.client: TestClient = TestClient(app)
+        self.route: str = "holidays/export"
+
+    def export(self, **params) -> list[dict]:
+        response = self.client.get(self.route, params=params)
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        return [json.loads(line) for line in response.text.splitlines()]
+
+    def test_merges_countries_in_date_order(self):
+        rows = self.export(
+            countries=["US", "GB", "US-CA"], start="2022-12-20", end="2023-01-03"
+        )
+        assert [row["date"] for row in rows] == sorted(row["date"] for row in rows)
+        regions = {(row["countryAbbreviation"], row["subdivision"]) for row in rows}
+        assert regions == {("US", None), ("GB", None), ("US", "CA")}
+        assert {
+            "countryAbbreviation": "GB",
+            "subdivision": None,
+            "date": "2022-12-26",
+            "holidayName": "Boxing Day",
+        } in rows
+
+    def test_matches_upcoming_holidays_per_country(self):
+        rows = self.export(countries=["MX"], start="2020-01-01", end="2023-12-31")
+        upcoming_holidays = self.client.get(
+            "holidays/MX", params={"start": "2020-01-01", "end": "2023-12-31"}
+        ).json()
+        assert [(row["date"], row["holidayName"]) for row in rows] == [
+            (holiday["date"], holiday["holidayName"]) for holiday in upcoming_holidays
+        ]
+
+    def test_defaults_to_every_supported_country(self):
+        rows = self.export(start="2022-12-25", end="2022-12-25")
+        assert len({row["countryAbbreviation"] for row in rows}) > 50
+
+    def test_exports_years_the_library_cannot_compute_for_some_countries(self):
+        rows = self.export(start="2099-12-01", end="2100-01-31")
+        assert not any("error" in row for row in rows)
+        assert {row["date"][:4] for row in rows} == {"2099", "2100"}
+
+    def test_rejects_invalid_parameters(self):
+        param_list = [
+            ({"start": "2022-02-01", "end": "2022-01-01"}, 422),
+            ({"start": "1900-01-01", "end": "2100-12-31"}, 422),
+            ({"start": "2022-01-01"}, 422),
+            ({"start": "2022-01-01", "end": "2022-02-01", "countries": "US-ZZ"}, 422),
+            ({"start": "2022-01-01", "end": "2022-02-01", "countries": "ZZ"}, 501),
+        ]
+        for params, status_code in param_list:
+            with self.subTest(params=params):
+                response = self.client.get(self.route, params=params)
+                assert response.status_code == status_code
+
+
+class TestCalendarFeed(unittest.TestCase):
+    def setUp(self):
+        self.client: TestClient = TestClient(app)
+        self.route: str = "holidays/US.ics"
+
+    def test_serves_a_calendar(self):
+        response = self.client.get(self.route, params={"subdivision": "CA"})
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers["content-type"].startswith("text/calendar")
+        assert response.text.startswith("BEGIN:VCALENDAR\r\n")
+        assert "SUMMARY:Independence Day\r\n" in response.text
+        assert "-us-ca@" in response.text
+
+    def test_answers_conditional_requests(self):
+        response = self.client.get(self.route)
+        etag: str = response.headers["etag"]
+        last_modified: str = response.headers["last-modified"]
+        param_list = [
+            ({"If-None-Match": etag}, HTTPStatus.NOT_MODIFIED),
+            ({"If-None-Match": '"stale"'}, HTTPStatus.OK),
+            ({"If-Modified-Since": last_modified}, HTTPStatus.NOT_MODIFIED),
+            ({"If-Modified-Since": "Sat, 01 Jan 2000 00:00:00 GMT"}, HTTPStatus.OK),
+            ({"If-Modified-Since": "not a date"}, HTTPStatus.OK),
+            (
+                {"If-None-Match": '"stale"', "If-Modified-Since": last_modified},
+                HTTPStatus.OK,
+            ),
+        ]
+        for headers, status_code in param_list:
+            with self.subTest(headers=headers):
+                response = self.client.get(self.route, headers=headers)
+                assert response.status_code == status_code
+                assert response.headers["etag"] == etag
+                assert response.headers["last-modified"] == last_modified
+
+    def test_rejects_unsupported_regions(self):
+        param_list = [
+            ("holidays/ZZ.ics", {}, 501),
+            ("holidays/US.ics", {"subdivision": "ZZ"}, 422),
+        ]
+        for route, params, status_code in param_list:
+            with self.subTest(route=route, params=params):
+                assert self.client.get(route, params=params).status_code == status_code
+
+
+class TestNearbyHolidays(unittest.TestCase):
+    def setUp(self):
+        self.client: TestClient = TestClient(app)
+
+    def test_next_holidays(self):
+        response = self.client.get(
+            "holidays/us/next", params={"date": "2022-12-26", "count": 2}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == [
+            {
+                "holidayName": "New Year's Day",
+                "date": "2023-01-01",
+                "countryAbbreviation": "US",
+            },
+            {
+                "holidayName": "New Year's Day (Observed)",
+                "date": "2023-01-02",
+                "countryAbbreviation": "US",
+            },
+        ]
+        assert "max-age" in response.headers["cache-control"]
+
+    def test_previous_holiday_in_a_subdivision(self):
+        response = self.client.get(
+            "holidays/US/previous", params={"date": "2022-04-01", "subdivision": "CA"}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert [holiday["holidayName"] for holiday in response.json()] == [
+            "César Chávez Day"
+        ]
+
+    def test_defaults_to_today(self):
+        response = self.client.get("holidays/US/next")
+        assert response.status_code == HTTPStatus.OK
+        (holiday,) = response.json()
+        assert holiday["date"] > dt.date.today().isoformat()
+        assert response.headers["cache-control"] == "no-cache"
+
+        revalidated = self.client.get(
+            "holidays/US/next", headers={"If-None-Match": response.headers["etag"]}
+        )
+        assert revalidated.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_rejects_invalid_parameters(self):
+        param_list = [
+            ("holidays/US/next", {"count": 0}, 422),
+            ("holidays/US/previous", {"count": 101}, 422),
+            ("holidays/US/next", {"subdivision": "ZZ"}, 422),
+            ("holidays/ZZ/previous", {}, 501),
+        ]
+        for route, params, status_code in param_list:
+            with self.subTest(route=route, params=params):
+                assert self.client.get(route, params=params).status_code == status_code
+
+
+class TestWorldwideHolidays(unittest.TestCase):
+    def setUp(self):
+        self.client: TestClient = TestClient(app)
+
+    def test_single_date(self):
+        response = self.client.get("holidays/worldwide/2022-07-04")
+        assert response.status_code == HTTPStatus.OK
+        assert {
+            "holidayName": "Independence Day",
+            "date": "2022-07-04",
+            "countryAbbreviation": "US",
+        } in response.json()
+        assert "etag" in response.headers
+
+    def test_years_some_countries_cannot_compute(self):
+        # the holidays library raises for JP before 1949 and for CN after 2099
+        for date in ("1940-06-01", "2100-06-01"):
+            with self.subTest(date=date):
+                response = self.client.get(f"holidays/worldwide/{date}")
+                assert response.status_code == HTTPStatus.OK
+                assert response.json()
+
+    def test_range_is_ordered_by_date_then_country(self):
+        response = self.client.get(
+            "holidays/worldwide", params={"start": "2022-12-24", "end": "2022-12-26"}
+        )
+        assert response.status_code == HTTPStatus.OK
+        keys = [
+            (holiday["date"], holiday["countryAbbreviation"])
+            for holiday in response.json()
+        ]
+        assert keys == sorted(keys)
+        assert {date for date, _ in keys} == {"2022-12-24", "2022-12-25", "2022-12-26"}
+
+    def test_rejects_invalid_ranges(self):
+        param_list = [
+            {"start": "2022-02-01", "end": "2022-01-01"},
+            {"start": "2022-01-01", "end": "2023-01-02"},
+            {"start": "2022-01-01"},
+        ]
+        for params in param_list:
+            with self.subTest(params=params):
+                response = self.client.get("holidays/worldwide", params=params)
+                assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
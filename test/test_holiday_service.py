@@ -1,8 +1,16 @@
 import datetime as dt
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from test.test_data import NEW_YEARS_DAY, US_INDEPENDENCE_DAY
+from unittest import mock
 
+import pytest
+
+from src.logic.models import Roll
 from src.logic.services import HolidayService, holiday_service
+from src.logic.services.holiday_index import HolidayIndex, LayeredHolidayIndex
+from src.logic.services.holiday_service import YearRangeError
 
 
 class TestGetCachedCountryHolidays(unittest.TestCase):
@@ -17,6 +25,139 @@ class TestGetCachedCountryHolidays(unittest.TestCase):
         assert service_instance.is_holiday("US", dt.datetime(2022, 7, 4)) is True
         assert service_instance.is_holiday("US", dt.datetime(2022, 7, 4)) is True
 
+    def test_only_computes_requested_years(self):
+        service_instance = HolidayService()
+        service_instance.is_holiday("US", dt.date(2022, 7, 4))
+        cached_holidays = service_instance._country_holidays_cache["US"]
+        assert (cached_holidays.first_year, cached_holidays.last_year) == (2022, 2022)
+
+    def test_extends_cached_years_on_demand(self):
+        service_instance = HolidayService()
+        service_instance.is_holiday("US", dt.date(2022, 7, 4))
+        assert service_instance.is_holiday("US", dt.date(2020, 7, 4)) is True
+        assert service_instance.is_holiday("US", dt.date(2024, 7, 4)) is True
+        cached_holidays = service_instance._country_holidays_cache["US"]
+        assert (cached_holidays.first_year, cached_holidays.last_year) == (2020, 2024)
+
+    def test_includes_holidays_observed_in_a_neighboring_year(self):
+        service_instance = HolidayService()
+        holiday_name = service_instance.get_holiday_name("US", dt.date(2021, 12, 31))
+        assert holiday_name == "New Year's Day (Observed)"
+
+    def test_evicts_least_recently_used_country(self):
+        service_instance = HolidayService(max_cached_countries=1, pinned_countries=[])
+        service_instance.is_holiday("US", dt.date(2022, 7, 4))
+        service_instance.is_holiday("FR", dt.date(2022, 7, 14))
+        statistics = service_instance.get_cache_statistics()
+        assert statistics.entries == 1
+        assert statistics.evictions == 1
+        assert statistics.size_in_bytes > 0
+
+    def test_subdivisions_share_the_national_index(self):
+        service_instance = HolidayService()
+        assert service_instance.is_holiday("US", dt.date(2022, 3, 31)) is False
+        assert service_instance.is_holiday("US", dt.date(2022, 3, 31), "CA") is True
+        national_holidays = service_instance._country_holidays_cache["US"]
+        california_overlay = service_instance._country_holidays_cache["US-CA"]
+        assert not isinstance(california_overlay, LayeredHolidayIndex)
+        assert california_overlay.size_in_bytes < national_holidays.size_in_bytes
+
+    def test_subdivisions_follow_the_extended_national_index(self):
+        service_instance = HolidayService()
+        param_list = [("CA", 2022), ("TX", 2012), ("NY", 2002), ("FL", 1992)]
+        for subdivision, year in param_list:
+            service_instance.get_holiday_name("US", dt.date(year, 1, 1), subdivision)
+
+        national_holidays = service_instance._country_holidays_cache["US"]
+        assert national_holidays.covers(1992, 2022)
+        for subdivision, year in param_list:
+            with self.subTest(subdivision=subdivision):
+                layered_holidays = service_instance._get_cached_country_holidays(
+                    "US", year, year, subdivision
+                )
+                assert layered_holidays._base is national_holidays
+
+    def test_computes_concurrent_cold_misses_once(self):
+        service_instance = HolidayService()
+        from_library = HolidayIndex.from_library
+        computed_countries: list[str] = []
+
+        def slow_from_library(country_code, *args):
+            computed_countries.append(country_code)
+            time.sleep(0.1)
+            return from_library(country_code, *args)
+
+        with mock.patch.object(HolidayIndex, "from_library", slow_from_library):
+            with ThreadPoolExecutor(8) as executor:
+                results = list(
+                    executor.map(
+                        lambda _: service_instance.is_holiday(
+                            "US", US_INDEPENDENCE_DAY
+                        ),
+                        range(8),
+                    )
+                )
+        assert results == [True] * 8
+        assert computed_countries == ["US"]
+
+    def test_is_cached(self):
+        service_instance = HolidayService()
+        assert service_instance.is_cached("US", 2022, 2022) is False
+        service_instance.get_holiday_name("US", US_INDEPENDENCE_DAY, "CA")
+        assert service_instance.is_cached("US", 2022, 2022) is True
+        assert service_instance.is_cached("US", 2022, 2022, "CA") is True
+        assert service_instance.is_cached("US", 2022, 2023, "CA") is False
+        assert service_instance.is_cached("US", 2022, 2022, "TX") is False
+
+        service_instance._country_holidays_cache._entries.pop("US")
+        assert service_instance.is_cached("US", 2022, 2022, "CA") is False
+
+    def test_rejects_too_many_years(self):
+        service_instance = HolidayService()
+        with pytest.raises(YearRangeError):
+            service_instance.get_upcoming_holidays(
+                "US", dt.date(1800, 1, 1), dt.date(2022, 1, 1)
+            )
+
+    def test_answers_distant_years_without_filling_the_gap(self):
+        service_instance = HolidayService()
+        service_instance.get_holiday_name("US", US_INDEPENDENCE_DAY)
+        assert service_instance.get_holiday_name("US", dt.date(9999, 12, 25)) == (
+            "Christmas Day"
+        )
+        cached_holidays = service_instance._country_holidays_cache["US"]
+        assert (cached_holidays.first_year, cached_holidays.last_year) == (2022, 2022)
+
+        names = service_instance.get_holiday_names(
+            "US", [dt.date(1, 1, 1), US_INDEPENDENCE_DAY, dt.date(9999, 12, 25)]
+        )
+        assert names == ["", "Independence Day", "Christmas Day"]
+
+    def test_keeps_the_years_nearer_today(self):
+        service_instance = HolidayService()
+        service_instance.get_holiday_name("US", dt.date(9999, 12, 25))
+        service_instance.get_holiday_name("US", US_INDEPENDENCE_DAY)
+        cached_holidays = service_instance._country_holidays_cache["US"]
+        assert (cached_holidays.first_year, cached_holidays.last_year) == (2022, 2022)
+
+    def test_primes_configured_horizon(self):
+        service_instance = HolidayService(horizon_years=2)
+        service_instance.prime_country_holidays("US")
+        cached_holidays = service_instance._country_holidays_cache["US"]
+        current_year: int = dt.date.today().year
+        assert cached_holidays.covers(current_year - 2, current_year + 2)
+
+    def test_warms_up_countries_and_subdivisions(self):
+        service_instance = HolidayService(horizon_years=1)
+        service_instance.warm_up(["GB", "US-CA"], years=[2030, 2032])
+        assert service_instance._country_holidays_cache["GB"].covers(2030, 2032)
+        assert service_instance._country_holidays_cache["US-CA"].covers(2030, 2032)
+
+        service_instance.warm_up(["MX"])
+        current_year: int = dt.date.today().year
+        cached_holidays = service_instance._country_holidays_cache["MX"]
+        assert cached_holidays.covers(current_year - 1, current_year + 1)
+
 
 class TestGetHolidayName(unittest.TestCase):
     def test_returns_expected_response(self):
@@ -42,6 +183,12 @@ class TestGetSupportedCountries(unittest.TestCase):
         assert {"GB", "MX", "US"}.intersection(supported_countries_set)
 
 
+class TestGetSupportedSubdivisions(unittest.TestCase):
+    def test_returns_expected_subdivisions(self):
+        assert "CA" in holiday_service.get_supported_subdivisions("US")
+        assert holiday_service.get_supported_subdivisions("ZZ") == []
+
+
 class TestGetCachedSupportedCountries(unittest.TestCase):
     def test_cached_supported_countries_included_expected_countries(self):
         cached_countries = holiday_service._cached_supported_countries
@@ -75,6 +222,130 @@ class TestGetUpcomingHolidays(unittest.TestCase):
         assert new_years_day.holiday_name == "New Year's Day"
         assert new_years_day_observed.holiday_name == "New Year's Day (Observed)"
 
+    def test_includes_subdivision_holidays(self):
+        upcoming_holidays = holiday_service.get_upcoming_holidays(
+            "US", dt.date(2022, 3, 1), dt.date(2022, 4, 30), "CA"
+        )
+        holiday_names = [h.holiday_name for h in upcoming_holidays]
+        assert holiday_names == ["César Chávez Day"]
+
+
+class TestNearbyHolidays(unittest.TestCase):
+    def test_next_holiday_is_strictly_after_the_date(self):
+        next_holidays = holiday_service.next_holiday("US", US_INDEPENDENCE_DAY, 2)
+        assert [holiday.holiday_name for holiday in next_holidays] == [
+            "Labor Day",
+            "Columbus Day",
+        ]
+        assert next_holidays[0].date == dt.date(2022, 9, 5)
+
+    def test_previous_holiday_is_strictly_before_the_date_latest_first(self):
+        previous_holidays = holiday_service.previous_holiday(
+            "US", dt.date(2022, 4, 1), 2, "CA"
+        )
+        assert [
+            (holiday.date, holiday.holiday_name) for holiday in previous_holidays
+        ] == [
+            (dt.date(2022, 3, 31), "César Chávez Day"),
+            (dt.date(2022, 2, 21), "Washington's Birthday"),
+        ]
+
+    def test_matches_upcoming_holidays(self):
+        start, end = dt.date(2022, 1, 1), dt.date(2024, 12, 31)
+        upcoming_holidays = holiday_service.get_upcoming_holidays("GB", start, end)
+        next_holidays = holiday_service.next_holiday(
+            "GB", start - dt.timedelta(1), len(upcoming_holidays)
+        )
+        previous_holidays = holiday_service.previous_holiday(
+            "GB", end + dt.timedelta(1), len(upcoming_holidays)
+        )
+        assert next_holidays == upcoming_holidays
+        assert previous_holidays == upcoming_holidays[::-1]
+
+    def test_extends_cached_years_only_as_far_as_needed(self):
+        service_instance = HolidayService(horizon_years=1)
+        service_instance.next_holiday("US", dt.date(2040, 12, 30))
+        cached_holidays = service_instance._country_holidays_cache["US"]
+        assert (cached_holidays.first_year, cached_holidays.last_year) == (2040, 2041)
+
+        service_instance.previous_holiday("US", dt.date(2040, 1, 1), 20)
+        cached_holidays = service_instance._country_holidays_cache["US"]
+        assert (cached_holidays.first_year, cached_holidays.last_year) == (2038, 2041)
+
+    def test_extends_a_year_at_a_time_without_a_horizon(self):
+        service_instance = HolidayService(horizon_years=0)
+        param_list = [
+            (service_instance.next_holiday, dt.date(2022, 12, 30)),
+            (service_instance.previous_holiday, dt.date(2022, 1, 2)),
+        ]
+        for find_nearby_holidays, date in param_list:
+            with self.subTest(find_nearby_holidays=find_nearby_holidays.__name__):
+                assert len(find_nearby_holidays("US", date, 30)) == 30
+
+    def test_searches_past_a_cached_span_of_many_years(self):
+        service_instance = HolidayService(pinned_countries=[])
+        service_instance.prime_years("DE", 1830, 2025)
+        service_instance.prime_years("DE", 2026, 2031)
+        cached_holidays = service_instance._country_holidays_cache["DE"]
+        assert cached_holidays.last_year - cached_holidays.first_year + 1 > 195
+
+        date = dt.date(cached_holidays.last_year, 12, 27)
+        next_holidays = service_instance.next_holiday("DE", date, 20)
+        assert len(next_holidays) == 20
+        assert next_holidays[0].date.year == cached_holidays.last_year + 1
+
+    def test_returns_fewer_holidays_at_the_end_of_the_calendar(self):
+        service_instance = HolidayService()
+        next_holidays = service_instance.next_holiday("US", dt.date(9999, 12, 1), 5)
+        assert 0 < len(next_holidays) < 5
+        assert all(holiday.date.year == 9999 for holiday in next_holidays)
+
+
+class TestGetWorldwideHolidays(unittest.TestCase):
+    def test_matches_each_country_holidays(self):
+        start, end = dt.date(2022, 12, 20), dt.date(2023, 1, 10)
+        expected = sorted(
+            (
+                (holiday.date, holiday.country_abbreviation, holiday.holiday_name)
+                for country in holiday_service.get_supported_countries()
+                for holiday in holiday_service.get_upcoming_holidays(
+                    country.abbreviation, start, end
+                )
+            )
+        )
+        worldwide_holidays = holiday_service.get_worldwide_holidays(start, end)
+        assert [
+            (holiday.date, holiday.country_abbreviation, holiday.holiday_name)
+            for holiday in worldwide_holidays
+        ] == expected
+
+    def test_leaves_out_countries_the_library_cannot_compute(self):
+        service_instance = HolidayService(pinned_countries=[])
+        from_library = HolidayIndex.from_library
+
+        def fail_for_jp(country_code, *args):
+            if country_code == "JP":
+                raise NotImplementedError("JP is not computed before 1949")
+            return from_library(country_code, *args)
+
+        with mock.patch.object(HolidayIndex, "from_library", fail_for_jp):
+            worldwide_holidays = service_instance.get_worldwide_holidays(
+                dt.date(2022, 1, 1), dt.date(2022, 1, 1)
+            )
+        countries = {holiday.country_abbreviation for holiday in worldwide_holidays}
+        assert "JP" not in countries
+        assert "US" in countries
+
+    def test_leaves_country_cache_alone(self):
+        service_instance = HolidayService(pinned_countries=[])
+        service_instance.get_holiday_name("US", US_INDEPENDENCE_DAY)
+        worldwide_holidays = service_instance.get_worldwide_holidays(
+            US_INDEPENDENCE_DAY, US_INDEPENDENCE_DAY
+        )
+        assert "US" in {holiday.country_abbreviation for holiday in worldwide_holidays}
+        assert len(service_instance._country_holidays_cache) == 1
+        assert len(service_instance._worldwide_holidays_cache) == 1
+
 
 class TestIsHoliday(unittest.TestCase):
     def test_returns_expected_response(self):
@@ -87,3 +358,29 @@ class TestIsHoliday(unittest.TestCase):
             with self.subTest():
                 holiday_decision: bool = holiday_service.is_holiday("US", date)
                 assert holiday_decision is expected_result
+
+
+class TestBusinessDays(unittest.TestCase):
+    def test_add_business_days_skips_weekends_and_holidays(self):
+        friday_before = dt.date(2022, 7, 1)
+        business_day = holiday_service.add_business_days("US", friday_before, 1)
+        assert business_day == dt.date(2022, 7, 5)
+
+    def test_uses_country_weekend(self):
+        # the United Arab Emirates took Friday and Saturday off at the time
+        friday = dt.date(2022, 1, 7)
+        assert holiday_service.is_business_day("US", friday) is True
+        assert holiday_service.is_business_day("AE", friday) is False
+
+    def test_count_business_days(self):
+        count = holiday_service.count_business_days(
+            "US", dt.date(2022, 12, 19), dt.date(2023, 1, 3)
+        )
+        # eleven weekdays minus observed Christmas Day and New Year's Day
+        assert count == 9
+
+    def test_roll_to_business_day(self):
+        rolled = holiday_service.roll_to_business_day(
+            "US", US_INDEPENDENCE_DAY, Roll.BACKWARD
+        )
+        assert rolled == dt.date(2022, 7, 1)
@@ -0,0 +1,80 @@
+import datetime as dt
+import unittest
+
+from src.logic.services import holiday_service
+from src.view.icalendar import CalendarFeeds, escape_text, fold_line
+
+
+class TestContentLines(unittest.TestCase):
+    def test_escapes_text(self):
+        assert escape_text("a,b;c\\d\ne") == "a\\,b\\;c\\\\d\\ne"
+
+    def test_folds_long_lines_without_splitting_characters(self):
+        param_list = [
+            "SUMMARY:" + "x" * 200,
+            "SUMMARY:" + "é" * 100,
+            "SUMMARY:" + "🎉" * 50,
+        ]
+        for line in param_list:
+            with self.subTest(line=line[:12]):
+                folded: str = fold_line(line)
+                assert folded.endswith("\r\n")
+                pieces = folded.removesuffix("\r\n").split("\r\n")
+                assert all(len(piece.encode()) <= 75 for piece in pieces)
+                assert all(piece.startswith(" ") for piece in pieces[1:])
+                assert pieces[0] + "".join(piece[1:] for piece in pieces[1:]) == line
+
+    def test_leaves_short_lines_alone(self):
+        assert fold_line("VERSION:2.0") == "VERSION:2.0\r\n"
+
+
+class TestCalendarFeeds(unittest.TestCase):
+    def setUp(self):
+        self.today: dt.date = dt.date(2022, 6, 15)
+        self.calendar_feeds = CalendarFeeds(
+            max_size_in_bytes=1024 * 1024,
+            past_years=1,
+            future_years=1,
+            today=lambda: self.today,
+        )
+
+    def test_covers_the_years_around_today(self):
+        assert self.calendar_feeds.get_years() == range(2021, 2024)
+        feed: str = self.calendar_feeds.get_feed("US").decode()
+        expected = holiday_service.get_upcoming_holidays(
+            "US", dt.date(2021, 1, 1), dt.date(2023, 12, 31)
+        )
+        assert feed.startswith("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n")
+        assert feed.endswith("END:VCALENDAR\r\n")
+        assert "X-WR-CALNAME:United States holidays\r\n" in feed
+        assert feed.count("BEGIN:VEVENT") == len(expected)
+        assert "DTSTART;VALUE=DATE:20220704\r\nDTEND;VALUE=DATE:20220705\r\n" in feed
+        assert "DTSTAMP:20220101T000000Z\r\n" in feed
+
+    def test_reuses_cached_fragments(self):
+        feed: bytes = self.calendar_feeds.get_feed("US", "CA")
+        assert b"UID:20220331-us-ca@forget-me-nots" in feed
+        self.calendar_feeds._render_fragment = None  # any render would now fail
+        assert self.calendar_feeds.get_feed("US", "CA") == feed
+
+    def test_last_modified_moves_with_the_window(self):
+        last_modified: dt.datetime = self.calendar_feeds.get_last_modified()
+        self.today = dt.date(2099, 1, 2)
+        assert self.calendar_feeds.get_last_modified() == dt.datetime(
+            2099, 1, 1, tzinfo=dt.timezone.utc
+        )
+        assert last_modified < self.calendar_feeds.get_last_modified()
+
+    def test_does_not_depend_on_when_the_feeds_were_created(self):
+        other_calendar_feeds = CalendarFeeds(
+            max_size_in_bytes=1024 * 1024,
+            past_years=1,
+            future_years=1,
+            today=lambda: self.today,
+        )
+        assert other_calendar_feeds.get_feed("GB") == self.calendar_feeds.get_feed("GB")
+        assert (
+            other_calendar_feeds.get_last_modified()
+            == self.calendar_feeds.get_last_modified()
+            == dt.datetime(2022, 1, 1, tzinfo=dt.timezone.utc)
+        )
@@ -0,0 +1,63 @@
+import unittest
+
+import pytest
+
+from src.logic.services.lru_cache import LRUCache
+
+
+def build_cache(
+    max_entries: int = 2, max_size_in_bytes: int = 100, pinned_keys=()
+) -> LRUCache[str, str]:
+    return LRUCache(
+        max_entries=max_entries,
+        max_size_in_bytes=max_size_in_bytes,
+        size_of=len,
+        pinned_keys=pinned_keys,
+    )
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_rejects_empty_cache(self):
+        with pytest.raises(ValueError):
+            build_cache(max_entries=0)
+
+    def test_counts_hits_and_misses(self):
+        cache = build_cache()
+        assert cache.get("US") is None
+        cache.put("US", "United States")
+        assert cache.get("US") == "United States"
+        statistics = cache.get_statistics()
+        assert (statistics.hits, statistics.misses) == (1, 1)
+
+    def test_evicts_least_recently_used_entry(self):
+        cache = build_cache()
+        cache.put("US", "United States")
+        cache.put("GB", "United Kingdom")
+        cache.get("US")
+        cache.put("MX", "Mexico")
+        assert "GB" not in cache
+        assert {"US", "MX"} == {key for key in ("US", "GB", "MX") if key in cache}
+        assert cache.get_statistics().evictions == 1
+
+    def test_evicts_to_stay_within_size_budget(self):
+        cache = build_cache(max_entries=10, max_size_in_bytes=20)
+        cache.put("US", "United States")
+        cache.put("GB", "United Kingdom")
+        assert "US" not in cache
+        assert cache.get_statistics().size_in_bytes == len("United Kingdom")
+
+    def test_replacing_an_entry_updates_its_size(self):
+        cache = build_cache()
+        cache.put("US", "US")
+        cache.put("US", "United States")
+        statistics = cache.get_statistics()
+        assert (statistics.entries, statistics.size_in_bytes) == (1, 13)
+
+    def test_never_evicts_pinned_keys(self):
+        cache = build_cache(max_entries=1, pinned_keys=["US"])
+        cache.put("US", "United States")
+        cache.put("GB", "United Kingdom")
+        cache.put("MX", "Mexico")
+        assert "US" in cache
+        assert "GB" not in cache
+        assert "MX" in cache
@@ -0,0 +1,63 @@
+import time
+import unittest
+from http import HTTPStatus
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from src.config import settings
+from src.logic.services import holiday_service
+from src.main import app
+
+
+class TestReadiness(unittest.TestCase):
+    def wait_until_ready(self, client: TestClient) -> int:
+        deadline: float = time.monotonic() + 10
+        status_code: int = client.get("/ready").status_code
+        while status_code != HTTPStatus.OK and time.monotonic() < deadline:
+            time.sleep(0.01)
+            status_code = client.get("/ready").status_code
+        return status_code
+
+    def test_is_not_ready_before_startup(self):
+        response = TestClient(app).get("/ready")
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert response.json() == {"ready": False}
+
+    def test_becomes_ready_once_warmed_up(self):
+        with mock.patch.object(settings, "warmup_countries", ["GB", "US-NY"]):
+            with mock.patch.object(settings, "warmup_years", [2041, 2042]):
+                with TestClient(app) as client:
+                    assert self.wait_until_ready(client) == HTTPStatus.OK
+        for region in ["GB", "US-NY"]:
+            with self.subTest():
+                cached_holidays = holiday_service._country_holidays_cache.peek(region)
+                assert cached_holidays.covers(2041, 2042)
+
+    def test_skips_unsupported_warmup_countries(self):
+        with mock.patch.object(settings, "warmup_countries", ["ZZ"]):
+            with TestClient(app) as client:
+                assert self.wait_until_ready(client) == HTTPStatus.OK
+
+    def test_skips_regions_the_holidays_library_fails_on(self):
+        with mock.patch.object(settings, "warmup_countries", ["CN"]):
+            with mock.patch.object(
+                holiday_service, "warm_up", side_effect=IndexError("out of range")
+            ):
+                with TestClient(app) as client:
+                    assert self.wait_until_ready(client) == HTTPStatus.OK
+
+    def test_logs_a_failed_warmup(self):
+        with self.assertLogs("src.main", level="ERROR") as logs:
+            with mock.patch(
+                "src.main.initialize_firebase", side_effect=RuntimeError("no creds")
+            ):
+                with TestClient(app) as client:
+                    deadline: float = time.monotonic() + 10
+                    while not logs.records and time.monotonic() < deadline:
+                        time.sleep(0.01)
+                    assert client.get("/ready").status_code == (
+                        HTTPStatus.SERVICE_UNAVAILABLE
+                    )
+        (record,) = logs.records
+        assert record.exc_info[1].args == ("no creds",)
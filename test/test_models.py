@@ -4,6 +4,7 @@ from http import HTTPStatus
 
 import pytest
 from fastapi import HTTPException
+from pydantic import ValidationError
 
 from src.view.models import _convert_to_camel_case  # noqa
 from src.view.models import (
@@ -65,3 +66,16 @@ class TestHolidayBasePayload(unittest.TestCase):
         for country_abbreviation in country_codes:
             with self.subTest():
                 HolidayBasePayload(country_abbreviation=country_abbreviation)
+
+    def test_accepts_supported_subdivision(self):
+        payload = HolidayBasePayload(country_abbreviation="US", subdivision="CA")
+        assert payload.subdivision == "CA"
+
+    def test_rejects_unsupported_subdivision(self):
+        unsupported_subdivisions = ["ZZ", "ca", "ON"]
+        for subdivision in unsupported_subdivisions:
+            with self.subTest():
+                with pytest.raises(ValidationError):
+                    HolidayBasePayload(
+                        country_abbreviation="US", subdivision=subdivision
+                    )
@@ -0,0 +1,144 @@
+import datetime as dt
+import json
+import unittest
+from unittest import mock
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+import src.view.models as view_models
+from src.logic.services import holiday_service
+from src.logic.services.holiday_service import YearRangeError
+from src.view.serialization import SerializedResponses, iter_holiday_export
+
+
+class TestSerializedResponses(unittest.TestCase):
+    def setUp(self):
+        self.serialized_responses = SerializedResponses(max_size_in_bytes=1024 * 1024)
+
+    def test_encodes_supported_countries_like_the_response_model(self):
+        expected = [
+            jsonable_encoder(
+                view_models.CountryResponse(
+                    country_abbreviation=country.abbreviation,
+                    name=country.name,
+                    flag=country.flag,
+                ),
+                by_alias=True,
+            )
+            for country in holiday_service.get_supported_countries()
+        ]
+        encoded: bytes = self.serialized_responses.get_supported_countries()
+        assert json.loads(encoded) == expected
+        assert self.serialized_responses.get_supported_countries() is encoded
+
+    def test_slices_cached_years_to_the_requested_range(self):
+        param_list = [
+            (dt.date(2022, 7, 4), dt.date(2022, 7, 4), None),
+            (dt.date(2022, 12, 20), dt.date(2023, 1, 20), None),
+            (dt.date(2021, 3, 1), dt.date(2023, 3, 1), "CA"),
+            (dt.date(2022, 7, 5), dt.date(2022, 8, 31), None),
+        ]
+        for start, end, subdivision in param_list:
+            with self.subTest(start=start, end=end):
+                expected = [
+                    {
+                        "holidayName": holiday.holiday_name,
+                        "date": holiday.date.isoformat(),
+                        "countryAbbreviation": holiday.country_abbreviation,
+                    }
+                    for holiday in holiday_service.get_upcoming_holidays(
+                        "US", start, end, subdivision
+                    )
+                ]
+                encoded = self.serialized_responses.get_upcoming_holidays(
+                    "US", start, end, subdivision
+                )
+                assert json.loads(encoded) == expected
+
+    def test_computes_a_cold_range_in_one_extension(self):
+        extend = holiday_service._extend_cached_country_holidays
+        with mock.patch.object(
+            holiday_service, "_extend_cached_country_holidays", wraps=extend
+        ) as extend_cached_country_holidays:
+            self.serialized_responses.get_upcoming_holidays(
+                "NZ", dt.date(2060, 1, 1), dt.date(2069, 12, 31)
+            )
+        assert extend_cached_country_holidays.call_count == 1
+
+    def test_rejects_ranges_too_wide_to_compute(self):
+        with pytest.raises(YearRangeError):
+            self.serialized_responses.get_upcoming_holidays(
+                "DE", dt.date(1, 1, 1), dt.date(9999, 12, 31)
+            )
+
+
+class TestIterHolidayExport(unittest.TestCase):
+    def test_yields_complete_lines_in_bounded_chunks(self):
+        start, end = dt.date(2000, 1, 1), dt.date(2009, 12, 31)
+        with mock.patch("src.view.serialization.EXPORT_CHUNK_SIZE_IN_BYTES", 1024):
+            chunks = list(iter_holiday_export([("US", None), ("GB", None)], start, end))
+        assert len(chunks) > 1
+        for chunk in chunks:
+            with self.subTest():
+                assert chunk.endswith(b"\n")
+                assert len(chunk) < 2048
+
+        rows = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+        us_dates = [
+            holiday.date.isoformat()
+            for holiday in holiday_service.get_upcoming_holidays("US", start, end)
+        ]
+        assert [row["date"] for row in rows if row["countryAbbreviation"] == "US"] == (
+            us_dates
+        )
+        assert [row["date"] for row in rows] == sorted(row["date"] for row in rows)
+
+    def test_yields_nothing_without_holidays(self):
+        day = dt.date(2022, 9, 1)
+        assert list(iter_holiday_export([("US", None)], day, day)) == []
+
+    def test_reports_a_region_that_fails_and_exports_the_rest(self):
+        start, end = dt.date(2020, 1, 1), dt.date(2022, 12, 31)
+        peek_country_holidays = holiday_service._peek_country_holidays
+
+        def fail_for_gb_from_2021(country_code, first_year, *args):
+            if country_code == "GB" and first_year >= 2021:
+                raise RuntimeError("GB is broken")
+            return peek_country_holidays(country_code, first_year, *args)
+
+        with mock.patch(
+            "src.logic.services.holiday_service.ITERATED_YEARS_PER_BLOCK", 1
+        ), mock.patch.object(
+            holiday_service, "_peek_country_holidays", fail_for_gb_from_2021
+        ), self.assertLogs(
+            "src.view.serialization", "ERROR"
+        ):
+            chunks = list(iter_holiday_export([("US", None), ("GB", None)], start, end))
+        rows = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+
+        gb_rows = [row for row in rows if row["countryAbbreviation"] == "GB"]
+        assert gb_rows[-1] == {
+            "countryAbbreviation": "GB",
+            "subdivision": None,
+            "date": "2020-12-29",
+            "error": "Could not compute the holidays from this date on.",
+        }
+        assert all(row["date"] < "2021" for row in gb_rows)
+        assert max(
+            row["date"] for row in rows if row["countryAbbreviation"] == "US"
+        ) > ("2022")
+        assert [row["date"] for row in rows] == sorted(row["date"] for row in rows)
+
+    def test_leaves_the_shared_cache_alone(self):
+        holiday_service.prime_years("DE", 2024, 2024)
+        cache = holiday_service._country_holidays_cache
+        cached_regions = len(cache)
+        regions = [
+            (country.abbreviation, None)
+            for country in holiday_service.get_supported_countries()
+        ] + [("US", "CA")]
+        day, later_day = dt.date(2024, 1, 1), dt.date(2024, 12, 31)
+        assert list(iter_holiday_export(regions, day, later_day))
+        assert len(cache) == cached_regions
+        assert "DE" in cache
@@ -0,0 +1,52 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.logic.services.single_flight import SingleFlight
+
+CONCURRENT_CALLERS = 8
+
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.single_flight: SingleFlight[str, int] = SingleFlight()
+        self.calls: int = 0
+        self.calls_lock = threading.Lock()
+
+    def slow_function(self) -> int:
+        with self.calls_lock:
+            self.calls += 1
+        time.sleep(0.1)
+        return 42
+
+    def test_coalesces_concurrent_calls(self):
+        with ThreadPoolExecutor(CONCURRENT_CALLERS) as executor:
+            futures = [
+                executor.submit(self.single_flight.run, "US", self.slow_function)
+                for _ in range(CONCURRENT_CALLERS)
+            ]
+            results = [future.result() for future in futures]
+        assert results == [42] * CONCURRENT_CALLERS
+        assert self.calls == 1
+
+    def test_runs_again_once_a_call_completes(self):
+        assert self.single_flight.run("US", self.slow_function) == 42
+        assert self.single_flight.run("US", self.slow_function) == 42
+        assert self.calls == 2
+
+    def test_shares_exceptions_with_waiters(self):
+        def failing_function() -> int:
+            time.sleep(0.1)
+            raise RuntimeError("Holidays are cancelled.")
+
+        with ThreadPoolExecutor(CONCURRENT_CALLERS) as executor:
+            futures = [
+                executor.submit(self.single_flight.run, "US", failing_function)
+                for _ in range(CONCURRENT_CALLERS)
+            ]
+            for future in futures:
+                with pytest.raises(RuntimeError):
+                    future.result()
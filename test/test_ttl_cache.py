@@ -0,0 +1,43 @@
+import unittest
+
+import pytest
+
+from src.logic.services.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now: float = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache: TTLCache[str, str] = TTLCache(max_entries=2, clock=self.clock)
+
+    def test_rejects_empty_cache(self):
+        with pytest.raises(ValueError):
+            TTLCache(max_entries=0)
+
+    def test_expires_entries_at_their_deadline(self):
+        self.cache.put("US", "United States", expires_at=self.clock.now + 10)
+        assert self.cache.get("US") == "United States"
+        self.clock.now += 10
+        assert self.cache.get("US") is None
+        assert len(self.cache) == 0
+
+    def test_drops_least_recently_used_entry_when_full(self):
+        for key in ["US", "GB"]:
+            self.cache.put(key, key, expires_at=self.clock.now + 10)
+        self.cache.get("US")
+        self.cache.put("MX", "MX", expires_at=self.clock.now + 10)
+        assert self.cache.get("GB") is None
+        assert self.cache.get("US") == "US"
+
+    def test_pop(self):
+        self.cache.put("US", "United States", expires_at=self.clock.now + 10)
+        assert self.cache.pop("US") == "United States"
+        assert self.cache.pop("US") is None